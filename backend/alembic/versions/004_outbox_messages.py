@@ -0,0 +1,39 @@
+"""add outbox_messages table for durable email/Telegram delivery
+
+Revision ID: 004_outbox_messages
+Revises: 003_drop_username_unique
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "004_outbox_messages"
+down_revision: Union[str, None] = "003_drop_username_unique"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox_messages",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("channel", sa.String(32), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(16), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_outbox_messages_id", "outbox_messages", ["id"])
+    op.create_index("ix_outbox_messages_status_next_attempt", "outbox_messages", ["status", "next_attempt_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_messages_status_next_attempt", table_name="outbox_messages")
+    op.drop_index("ix_outbox_messages_id", table_name="outbox_messages")
+    op.drop_table("outbox_messages")
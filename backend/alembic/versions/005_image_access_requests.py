@@ -0,0 +1,46 @@
+"""add image_access_requests table and outbox dedupe key
+
+Revision ID: 005_image_access_requests
+Revises: 004_outbox_messages
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "005_image_access_requests"
+down_revision: Union[str, None] = "004_outbox_messages"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "image_access_requests",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("image_id", sa.Integer(), sa.ForeignKey("images.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("status", sa.String(16), nullable=False, server_default="pending"),
+        sa.Column("caption", sa.Text(), nullable=False),
+        sa.Column("chat_id", sa.BigInteger(), nullable=True),
+        sa.Column("message_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("decided_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("decided_by", sa.String(150), nullable=True),
+    )
+    op.create_index("ix_image_access_requests_id", "image_access_requests", ["id"])
+    op.create_index("ix_image_access_requests_status", "image_access_requests", ["status"])
+
+    op.add_column("outbox_messages", sa.Column("dedupe_key", sa.String(128), nullable=True))
+    op.create_index("ix_outbox_messages_dedupe_key", "outbox_messages", ["dedupe_key"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_messages_dedupe_key", table_name="outbox_messages")
+    op.drop_column("outbox_messages", "dedupe_key")
+
+    op.drop_index("ix_image_access_requests_status", table_name="image_access_requests")
+    op.drop_index("ix_image_access_requests_id", table_name="image_access_requests")
+    op.drop_table("image_access_requests")
@@ -0,0 +1,38 @@
+"""add source_stats table with per-source search object counts
+
+Revision ID: 006_source_stats
+Revises: 005_image_access_requests
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "006_source_stats"
+down_revision: Union[str, None] = "005_image_access_requests"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "source_stats",
+        sa.Column("image_source_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("object_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.execute(
+        """
+        INSERT INTO source_stats (image_source_id, object_count)
+        SELECT COALESCE(i.image_source_id, 0), COUNT(*)
+        FROM search_objects so
+        JOIN images i ON i.id = so.image_id
+        GROUP BY COALESCE(i.image_source_id, 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("source_stats")
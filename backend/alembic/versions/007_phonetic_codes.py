@@ -0,0 +1,56 @@
+"""add search_object_phonetic table with Daitch–Mokotoff codes per search object
+
+Revision ID: 007_phonetic_codes
+Revises: 006_source_stats
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.soundex import phonetic_codes
+
+revision: str = "007_phonetic_codes"
+down_revision: Union[str, None] = "006_source_stats"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 5000
+
+
+def upgrade() -> None:
+    table = op.create_table(
+        "search_object_phonetic",
+        sa.Column("code", sa.String(6), primary_key=True),
+        sa.Column(
+            "search_object_id", sa.Integer(),
+            sa.ForeignKey("search_objects.id", ondelete="CASCADE"), primary_key=True,
+        ),
+    )
+    op.create_index("ix_search_object_phonetic_search_object_id", "search_object_phonetic", ["search_object_id"])
+
+    # The codes come from the same Python implementation ingest uses, so backfill from here
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text("SELECT id, text_content FROM search_objects WHERE id > :last_id ORDER BY id LIMIT :batch"),
+            {"last_id": last_id, "batch": BACKFILL_BATCH},
+        ).all()
+        if not rows:
+            break
+        values = [
+            {"search_object_id": object_id, "code": code}
+            for object_id, text_content in rows
+            for code in phonetic_codes(text_content)
+        ]
+        if values:
+            conn.execute(table.insert(), values)
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    op.drop_index("ix_search_object_phonetic_search_object_id", table_name="search_object_phonetic")
+    op.drop_table("search_object_phonetic")
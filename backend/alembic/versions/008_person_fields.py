@@ -0,0 +1,39 @@
+"""add structured person fields to search_objects
+
+Revision ID: 008_person_fields
+Revises: 007_phonetic_codes
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "008_person_fields"
+down_revision: Union[str, None] = "007_phonetic_codes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("search_objects", sa.Column("surname", sa.String(255), nullable=True))
+    op.add_column("search_objects", sa.Column("given_name", sa.String(255), nullable=True))
+    op.add_column("search_objects", sa.Column("patronymic", sa.String(255), nullable=True))
+    op.add_column("search_objects", sa.Column("nationality", sa.String(64), nullable=True))
+    op.add_column("search_objects", sa.Column("residence", sa.String(255), nullable=True))
+    op.add_column("search_objects", sa.Column("year", sa.Integer(), nullable=True))
+    op.create_index("ix_search_objects_year", "search_objects", ["year"])
+    op.execute("CREATE INDEX ix_search_objects_surname_lower ON search_objects (lower(surname))")
+    op.execute("CREATE INDEX ix_search_objects_residence_trgm ON search_objects USING GIN (residence gin_trgm_ops)")
+    # Unlike the phonetic codes in 007 there is nothing to derive here: the CLI pipelines read these
+    # fields off the registers and text_content does not carry them reliably. Existing rows are
+    # backfilled from the pipelines' CSVs through the rows form of PATCH /api/admin/objects:bulk.
+
+
+def downgrade() -> None:
+    op.drop_index("ix_search_objects_residence_trgm", table_name="search_objects")
+    op.drop_index("ix_search_objects_surname_lower", table_name="search_objects")
+    op.drop_index("ix_search_objects_year", table_name="search_objects")
+    for column in ("year", "residence", "nationality", "patronymic", "given_name", "surname"):
+        op.drop_column("search_objects", column)
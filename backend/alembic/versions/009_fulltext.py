@@ -0,0 +1,47 @@
+"""add jroots text search configuration and generated search_vector column
+
+Revision ID: 009_fulltext
+Revises: 008_person_fields
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "009_fulltext"
+down_revision: Union[str, None] = "008_person_fields"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # Same rules as modernize_name in the ingest scripts: word-final ъ dropped, і/i → и, ѣ → е, ѳ → ф.
+    # ё → е as well, since ledgers and queries use both.
+    op.execute(
+        r"""
+        CREATE OR REPLACE FUNCTION modernize_orthography(content TEXT)
+        RETURNS TEXT AS $$
+            SELECT translate(regexp_replace(content, 'ъ\M', '', 'g'), 'іІiIѣѢѳѲёЁ', 'иИиИеЕфФеЕ');
+        $$ LANGUAGE SQL IMMUTABLE PARALLEL SAFE
+        """
+    )
+    op.execute("CREATE TEXT SEARCH CONFIGURATION jroots (COPY = simple)")
+    op.execute(
+        "ALTER TEXT SEARCH CONFIGURATION jroots "
+        "ALTER MAPPING FOR word, hword, hword_part, asciiword, asciihword, hword_asciipart WITH unaccent, simple"
+    )
+    # Rewrites the table once to fill the column
+    op.execute(
+        "ALTER TABLE search_objects ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('jroots', modernize_orthography(text_content))) STORED"
+    )
+    op.execute("CREATE INDEX ix_search_objects_search_vector ON search_objects USING GIN (search_vector)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_search_objects_search_vector", table_name="search_objects")
+    op.drop_column("search_objects", "search_vector")
+    op.execute("DROP TEXT SEARCH CONFIGURATION jroots")
+    op.execute("DROP FUNCTION modernize_orthography(TEXT)")
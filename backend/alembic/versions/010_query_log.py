@@ -0,0 +1,30 @@
+"""add search_query_log table for warm-up replay
+
+Revision ID: 010_query_log
+Revises: 009_fulltext
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "010_query_log"
+down_revision: Union[str, None] = "009_fulltext"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "search_query_log",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("query", sa.String(200), primary_key=True),
+        sa.Column("mode", sa.String(16), primary_key=True),
+        sa.Column("hits", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("search_query_log")
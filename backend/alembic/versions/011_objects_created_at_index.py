@@ -0,0 +1,23 @@
+"""add (created_at, id) index on search_objects for admin keyset paging
+
+Revision ID: 011_objects_created_at_index
+Revises: 010_query_log
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "011_objects_created_at_index"
+down_revision: Union[str, None] = "010_query_log"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_search_objects_created_at_id", "search_objects", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_search_objects_created_at_id", table_name="search_objects")
@@ -0,0 +1,57 @@
+"""add change_log table fed by triggers on search_objects and images
+
+Revision ID: 012_change_log
+Revises: 011_objects_created_at_index
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "012_change_log"
+down_revision: Union[str, None] = "011_objects_created_at_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRACKED_TABLES = ("search_objects", "images")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "change_log",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("table_name", sa.String(32), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=False),
+        sa.Column("op", sa.String(8), nullable=False),
+        sa.Column("changed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_change_log_changed_at", "change_log", ["changed_at"])
+    # clock_timestamp(), not now(): the feed holds back entries by write time, and now() is the
+    # start of a possibly long transaction
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION log_change() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO change_log (table_name, row_id, op, changed_at)
+            VALUES (TG_TABLE_NAME, CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END, lower(TG_OP),
+                    clock_timestamp());
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in TRACKED_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_change_log AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION log_change()"
+        )
+
+
+def downgrade() -> None:
+    for table in TRACKED_TABLES:
+        op.execute(f"DROP TRIGGER {table}_change_log ON {table}")
+    op.execute("DROP FUNCTION log_change()")
+    op.drop_index("ix_change_log_changed_at", table_name="change_log")
+    op.drop_table("change_log")
@@ -0,0 +1,35 @@
+"""add perceptual hash to images and image_aliases for merged uploads
+
+Revision ID: 013_image_phash
+Revises: 012_change_log
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "013_image_phash"
+down_revision: Union[str, None] = "012_change_log"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled for existing images by ``python -m app.workers.phash_backfill``
+    op.add_column("images", sa.Column("phash", sa.BigInteger(), nullable=True))
+    op.create_index("ix_images_phash", "images", ["phash"])
+    op.create_table(
+        "image_aliases",
+        sa.Column("sha512_hash", sa.String(), primary_key=True),
+        sa.Column("image_id", sa.Integer(), sa.ForeignKey("images.id", ondelete="CASCADE"), nullable=False),
+    )
+    op.create_index("ix_image_aliases_image_id", "image_aliases", ["image_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_image_aliases_image_id", table_name="image_aliases")
+    op.drop_table("image_aliases")
+    op.drop_index("ix_images_phash", table_name="images")
+    op.drop_column("images", "phash")
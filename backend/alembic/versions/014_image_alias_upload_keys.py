@@ -0,0 +1,26 @@
+"""keep the path and key of uploads merged into a near-duplicate image
+
+Revision ID: 014_image_alias_upload_keys
+Revises: 013_image_phash
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "014_image_alias_upload_keys"
+down_revision: Union[str, None] = "013_image_phash"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("image_aliases", sa.Column("image_path", sa.String(), nullable=True))
+    op.add_column("image_aliases", sa.Column("image_key", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("image_aliases", "image_key")
+    op.drop_column("image_aliases", "image_path")
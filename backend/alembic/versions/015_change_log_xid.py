@@ -0,0 +1,59 @@
+"""order the change feed by transaction id and record the prune watermark
+
+Revision ID: 015_change_log_xid
+Revises: 014_image_alias_upload_keys
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "015_change_log_xid"
+down_revision: Union[str, None] = "014_image_alias_upload_keys"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing entries get xid 0, so they sort before everything written from now on in their id order
+    op.add_column("change_log", sa.Column("xid", sa.BigInteger(), server_default="0", nullable=False))
+    op.create_index("ix_change_log_xid_id", "change_log", ["xid", "id"])
+    # pg_current_xact_id() needs Postgres 13
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION log_change() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO change_log (table_name, row_id, op, changed_at, xid)
+            VALUES (TG_TABLE_NAME, CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END, lower(TG_OP),
+                    clock_timestamp(), pg_current_xact_id()::text::bigint);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.create_table(
+        "change_log_watermark",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("xid", sa.BigInteger(), nullable=False),
+        sa.Column("change_id", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("change_log_watermark")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION log_change() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO change_log (table_name, row_id, op, changed_at)
+            VALUES (TG_TABLE_NAME, CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END, lower(TG_OP),
+                    clock_timestamp());
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.drop_index("ix_change_log_xid_id", table_name="change_log")
+    op.drop_column("change_log", "xid")
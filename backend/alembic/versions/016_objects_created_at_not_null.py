@@ -0,0 +1,33 @@
+"""make search_objects.created_at NOT NULL for admin keyset paging
+
+Revision ID: 016_objects_created_at_not_null
+Revises: 015_change_log_xid
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "016_objects_created_at_not_null"
+down_revision: Union[str, None] = "015_change_log_xid"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The keyset cursor compares (created_at, id); a NULL would drop the row from every page. Rows
+    # of unknown age sort as the oldest.
+    op.execute("UPDATE search_objects SET created_at = TIMESTAMP '1970-01-01' WHERE created_at IS NULL")
+    op.alter_column(
+        "search_objects", "created_at",
+        existing_type=sa.DateTime(), existing_server_default=sa.func.now(), nullable=False,
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "search_objects", "created_at",
+        existing_type=sa.DateTime(), existing_server_default=sa.func.now(), nullable=True,
+    )
@@ -8,6 +8,19 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     admin_password: str
     database_url: str
+    # Optional streaming replica for read-only endpoints (search, sources, thumbnails)
+    database_read_url: str = ""
+    read_your_writes_seconds: float = 10.0
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_statement_timeout_ms: int = 0
+    db_pgbouncer: bool = False
+    db_instrumentation: bool = False
+    db_slow_query_ms: float = 200.0
+    db_explain_slow_queries: bool = True
+    db_repeated_statement_warn: int = 10
     cors_origins: str = "http://localhost:5173"
     frontend_url: str = "http://localhost:5173"
     telegram_bot_token: str = ""
@@ -20,8 +33,42 @@ class Settings(BaseSettings):
     media_path: str = "/app/media"
     access_token_expire_minutes: int = 60 * 24
     telegram_webhook_secret: str = ""
+    telegram_prewarm_chat_id: str = ""
+    telegram_photo_max_dim: int = 1280
     max_upload_size_mb: int = 50
+    near_duplicate_distance: int = 4
+    merge_near_duplicate_images: bool = False
     cdn_base: str = ""
+    cdn_purge_backend: str = ""
+    cdn_purge_api_key: str = ""
+    metrics_token: str = ""
+    metrics_allowed_networks: str = "127.0.0.1/32,::1/128"
+    suggest_rebuild_seconds: int = 600
+    query_log_flush_seconds: float = 30.0
+    query_log_days: int = 7
+    warmup_budget_seconds: float = 5.0
+    warmup_queries: int = 50
+    change_log_days: int = 30
+    log_prune_interval_seconds: float = 3600.0
+    export_settle_seconds: float = 60.0
+    purchase_cache_ttl_seconds: int = 60
+    purchase_cache_max_users: int = 10000
+    source_cache_ttl_seconds: int = 300
+    # memory:// counts per worker; e.g. redis://redis:6379/1 shares counters between workers
+    rate_limit_storage_uri: str = "memory://"
+    # Reverse proxies whose X-Forwarded-For is trusted for the client address (IPs or CIDRs, or "*")
+    forwarded_allow_ips: str = "127.0.0.1"
+    # Token budgets per IP and per user, see app.rate_limit for costs
+    rate_limit_search: str = "240/minute"
+    rate_limit_images: str = "120/minute"
+    outbox_poll_interval_seconds: float = 2.0
+    outbox_batch_size: int = 20
+    outbox_max_attempts: int = 8
+    outbox_backoff_base_seconds: float = 5.0
+    outbox_backoff_max_seconds: float = 3600.0
+    outbox_lease_seconds: float = 300.0
+    outbox_email_rate_per_second: float = 2.0
+    outbox_telegram_rate_per_second: float = 1.0
 
     model_config = {
         "env_file": ".env",
@@ -1,20 +1,191 @@
+import os
+import time
+import uuid
 from collections.abc import AsyncGenerator
 
+from sqlalchemy import cast, event, exc, literal, select, union_all, values
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.requests import Request
 
-from app.config import get_settings
+from app.config import Settings, get_settings
+from app.metrics import DB_CONNECTIONS_CHECKED_OUT, DB_POOL_WAIT
+from app.query_stats import install as install_query_stats
 
 settings = get_settings()
 
-_engine_kwargs: dict = {"echo": False}
-if "sqlite" not in settings.database_url:
-    _engine_kwargs.update(pool_size=5, max_overflow=10, pool_pre_ping=True)
 
-engine = create_async_engine(settings.database_url, **_engine_kwargs)
+class PoolStats:
+    """Per-process counters for connection checkouts, fed by ``InstrumentedPool``."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        DB_POOL_WAIT.observe(seconds)
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.record_wait(time.perf_counter() - start)
+
+
+def _unique_statement_name() -> str:
+    # PgBouncer in transaction mode can hand us a backend that already has a statement with this name
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def engine_kwargs(config: Settings) -> dict:
+    kwargs: dict = {"echo": False, "poolclass": InstrumentedPool}
+    if "sqlite" in config.database_url:
+        return kwargs
+
+    kwargs.update(
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_timeout=config.db_pool_timeout_seconds,
+        pool_recycle=config.db_pool_recycle_seconds,
+        pool_pre_ping=True,
+    )
+    connect_args: dict = {}
+    if config.db_pgbouncer:
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=_unique_statement_name,
+        )
+    elif config.db_statement_timeout_ms:
+        # PgBouncer rejects startup parameters; set statement_timeout on the role there instead
+        connect_args["server_settings"] = {"statement_timeout": str(config.db_statement_timeout_ms)}
+    if connect_args:
+        kwargs["connect_args"] = connect_args
+    return kwargs
+
+
+engine = create_async_engine(settings.database_url, **engine_kwargs(settings))
+# Without DATABASE_READ_URL the "replica" is the primary itself
+read_engine = (
+    create_async_engine(settings.database_read_url, **engine_kwargs(settings)) if settings.database_read_url else engine
+)
 
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False)
+
+
+def _drop_inherited_pools() -> None:
+    # Creating the engines opens no connections, so gunicorn --preload can build them once in the
+    # master. Should anything connect before the fork anyway, each worker starts with an empty pool
+    # instead of sharing the parent's sockets (close=False leaves those to the parent).
+    for pooled_engine in {engine, read_engine}:
+        pooled_engine.sync_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_drop_inherited_pools)
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_CONNECTIONS_CHECKED_OUT.inc()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    DB_CONNECTIONS_CHECKED_OUT.dec()
+
+
+for _engine in (engine,) if read_engine is engine else (engine, read_engine):
+    if settings.db_instrumentation:
+        install_query_stats(_engine.sync_engine)
+    event.listen(_engine.sync_engine, "checkout", _on_checkout)
+    event.listen(_engine.sync_engine, "checkin", _on_checkin)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+# Set by ReadYourWritesMiddleware after an admin write: until this Unix time the client reads from the primary
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+def reads_from_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints: the replica, unless this client wrote moments ago.
+
+    Never write through it. Replica lag is tolerable for search results, not for an admin checking
+    the edit they just made.
+    """
+    factory = AsyncSessionLocal if reads_from_primary(request) else AsyncReadSessionLocal
+    async with factory() as session:
+        yield session
+
+
+def pool_status() -> dict:
+    pool = engine.sync_engine.pool
+    status = {
+        "pid": os.getpid(),
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "checkouts": pool_stats.checkouts,
+        "timeouts": pool_stats.timeouts,
+        "wait_seconds_total": round(pool_stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(pool_stats.wait_seconds_max, 6),
+    }
+    if read_engine is not engine:
+        read_pool = read_engine.sync_engine.pool
+        status["replica"] = {
+            "size": read_pool.size(),
+            "checked_out": read_pool.checkedout(),
+            "checked_in": read_pool.checkedin(),
+            "overflow": read_pool.overflow(),
+        }
+    return status
+
+
+def dialect_insert(db: AsyncSession, table):
+    """``INSERT`` construct with ``on_conflict_*`` support for the session's dialect."""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+def values_table(db: AsyncSession, name: str, columns: list, rows: list[tuple]):
+    """Inline rows to join against, e.g. ``UPDATE ... FROM`` it.
+
+    Postgres gets ``(VALUES ...) AS name (cols)``; SQLite cannot name the columns of a VALUES alias,
+    so there it is a ``UNION ALL`` of one-row SELECTs with the same columns. Every Postgres value is
+    cast to its column's type: a column that is NULL in every row would otherwise be typed ``text``.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return values(*columns, name=name).data(
+            [tuple(cast(value, col.type) for col, value in zip(columns, row)) for row in rows]
+        )
+    return union_all(*(
+        select(*(literal(value, col.type).label(col.name) for col, value in zip(columns, row))) for row in rows
+    )).subquery(name)
@@ -1,36 +1,45 @@
 from contextlib import asynccontextmanager
 
-import sentry_sdk
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from slowapi.errors import RateLimitExceeded
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 from sqlalchemy import text
 
 from app.config import get_settings
 from app.database import engine
 from app.middleware.logging import LoggingMiddleware
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
 from app.rate_limit import limiter
-from app.routers import admin, auth, images, search, telegram
+from app.routers import admin, auth, images, metrics, search, telegram
+from app.services.query_log import flush_query_log
+from app.services.suggest import start_suggest_index_build, stop_suggest_index_build
+from app.services.warmup import warm_up
 from app.utils.logging_config import setup_logging
 
 settings = get_settings()
 setup_logging(loki_hostname=settings.loki_hostname, environment=settings.environment)
 
 if settings.sentry_dsn:
+    import sentry_sdk
+
     sentry_sdk.init(dsn=settings.sentry_dsn, traces_sample_rate=0.1)
 
 
 @asynccontextmanager
 async def lifespan(application: FastAPI):
-    async with engine.begin() as conn:
-        if settings.environment == "test":
-            from app.models import Base
+    if settings.environment == "test":
+        from app.models import Base
 
+        async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
-        else:
-            await conn.execute(text("SELECT 1"))
+    # Scans every object, so it runs behind the warm-up and traffic rather than before them
+    start_suggest_index_build()
+    await warm_up(lambda db, q, mode: search.search(request=None, q=q, mode=mode, db=db, current_user=None))
     yield
+    await stop_suggest_index_build()
+    await flush_query_log()
 
 
 is_prod = settings.environment not in ("development", "test")
@@ -56,12 +65,17 @@ app.add_middleware(
     allow_headers=["Authorization", "Content-Type"],
 )
 app.add_middleware(LoggingMiddleware)
+if settings.database_read_url:
+    app.add_middleware(ReadYourWritesMiddleware)
+# Outermost, so logging and rate limits see the client behind the proxy rather than the proxy
+app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=settings.forwarded_allow_ips)
 
 app.include_router(search.router)
 app.include_router(admin.router)
 app.include_router(auth.router)
 app.include_router(images.router)
 app.include_router(telegram.router)
+app.include_router(metrics.router)
 
 
 @app.get("/api/health")
@@ -0,0 +1,65 @@
+"""Prometheus metrics.
+
+With several gunicorn workers, set ``PROMETHEUS_MULTIPROC_DIR`` to an empty writable directory
+before start; every worker then writes its samples there and ``/api/metrics`` aggregates them.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "jroots_http_request_duration_seconds",
+    "HTTP request latency by route template and status.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+SEARCH_PHASE_LATENCY = Histogram(
+    "jroots_search_phase_duration_seconds",
+    "Time spent in each search query (count, results, purchases).",
+    ["phase", "mode"],
+    buckets=LATENCY_BUCKETS,
+)
+WATERMARK_RENDER_LATENCY = Histogram(
+    "jroots_watermark_render_seconds",
+    "Watermark render and JPEG encode time.",
+    buckets=LATENCY_BUCKETS,
+)
+IMAGE_BYTES_SERVED = Counter(
+    "jroots_image_bytes_served_total",
+    "Image bytes sent to clients by tier.",
+    ["tier"],
+)
+DB_POOL_WAIT = Histogram(
+    "jroots_db_pool_wait_seconds",
+    "Time spent waiting for a pooled database connection.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_CONNECTIONS_CHECKED_OUT = Gauge(
+    "jroots_db_connections_checked_out",
+    "Database connections currently checked out of the pool.",
+    multiprocess_mode="livesum",
+)
+
+
+def observe_request(method: str, route: str, status: int, duration: float) -> None:
+    REQUEST_LATENCY.labels(method, route, str(status)).observe(duration)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -6,16 +6,18 @@ from urllib.parse import unquote
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from app.database import AsyncSessionLocal
+from app.config import get_settings
+from app.metrics import observe_request
 from app.middleware.trace import trace_id_ctx_var
-from app.services.auth import resolve_user_from_token
+from app.query_stats import QueryStats, track_queries
+from app.services.auth import email_from_token
 
 logger = logging.getLogger("jroots")
 
 
 class LoggingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         trace_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
         trace_id_ctx_var.set(trace_id)
@@ -23,12 +25,21 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         auth_header = request.headers.get("Authorization", "")
         token = auth_header.removeprefix("Bearer ").strip() if auth_header.startswith("Bearer ") else None
 
-        async with AsyncSessionLocal() as db:
-            user = await resolve_user_from_token(token, db)
+        # Decoding the token is enough for the log line; a DB lookup here would hold a second pooled connection
+        user_email = email_from_token(token)
 
-        response = await call_next(request)
+        settings = get_settings()
+        if settings.db_instrumentation:
+            with track_queries() as query_stats:
+                response = await call_next(request)
+            self._report_queries(request, response, query_stats, settings.db_repeated_statement_warn)
+        else:
+            response = await call_next(request)
 
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
+        route = request.scope.get("route")
+        # Label by route template, not raw path, to keep the series count bounded
+        observe_request(request.method, getattr(route, "path", "unmatched"), response.status_code, duration)
         query_params = str(request.query_params)
 
         logger.info(
@@ -36,10 +47,24 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             request.method,
             request.url.path,
             f"?{unquote(query_params)}" if query_params else "",
-            user.email if user else "Anonymous",
+            user_email or "Anonymous",
             response.status_code,
             duration,
         )
 
         response.headers["X-Request-ID"] = trace_id
         return response
+
+    @staticmethod
+    def _report_queries(request: Request, response, query_stats: QueryStats, repeated_warn: int) -> None:
+        logger.info(
+            "%s %s SQL: %d statements in %.1f ms",
+            request.method, request.url.path, query_stats.statements, query_stats.milliseconds,
+        )
+        for statement, count in query_stats.repeated(repeated_warn):
+            logger.warning(
+                "Statement ran %d times in %s %s (N+1?): %s",
+                count, request.method, request.url.path, statement,
+            )
+        response.headers["X-DB-Statements"] = str(query_stats.statements)
+        response.headers["X-DB-Time-Ms"] = f"{query_stats.milliseconds:.1f}"
@@ -0,0 +1,30 @@
+import time
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.config import get_settings
+from app.database import READ_PRIMARY_COOKIE
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    """After a successful admin write, pin the client's reads to the primary for READ_YOUR_WRITES_SECONDS.
+
+    A cookie rather than worker memory, so it holds whichever worker serves the next request.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if (
+            request.method in WRITE_METHODS
+            and request.url.path.startswith("/api/admin/")
+            and response.status_code < 400
+        ):
+            seconds = get_settings().read_your_writes_seconds
+            response.set_cookie(
+                READ_PRIMARY_COOKIE, f"{time.time() + seconds:.3f}",
+                max_age=int(seconds) + 1, path="/api", httponly=True, samesite="lax",
+            )
+        return response
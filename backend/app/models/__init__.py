@@ -1,6 +1,14 @@
 from app.models.base import Base
 from app.models.user import User
-from app.models.image import Image, ImageSource
+from app.models.image import Image, ImageAlias, ImageSource
 from app.models.search_object import SearchObject, ImagePurchase
+from app.models.outbox import OutboxMessage
+from app.models.access_request import ImageAccessRequest
+from app.models.source_stats import SourceStat
+from app.models.phonetic_code import PhoneticCode
+from app.models.query_log import QueryLog
+from app.models.change_log import ChangeLog, ChangeLogWatermark
 
-__all__ = ["Base", "User", "Image", "ImageSource", "SearchObject", "ImagePurchase"]
+__all__ = ["Base", "User", "Image", "ImageAlias", "ImageSource", "SearchObject", "ImagePurchase", "OutboxMessage",
+           "ImageAccessRequest", "SourceStat", "PhoneticCode", "QueryLog", "ChangeLog",
+           "ChangeLogWatermark"]
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Text, ForeignKey, DateTime, func
+from sqlalchemy.orm import relationship
+
+from app.models.base import Base
+
+
+class ImageAccessRequest(Base):
+    __tablename__ = "image_access_requests"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    image_id = Column(Integer, ForeignKey("images.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String(16), nullable=False, default="pending", index=True)
+    caption = Column(Text, nullable=False)
+    chat_id = Column(BigInteger)
+    message_id = Column(Integer)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    decided_at = Column(DateTime(timezone=True))
+    decided_by = Column(String(150))
+
+    user = relationship("User")
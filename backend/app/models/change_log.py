@@ -0,0 +1,46 @@
+from sqlalchemy import DDL, BigInteger, Column, DateTime, Index, Integer, String, event, func
+
+from app.models.base import Base
+
+TRACKED_TABLES = ("search_objects", "images")
+
+
+class ChangeLog(Base):
+    """One row per insert, update or delete of a search object or image, written by triggers.
+
+    The feed is ordered by ``(xid, id)``: the id of the writing transaction, then the sequence.
+    Postgres triggers come from migrations 012 and 015; SQLite (tests) gets equivalent ones below
+    whenever the schema is created, leaving ``xid`` at 0 since its writes are serialized anyway.
+    """
+
+    __tablename__ = "change_log"
+    __table_args__ = (Index("ix_change_log_xid_id", "xid", "id"),)
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    table_name = Column(String(32), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    op = Column(String(8), nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    xid = Column(BigInteger, server_default="0", nullable=False)
+
+
+class ChangeLogWatermark(Base):
+    """A single row holding the newest ``(xid, id)`` position pruned from ``change_log``."""
+
+    __tablename__ = "change_log_watermark"
+
+    id = Column(Integer, primary_key=True)
+    xid = Column(BigInteger, nullable=False)
+    change_id = Column(BigInteger, nullable=False)
+
+
+for _table in TRACKED_TABLES:
+    for _op, _row in (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD")):
+        event.listen(
+            Base.metadata,
+            "after_create",
+            DDL(
+                f"CREATE TRIGGER IF NOT EXISTS {_table}_change_{_op} AFTER {_op.upper()} ON {_table} "
+                f"BEGIN INSERT INTO change_log (table_name, row_id, op) VALUES ('{_table}', {_row}.id, '{_op}'); END"
+            ).execute_if(dialect="sqlite"),
+        )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, LargeBinary, func
+from sqlalchemy import BigInteger, Column, Integer, String, Text, ForeignKey, DateTime, LargeBinary, func
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base
@@ -23,8 +23,22 @@ class Image(Base):
     image_data = Column(LargeBinary, nullable=False)
     thumbnail_data = Column(LargeBinary)
     sha512_hash = Column(String, nullable=False, unique=True)
+    # dHash of the page (app.utils.phash), for near-duplicate detection; NULL until backfilled
+    phash = Column(BigInteger, index=True)
     image_file_path = Column(String, nullable=True)
     thumbnail_file_path = Column(String, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
 
     source = relationship("ImageSource")
+
+
+class ImageAlias(Base):
+    """SHA-512 of an upload merged into a near-duplicate image, so lookups by that file's hash still resolve."""
+
+    __tablename__ = "image_aliases"
+
+    sha512_hash = Column(String, primary_key=True)
+    image_id = Column(Integer, ForeignKey("images.id", ondelete="CASCADE"), nullable=False, index=True)
+    # What the merged upload was filed as, which may differ from the image it was merged into
+    image_path = Column(String)
+    image_key = Column(String)
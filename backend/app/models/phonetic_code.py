@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+
+from app.models.base import Base
+
+
+class PhoneticCode(Base):
+    """Daitch–Mokotoff codes of a search object's name tokens, one row per distinct code."""
+
+    __tablename__ = "search_object_phonetic"
+
+    # Code first: phonetic search probes by code and reads object ids straight off the primary key
+    code = Column(String(6), primary_key=True)
+    search_object_id = Column(
+        Integer, ForeignKey("search_objects.id", ondelete="CASCADE"), primary_key=True, index=True,
+    )
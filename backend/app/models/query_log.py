@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Date, Integer, String
+
+from app.models.base import Base
+
+
+class QueryLog(Base):
+    """First-page search queries per day, aggregated: one row per distinct (query, mode) per day."""
+
+    __tablename__ = "search_query_log"
+
+    day = Column(Date, primary_key=True)
+    query = Column(String(200), primary_key=True)
+    mode = Column(String(16), primary_key=True)
+    hits = Column(Integer, nullable=False, default=0)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, UniqueConstraint, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Index, Integer, String, Text, ForeignKey, DateTime, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from app.models.base import Base
 
@@ -11,11 +12,28 @@ class SearchObject(Base):
     text_content = Column(Text, nullable=False)
     price = Column(Integer, nullable=False)
     image_id = Column(Integer, ForeignKey("images.id", ondelete="SET NULL"))
-    created_at = Column(DateTime, server_default=func.now())
+    # Optional fields from structured batch ingest, used as search filters. Migration 008 adds the
+    # lower(surname) btree and residence trigram indexes the filters rely on.
+    surname = Column(String(255))
+    given_name = Column(String(255))
+    patronymic = Column(String(255))
+    nationality = Column(String(64))
+    residence = Column(String(255))
+    year = Column(Integer, index=True)
+    # Full-text document, generated by the database (GIN index from migration 009). Deferred so
+    # result pages never carry it.
+    search_vector = deferred(Column(
+        TSVECTOR().with_variant(Text(), "sqlite"),
+        Computed("to_tsvector('jroots', modernize_orthography(text_content))", persisted=True),
+    ))
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     image = relationship("Image")
 
+    # Admin listing pages by keyset on (created_at, id), newest first
+    __table_args__ = (Index("ix_search_objects_created_at_id", "created_at", "id"),)
+
 
 class ImagePurchase(Base):
     __tablename__ = "image_purchases"
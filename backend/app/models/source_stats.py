@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, DateTime, func
+
+from app.models.base import Base
+
+NO_SOURCE = 0
+
+
+class SourceStat(Base):
+    """Search objects per archive source, kept current on ingest. ``NO_SOURCE`` counts images without one."""
+
+    __tablename__ = "source_stats"
+
+    image_source_id = Column(Integer, primary_key=True, autoincrement=False)
+    object_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
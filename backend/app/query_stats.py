@@ -0,0 +1,91 @@
+"""Opt-in SQL instrumentation (``DB_INSTRUMENTATION=true``).
+
+Cursor-level event hooks count statements and DB time for the current request, log slow queries
+together with their plan, and flag statements repeated within one request (usually an N+1).
+Counting is scoped with ``track_queries()``; the logging middleware opens a scope per request.
+"""
+import logging
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import get_settings
+
+logger = logging.getLogger("jroots")
+
+
+@dataclass
+class QueryStats:
+    statements: int = 0
+    seconds: float = 0.0
+    by_statement: Counter = field(default_factory=Counter)
+
+    @property
+    def milliseconds(self) -> float:
+        return self.seconds * 1000
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(sql, n) for sql, n in self.by_statement.most_common() if n >= threshold]
+
+
+query_stats_ctx_var: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect statements executed in this context (including tasks spawned from it)."""
+    stats = QueryStats()
+    token = query_stats_ctx_var.set(stats)
+    try:
+        yield stats
+    finally:
+        query_stats_ctx_var.reset(token)
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    # Raw DBAPI cursor, so the EXPLAIN itself does not go through these hooks
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start
+    stats = query_stats_ctx_var.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
+        stats.by_statement[statement] += 1
+
+    settings = get_settings()
+    if elapsed * 1000 < settings.db_slow_query_ms:
+        return
+    plan = ""
+    if settings.db_explain_slow_queries and not executemany and statement.lstrip().upper().startswith("SELECT"):
+        try:
+            plan = _explain(conn, statement, parameters)
+        except Exception:
+            logger.debug("EXPLAIN failed for slow query", exc_info=True)
+    logger.warning("Slow query (%.1f ms): %s\n%s", elapsed * 1000, statement, plan)
+
+
+def install(engine: Engine) -> None:
+    """Attach the hooks to a (sync) engine. Safe to call more than once."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
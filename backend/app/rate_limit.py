@@ -1,4 +1,73 @@
+"""Request rate limits.
+
+Counters live in RATE_LIMIT_STORAGE_URI. The default, ``memory://``, is per worker, so N gunicorn
+workers allow N times the configured rate; point it at Redis to share one set of counters. Client
+addresses come from X-Forwarded-For as rewritten by ``ProxyHeadersMiddleware`` (see main.py), so
+every visitor behind the reverse proxy gets a bucket of their own.
+
+``limiter`` holds the flat per-IP limits on the auth endpoints. CPU-heavy endpoints spend from a
+budget instead with ``charge``: every request costs tokens according to the work it causes, and
+is counted against the caller's IP and, when logged in, the user as well, so neither rotating
+addresses nor sharing one between accounts gets around it.
+"""
+import time
+
+from fastapi import HTTPException, Request
+from limits import parse
+from limits.storage import storage_from_string
+from limits.aio.strategies import FixedWindowRateLimiter
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-limiter = Limiter(key_func=get_remote_address)
+from app.config import get_settings
+from app.models import User
+
+limiter = Limiter(key_func=get_remote_address, storage_uri=get_settings().rate_limit_storage_uri)
+
+# Relative cost of a search page by mode; trigram and Levenshtein scoring dominate fuzzy searches
+SEARCH_MODE_COST = {"exact": 1, "fulltext": 1, "phonetic": 2, "fuzzy": 4}
+# Each further 100 rows skipped adds the base cost again: deep pages sort the whole match set
+SEARCH_DEPTH_STEP = 100
+IMAGE_COST = 1
+WATERMARK_COST = 5
+
+_budgets: FixedWindowRateLimiter | None = None
+
+
+def search_cost(mode: str, skip: int, facets: bool) -> int:
+    return SEARCH_MODE_COST[mode] * (1 + skip // SEARCH_DEPTH_STEP) + facets
+
+
+def _get_budgets() -> FixedWindowRateLimiter:
+    global _budgets
+    if _budgets is None:
+        uri = get_settings().rate_limit_storage_uri
+        # The async storages are registered under an "async+" prefix of the same scheme. Redis goes
+        # through redis-py, which the sync limiter needs anyway, rather than the default coredis.
+        options = {"implementation": "redispy"} if uri.startswith("redis") else {}
+        _budgets = FixedWindowRateLimiter(storage_from_string(f"async+{uri}", **options))
+    return _budgets
+
+
+def reset_budgets() -> None:
+    global _budgets
+    _budgets = None
+
+
+async def charge(request: Request | None, user: User | None, budget: str, limit: str, cost: int) -> None:
+    """Spend ``cost`` tokens of ``budget`` (e.g. ``"120/minute"``); 429 with Retry-After once it runs out.
+
+    Admins, and internal calls such as the warm-up replay that have no request, are not limited.
+    """
+    if request is None or (user is not None and user.is_admin):
+        return
+    item = parse(limit)
+    budgets = _get_budgets()
+    keys = [f"ip:{get_remote_address(request)}"]
+    if user is not None:
+        keys.append(f"user:{user.id}")
+    for key in keys:
+        if not await budgets.hit(item, budget, key, cost=cost):
+            stats = await budgets.get_window_stats(item, budget, key)
+            retry_after = max(1, int(stats.reset_time - time.time()) + 1)
+            raise HTTPException(status_code=429, detail="Too many requests", headers={"Retry-After": str(retry_after)})
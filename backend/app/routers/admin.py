@@ -1,19 +1,32 @@
+import base64
 import logging
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from pydantic import BaseModel
-from sqlalchemy import select, func, update
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from pydantic import BaseModel, Field, model_validator
+from sqlalchemy import select, func, text, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from starlette import status
+from starlette.responses import StreamingResponse
 
 from app.config import get_settings
-from app.database import get_db
-from app.models import SearchObject, Image, ImageSource, User
-from app.schemas import SearchObjectSchema, PaginatedResults, ImageSchema, ImageSourceSchema
+from app.database import get_db, pool_status
+from app.models import SearchObject, Image, ImageAccessRequest, ImageSource, User
+from app.schemas import AdminObjectPage, SearchObjectSchema, PersonFields, ImageSchema, ImageSourceSchema
+from app.services.access import decide_access_requests
 from app.services.auth import get_current_admin
-from app.services.image import save_unique_image, create_search_object
+from app.services.bulk_edit import update_object_rows, update_objects_where
+from app.services.cdn import thumbnail_url, unversioned_thumbnail_url
+from app.services.change_feed import CursorPruned, read_changes
+from app.services.dedup import near_duplicate_report
+from app.services.export import csv_chunks, export_statement, ndjson_chunks
+from app.services.image import image_by_sha512, save_unique_image, create_search_object
+from app.services.outbox import enqueue_cdn_purge
+from app.services.phonetic import index_phonetic_codes
+from app.services.source_stats import adjust_source_count
+from app.services.suggest import record_object_change
 
 logger = logging.getLogger("jroots")
 
@@ -30,11 +43,7 @@ async def create_image(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_admin),
 ):
-    existing = await db.scalar(
-        select(Image)
-        .options(selectinload(Image.source))
-        .where(Image.sha512_hash == image_file_sha512)
-    )
+    existing = await db.scalar(image_by_sha512(image_file_sha512))
     if existing:
         return existing
 
@@ -54,6 +63,12 @@ async def create_object(
     image_source_id: Optional[int] = Form(None),
     image_file: Optional[UploadFile] = File(None),
     image_file_sha512: Optional[str] = Form(None),
+    surname: Optional[str] = Form(None),
+    given_name: Optional[str] = Form(None),
+    patronymic: Optional[str] = Form(None),
+    nationality: Optional[str] = Form(None),
+    residence: Optional[str] = Form(None),
+    year: Optional[int] = Form(None),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_admin),
 ):
@@ -75,39 +90,142 @@ async def create_object(
     image = await create_image(
         image_path, image_key, image_source_id, image_file, image_file_sha512, db, user,
     )
-    return await create_search_object(db, text_content, image.id, price=price)
+    person = PersonFields(
+        surname=surname, given_name=given_name, patronymic=patronymic,
+        nationality=nationality, residence=residence, year=year,
+    )
+    return await create_search_object(db, text_content, image.id, price=price, person=person)
+
+
+def _encode_cursor(created_at: datetime, object_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{object_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, object_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(object_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _estimated_object_count(db: AsyncSession) -> int | None:
+    """Planner estimate from the last ANALYZE; None when there is none (or not on Postgres)."""
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    estimate = await db.scalar(text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'search_objects'::regclass"))
+    return estimate if estimate is not None and estimate >= 0 else None
 
 
-@router.get("/objects", response_model=PaginatedResults)
+@router.get("/objects", response_model=AdminObjectPage)
 async def list_objects(
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 20,
+    source_id: Optional[int] = None,
+    text_query: Optional[str] = Query(None, alias="text"),
+    image_path_prefix: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_admin),
 ):
     limit = min(limit, 100)
-    total = await db.scalar(select(func.count()).select_from(SearchObject))
 
-    result = await db.execute(
-        select(SearchObject)
-        .options(selectinload(SearchObject.image).selectinload(Image.source))
-        .offset(skip)
-        .limit(limit)
-        .order_by(SearchObject.created_at.desc())
+    filters = []
+    if source_id is not None:
+        filters.append(Image.image_source_id == source_id)
+    if text_query:
+        filters.append(SearchObject.text_content.ilike(f"%{text_query}%"))
+    if image_path_prefix:
+        filters.append(Image.image_path.startswith(image_path_prefix, autoescape=True))
+    if created_from:
+        filters.append(SearchObject.created_at >= created_from)
+    if created_to:
+        filters.append(SearchObject.created_at < created_to)
+
+    # Totals only with the first page; the dashboard keeps it while paging on
+    total, total_is_estimate = None, False
+    if cursor is None:
+        if not filters:
+            total = await _estimated_object_count(db)
+            total_is_estimate = total is not None
+        if total is None:
+            total = await db.scalar(
+                select(func.count(SearchObject.id)).outerjoin(Image, SearchObject.image_id == Image.id).where(*filters)
+            )
+
+    # Keyset on (created_at, id), served by ix_search_objects_created_at_id; no image blobs
+    stmt = (
+        select(
+            SearchObject.id, SearchObject.text_content, SearchObject.created_at,
+            SearchObject.surname, SearchObject.given_name, SearchObject.patronymic,
+            SearchObject.nationality, SearchObject.residence, SearchObject.year,
+            Image.id.label("image_id"), Image.image_path, Image.image_key, Image.telegram_file_id,
+            Image.sha512_hash, ImageSource.id.label("source_id"), ImageSource.source_name,
+            ImageSource.description.label("source_description"),
+        )
+        .outerjoin(Image, SearchObject.image_id == Image.id)
+        .outerjoin(ImageSource, Image.image_source_id == ImageSource.id)
+        .where(*filters)
+        .order_by(SearchObject.created_at.desc(), SearchObject.id.desc())
+        .limit(limit + 1)
     )
-
-    objects = result.scalars().all()
-    objects_with_urls = []
-
-    for obj in objects:
-        obj_data = SearchObjectSchema.model_validate(obj)
-        if obj.image:
-            obj_data.image_id = obj.image.id
-            cdn = get_settings().cdn_base
-            obj_data.thumbnail_url = f"{cdn}/api/images/{obj.image.id}/thumbnail"
-        objects_with_urls.append(obj_data)
-
-    return {"items": objects_with_urls, "total": total}
+    if cursor is not None:
+        stmt = stmt.where(tuple_(SearchObject.created_at, SearchObject.id) < tuple_(*_decode_cursor(cursor)))
+    rows = (await db.execute(stmt)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    items = []
+    for row in rows:
+        image = None
+        if row.image_id is not None:
+            source = None
+            if row.source_id is not None:
+                source = {"id": row.source_id, "source_name": row.source_name, "description": row.source_description}
+            image = {
+                "id": row.image_id, "image_path": row.image_path, "image_key": row.image_key,
+                "telegram_file_id": row.telegram_file_id, "sha512_hash": row.sha512_hash, "source": source,
+            }
+        items.append({
+            "id": row.id, "text_content": row.text_content, "image": image, "image_id": row.image_id,
+            "thumbnail_url": thumbnail_url(row.image_id, row.sha512_hash) if row.image_id is not None else None,
+            "surname": row.surname, "given_name": row.given_name, "patronymic": row.patronymic,
+            "nationality": row.nationality, "residence": row.residence, "year": row.year,
+        })
+
+    return {"items": items, "total": total, "total_is_estimate": total_is_estimate, "next_cursor": next_cursor}
+
+
+@router.get("/objects/export")
+async def export_objects(
+    format: Literal["csv", "ndjson"] = "csv",
+    source_id: Optional[int] = None,
+    modified_since: Optional[datetime] = None,
+    user: User = Depends(get_current_admin),
+):
+    """Stream every matching object, ordered by id, in constant memory.
+
+    ``X-Export-Started-At`` is the ``modified_since`` to pass next time for an incremental sync.
+    ``updated_at`` is the writing transaction's start time, so a transaction still open now can
+    commit rows stamped earlier than the export; the header is moved back by EXPORT_SETTLE_SECONDS
+    so the next sync picks those up again, at the cost of re-sending some rows.
+    """
+    settle = timedelta(seconds=get_settings().export_settle_seconds)
+    started_at = datetime.now(timezone.utc).replace(tzinfo=None) - settle
+    stmt = export_statement(source_id, modified_since)
+    if format == "csv":
+        body, media_type = csv_chunks(stmt), "text/csv; charset=utf-8"
+    else:
+        body, media_type = ndjson_chunks(stmt), "application/x-ndjson"
+    headers = {
+        "Content-Disposition": f'attachment; filename="objects.{format}"',
+        "X-Export-Started-At": started_at.isoformat(),
+    }
+    return StreamingResponse(body, media_type=media_type, headers=headers)
 
 
 @router.put("/objects/{object_id}", response_model=SearchObjectSchema)
@@ -119,6 +237,12 @@ async def update_object(
     image_key: str = Form(...),
     image_source_id: int | None = Form(None),
     image_file: UploadFile | None = File(None),
+    surname: Optional[str] = Form(None),
+    given_name: Optional[str] = Form(None),
+    patronymic: Optional[str] = Form(None),
+    nationality: Optional[str] = Form(None),
+    residence: Optional[str] = Form(None),
+    year: Optional[int] = Form(None),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_admin),
 ):
@@ -126,15 +250,33 @@ async def update_object(
     if not obj:
         raise HTTPException(status_code=404, detail="Object not found")
 
+    old_text = obj.text_content
     obj.text_content = text_content
     obj.price = price
+    # Person fields come from the ingest pipeline, not from the text: set the ones sent, as create_object does
+    person = PersonFields(
+        surname=surname, given_name=given_name, patronymic=patronymic,
+        nationality=nationality, residence=residence, year=year,
+    )
+    for name, value in person.model_dump(exclude_none=True).items():
+        setattr(obj, name, value)
+    if text_content != old_text:
+        await index_phonetic_codes(db, obj.id, text_content, replace=True)
 
     if image_file:
         image_binary = await image_file.read()
         image = await save_unique_image(db, image_path, image_key, image_source_id, image_binary)
+        if image.id != obj.image_id:
+            await adjust_source_count(db, obj.image_id, -1)
+            await adjust_source_count(db, image.id, 1)
+            # Versioned thumbnail URLs follow the swap by themselves; the per-id ones may be cached
+            enqueue_cdn_purge(db, [
+                unversioned_thumbnail_url(image_id) for image_id in (obj.image_id, image.id) if image_id is not None
+            ])
         obj.image_id = image.id
 
     await db.commit()
+    record_object_change(old_text, text_content)
     await db.refresh(obj, attribute_names=["image"])
 
     if obj.image:
@@ -152,11 +294,98 @@ async def delete_object(
     obj = await db.get(SearchObject, object_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Object not found")
+    await adjust_source_count(db, obj.image_id, -1)
     await db.delete(obj)
     await db.commit()
+    record_object_change(obj.text_content, None)
     return {"status": "deleted", "object_id": object_id}
 
 
+class BulkObjectRow(PersonFields):
+    id: int
+    text_content: str | None = None
+    price: int | None = None
+
+
+class BulkObjectFilter(BaseModel):
+    ids: list[int] | None = None
+    source_id: int | None = None
+    image_id: int | None = None
+    image_path_prefix: str | None = None
+    text: str | None = None
+
+
+class BulkObjectChanges(BaseModel):
+    price: int | None = None
+    image_id: int | None = None
+
+
+class BulkObjectEditRequest(BaseModel):
+    """Either per-object ``rows`` or a ``where`` filter with the ``changes`` to apply to every match."""
+
+    rows: list[BulkObjectRow] | None = Field(None, max_length=10_000)
+    where: BulkObjectFilter | None = None
+    changes: BulkObjectChanges | None = None
+
+    @model_validator(mode="after")
+    def one_form(self):
+        if (self.rows is None) == (self.where is None):
+            raise ValueError("Send either rows or where")
+        if self.where is not None and (
+            self.changes is None or (self.changes.price is None and self.changes.image_id is None)
+        ):
+            raise ValueError("where needs changes")
+        return self
+
+
+def _bulk_filter_conditions(where: BulkObjectFilter) -> list:
+    conditions = []
+    if where.ids is not None:
+        conditions.append(SearchObject.id.in_(where.ids))
+    if where.source_id is not None:
+        conditions.append(SearchObject.image_id.in_(select(Image.id).where(Image.image_source_id == where.source_id)))
+    if where.image_id is not None:
+        conditions.append(SearchObject.image_id == where.image_id)
+    if where.image_path_prefix:
+        conditions.append(SearchObject.image_id.in_(
+            select(Image.id).where(Image.image_path.startswith(where.image_path_prefix, autoescape=True))
+        ))
+    if where.text:
+        conditions.append(SearchObject.text_content.ilike(f"%{where.text}%"))
+    return conditions
+
+
+@router.patch("/objects:bulk")
+async def bulk_edit_objects(
+    body: BulkObjectEditRequest,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_admin),
+):
+    """Apply many corrections in one transaction, keeping phonetic codes and source counts current."""
+    if body.rows is not None:
+        ids = [row.id for row in body.rows]
+        if len(ids) != len(set(ids)):
+            raise HTTPException(status_code=400, detail="Duplicate object ids")
+        updated, changes = await update_object_rows(
+            db,
+            [
+                (row.id, row.text_content, row.price, *(getattr(row, name) for name in PersonFields.model_fields))
+                for row in body.rows
+            ],
+        )
+        await db.commit()
+        for old_text, new_text in changes.values():
+            record_object_change(old_text, new_text)
+        return {"updated": updated, "text_changed": len(changes)}
+
+    conditions = _bulk_filter_conditions(body.where)
+    if not conditions:
+        raise HTTPException(status_code=400, detail="where needs at least one filter")
+    updated = await update_objects_where(db, conditions, body.changes.price, body.changes.image_id)
+    await db.commit()
+    return {"updated": updated, "text_changed": 0}
+
+
 class BulkUpdateKeyRequest(BaseModel):
     image_path: str
     old_key: str
@@ -178,6 +407,19 @@ async def bulk_update_image_key(
     return {"updated": result.rowcount}
 
 
+@router.get("/images/near-duplicates")
+async def list_near_duplicate_images(
+    max_distance: Optional[int] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_admin),
+):
+    """Groups of images whose perceptual hashes are within ``max_distance`` bits, largest first."""
+    if max_distance is None:
+        max_distance = get_settings().near_duplicate_distance
+    return await near_duplicate_report(db, min(max_distance, 16), min(limit, 1000))
+
+
 @router.patch("/images/{image_id}", response_model=ImageSchema)
 async def update_image(
     image_id: int,
@@ -197,9 +439,15 @@ async def update_image(
         image.image_key = image_key
     if image_path is not None:
         image.image_path = image_path
-    if image_source_id is not None:
+    if image_source_id is not None and image_source_id != image.image_source_id:
+        # The image's objects move to the new source's facet count
+        object_count = await db.scalar(select(func.count(SearchObject.id)).where(SearchObject.image_id == image.id))
+        await adjust_source_count(db, image.id, -object_count)
         image.image_source_id = image_source_id
+        await db.flush()
+        await adjust_source_count(db, image.id, object_count)
 
+    enqueue_cdn_purge(db, [unversioned_thumbnail_url(image.id)])
     await db.commit()
     await db.refresh(image, attribute_names=["source"])
     return image
@@ -212,3 +460,65 @@ async def list_image_sources(
 ):
     result = await db.execute(select(ImageSource))
     return result.scalars().all()
+
+
+@router.get("/access-requests")
+async def list_access_requests(
+    status_filter: Literal["pending", "approved", "denied"] = "pending",
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_admin),
+):
+    result = await db.execute(
+        select(ImageAccessRequest)
+        .options(selectinload(ImageAccessRequest.user))
+        .where(ImageAccessRequest.status == status_filter)
+        .order_by(ImageAccessRequest.id)
+        .limit(min(limit, 1000))
+    )
+    return [
+        {
+            "id": r.id,
+            "user_id": r.user_id,
+            "user_email": r.user.email,
+            "image_id": r.image_id,
+            "status": r.status,
+            "created_at": r.created_at,
+        }
+        for r in result.scalars().all()
+    ]
+
+
+class BulkAccessDecisionRequest(BaseModel):
+    action: Literal["approve", "deny"]
+    request_ids: list[int] | None = None  # None means every pending request
+
+
+@router.post("/access-requests/decide")
+async def decide_access_requests_bulk(
+    body: BulkAccessDecisionRequest,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_admin),
+):
+    decided = await decide_access_requests(db, body.action == "approve", user.username, body.request_ids)
+    return {"action": body.action, "decided": len(decided), "request_ids": [r.id for r in decided]}
+
+
+@router.get("/changes")
+async def list_changes(
+    since: str = Query("0", pattern=r"^(\d+\.)?\d+$"),
+    limit: int = 1000,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_admin),
+):
+    """Search objects and images changed after cursor ``since``; pass back ``cursor`` to continue."""
+    try:
+        return await read_changes(db, since, min(limit, 10_000))
+    except CursorPruned as exc:
+        raise HTTPException(status_code=410, detail=f"{exc}; re-export and continue from {exc.resume_from}")
+
+
+@router.get("/pool-stats")
+async def get_pool_stats(user: User = Depends(get_current_admin)):
+    """Connection pool state of the worker that served this request."""
+    return pool_status()
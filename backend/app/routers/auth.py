@@ -1,6 +1,6 @@
 import logging
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
@@ -20,7 +20,7 @@ from app.services.auth import (
     verify_token,
 )
 from app.rate_limit import limiter
-from app.services.email import send_email
+from app.services.outbox import enqueue_email
 
 logger = logging.getLogger("jroots")
 
@@ -33,7 +33,6 @@ async def register_user(
     request: Request,
     data: RegisterRequest,
     db: AsyncSession = Depends(get_db),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
 ):
     if not await verify_hcaptcha(data.captcha_token):
         raise HTTPException(status_code=400, detail="Проверка CAPTCHA не пройдена")
@@ -55,7 +54,15 @@ async def register_user(
         is_verified=False,
     )
 
+    html = f"""
+    <h1>Подтвердите регистрацию</h1>
+    <p>Здравствуйте, {data.username}!</p>
+    <p>Пожалуйста, подтвердите ваш email, перейдя по ссылке ниже:</p>
+    <a href="{verification_url}">Подтвердить Email</a>
+    """
+
     db.add(user)
+    enqueue_email(db, to_email=str(data.email), subject="Подтверждение регистрации", html_content=html)
     try:
         await db.commit()
     except IntegrityError:
@@ -64,19 +71,6 @@ async def register_user(
 
     logger.info("User %s registered with email %s", data.username, data.email)
 
-    html = f"""
-    <h1>Подтвердите регистрацию</h1>
-    <p>Здравствуйте, {data.username}!</p>
-    <p>Пожалуйста, подтвердите ваш email, перейдя по ссылке ниже:</p>
-    <a href="{verification_url}">Подтвердить Email</a>
-    """
-    background_tasks.add_task(
-        send_email,
-        to_email=str(data.email),
-        subject="Подтверждение регистрации",
-        html_content=html,
-    )
-
     return {"message": "Регистрация прошла успешно. Пожалуйста, проверьте вашу почту для подтверждения."}
 
 
@@ -116,7 +110,6 @@ async def forgot_password(
     request: Request,
     data: ForgotPasswordRequest,
     db: AsyncSession = Depends(get_db),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
 ):
     result = await db.execute(select(User).where(User.email == data.email))
     user = result.scalar_one_or_none()
@@ -134,12 +127,8 @@ async def forgot_password(
         <p>Ссылка действительна в течение 1 часа.</p>
         <p>Если вы не запрашивали сброс пароля, проигнорируйте это письмо.</p>
         """
-        background_tasks.add_task(
-            send_email,
-            to_email=str(data.email),
-            subject="Сброс пароля — JRoots",
-            html_content=html,
-        )
+        enqueue_email(db, to_email=str(data.email), subject="Сброс пароля — JRoots", html_content=html)
+        await db.commit()
         logger.info("Password reset requested for %s", data.email)
 
     return {"message": "Если аккаунт с таким email существует, на него будет отправлена ссылка для сброса пароля."}
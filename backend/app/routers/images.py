@@ -4,14 +4,19 @@ import logging
 import os
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.responses import Response, StreamingResponse
+from starlette.responses import RedirectResponse, Response, StreamingResponse
 
-from app.database import get_db
+from app.config import get_settings
+from app.database import get_db, get_read_db
+from app.metrics import IMAGE_BYTES_SERVED, WATERMARK_RENDER_LATENCY
 from app.models import Image, User
+from app.rate_limit import IMAGE_COST, WATERMARK_COST, charge
 from app.services.auth import get_current_user_optional
-from app.services.image import apply_watermark, generate_etag, user_has_access_to_image
+from app.services.cdn import IMMUTABLE_CACHE_CONTROL, thumbnail_path, thumbnail_version
+from app.services.image import apply_watermark, generate_etag
+from app.services.purchase_cache import confirm_purchase, get_purchased_images
 
 logger = logging.getLogger("jroots")
 
@@ -36,6 +41,7 @@ def _load_thumbnail_bytes(image: Image) -> bytes | None:
 
 @router.get("/{image_id}", response_class=StreamingResponse)
 async def get_image(
+    request: Request,
     image_id: int,
     db: AsyncSession = Depends(get_db),
     if_none_match: str | None = Header(default=None),
@@ -52,18 +58,19 @@ async def get_image(
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
 
-    has_access = False
-    if current_user:
-        if current_user.is_admin:
-            has_access = True
-        else:
-            has_access = await user_has_access_to_image(db, current_user.id, image_id)
+    has_access = current_user.is_admin
+    if not has_access:
+        has_access = image_id in await get_purchased_images(db, current_user.id)
+    if not has_access:
+        has_access = await confirm_purchase(db, current_user.id, image_id)
 
     etag = generate_etag(image, has_access)
 
     if if_none_match == etag:
         return Response(status_code=304)
 
+    cost = IMAGE_COST if has_access else WATERMARK_COST
+    await charge(request, current_user, "images", get_settings().rate_limit_images, cost)
     image_bytes = await asyncio.to_thread(_load_image_bytes, image)
 
     headers = {
@@ -77,24 +84,47 @@ async def get_image(
     )
 
     if has_access:
+        IMAGE_BYTES_SERVED.labels("full").inc(len(image_bytes))
         return StreamingResponse(io.BytesIO(image_bytes), media_type="image/jpeg", headers=headers)
 
-    result = await apply_watermark(image_bytes)
-    buffer = io.BytesIO()
-    result.save(buffer, format="JPEG", quality=85)
+    with WATERMARK_RENDER_LATENCY.time():
+        result = await apply_watermark(image_bytes)
+        buffer = io.BytesIO()
+        result.save(buffer, format="JPEG", quality=85)
+    IMAGE_BYTES_SERVED.labels("watermarked").inc(buffer.tell())
     buffer.seek(0)
     return StreamingResponse(buffer, media_type="image/jpeg", headers=headers)
 
 
-@router.get("/{image_id}/thumbnail", response_class=StreamingResponse)
-async def get_thumbnail(image_id: int, db: AsyncSession = Depends(get_db)):
+async def _thumbnail_response(db: AsyncSession, image_id: int, version: str | None) -> Response:
     image = await db.get(Image, image_id)
     if not image:
         raise HTTPException(status_code=404, detail="Thumbnail not found")
 
+    if version is not None and version != thumbnail_version(image.sha512_hash):
+        # An outdated versioned URL: point at the current one, and let the CDN keep that briefly
+        return RedirectResponse(
+            thumbnail_path(image.id, image.sha512_hash), status_code=302,
+            headers={"Cache-Control": "public, max-age=300"},
+        )
+
     thumbnail_bytes = await asyncio.to_thread(_load_thumbnail_bytes, image)
     if not thumbnail_bytes:
         raise HTTPException(status_code=404, detail="Thumbnail not found")
 
-    headers = {"Cache-Control": "public, max-age=86400"}
-    return StreamingResponse(io.BytesIO(thumbnail_bytes), media_type="image/jpeg", headers=headers)
+    IMAGE_BYTES_SERVED.labels("thumbnail").inc(len(thumbnail_bytes))
+    cache_control = "public, max-age=86400" if version is None else IMMUTABLE_CACHE_CONTROL
+    return StreamingResponse(
+        io.BytesIO(thumbnail_bytes), media_type="image/jpeg", headers={"Cache-Control": cache_control},
+    )
+
+
+@router.get("/{image_id}/thumbnail", response_class=StreamingResponse)
+async def get_thumbnail(image_id: int, db: AsyncSession = Depends(get_read_db)):
+    """Unversioned URL kept for older clients; search results link the versioned one."""
+    return await _thumbnail_response(db, image_id, None)
+
+
+@router.get("/{image_id}/thumbnail/{version}", response_class=StreamingResponse)
+async def get_versioned_thumbnail(image_id: int, version: str, db: AsyncSession = Depends(get_read_db)):
+    return await _thumbnail_response(db, image_id, version)
@@ -0,0 +1,43 @@
+import ipaddress
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from starlette.responses import Response
+
+from app.config import get_settings
+from app.metrics import render_metrics
+from app.models import User
+from app.services.auth import get_current_user_optional
+
+logger = logging.getLogger("jroots")
+
+router = APIRouter(prefix="/api", tags=["metrics"])
+
+
+def _client_allowed(request: Request) -> bool:
+    settings = get_settings()
+    if not request.client:
+        return False
+    try:
+        address = ipaddress.ip_address(request.client.host)
+    except ValueError:
+        return False
+    networks = [n.strip() for n in settings.metrics_allowed_networks.split(",") if n.strip()]
+    return any(address in ipaddress.ip_network(network) for network in networks)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(
+    request: Request,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+):
+    settings = get_settings()
+    auth_header = request.headers.get("Authorization", "")
+    token_ok = bool(settings.metrics_token) and auth_header == f"Bearer {settings.metrics_token}"
+    admin_ok = current_user is not None and current_user.is_admin
+    if not (token_ok or admin_ok or _client_allowed(request)):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
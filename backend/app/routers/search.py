@@ -1,16 +1,28 @@
 import logging
 from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import select, func, or_, text, cast, Float, literal, true
+from fastapi import APIRouter, Depends, Header, Request, Response
+from sqlalchemy import select, func, and_, or_, text, cast, Float, literal, true
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload
 
 from app.config import get_settings
-from app.database import get_db
-from app.models import SearchObject, Image, ImageSource, ImagePurchase, User
-from app.schemas import SearchObjectSchema, ImageSourceSchema, PaginatedResults
-from app.services.auth import get_current_user_optional
+from app.database import get_read_db
+from app.metrics import SEARCH_PHASE_LATENCY
+from app.models import SearchObject, Image, PhoneticCode, User
+from app.rate_limit import charge, search_cost
+from app.schemas import (
+    ImageFields, ImageSchema, ImageSourceSchema, PaginatedResults, SearchObjectFields, SearchObjectSchema, Suggestion,
+)
+from app.services.auth import get_current_user_optional_read
+from app.services.cdn import thumbnail_url
+from app.services.purchase_cache import PurchasedImages, get_purchased_images
+from app.services.query_log import record_query
+from app.services.source_cache import get_source_catalog
+from app.services.source_stats import source_counts
+from app.services.suggest import get_suggest_index, suggest_from_db
+from app.utils.fulltext import RANK_NORMALIZATION, ts_match, websearch_query
+from app.utils.soundex import query_code_groups
 
 logger = logging.getLogger("jroots")
 
@@ -19,27 +31,54 @@ router = APIRouter(prefix="/api", tags=["search"])
 WORD_SIMILARITY_THRESHOLD = 0.2
 SIMILARITY_THRESHOLD = 0.3
 
+# Result images are read from the search join; their sources come from the cached catalog
+IMAGE_COLUMNS = (
+    Image.id, Image.image_path, Image.image_key, Image.telegram_file_id, Image.sha512_hash, Image.image_source_id,
+)
+
 
 @router.get("/sources", response_model=list[ImageSourceSchema])
-async def list_sources(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(ImageSource).order_by(ImageSource.source_name)
-    )
-    return result.scalars().all()
+async def list_sources(
+    db: AsyncSession = Depends(get_read_db),
+    if_none_match: str | None = Header(default=None),
+):
+    catalog = await get_source_catalog(db)
+    # Short max-age: other workers and the CDN pick up admin edits by revalidating
+    headers = {"ETag": catalog.etag, "Cache-Control": "public, max-age=300, must-revalidate"}
+    if if_none_match == catalog.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=catalog.body, media_type="application/json", headers=headers)
+
+
+@router.get("/suggest", response_model=list[Suggestion])
+async def suggest(q: str, limit: int = 10, db: AsyncSession = Depends(get_read_db)):
+    limit = min(limit, 50)
+    index = get_suggest_index()
+    completions = index.complete(q, limit) if index is not None else await suggest_from_db(db, q, limit)
+    return [{"text": text, "count": count} for text, count in completions]
 
 
 @router.get("/search", response_model=PaginatedResults)
 async def search(
+    request: Request,
     q: str,
     skip: int = 0,
     limit: int = 20,  # capped at 100 below
     source_id: Optional[int] = None,
     sort: Literal["relevance", "date"] = "relevance",
-    mode: Literal["fuzzy", "exact"] = "fuzzy",
-    db: AsyncSession = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user_optional),
+    mode: Literal["fuzzy", "exact", "phonetic", "fulltext"] = "fuzzy",
+    facets: bool = False,
+    surname: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    residence: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Optional[User] = Depends(get_current_user_optional_read),
 ):
     limit = min(limit, 100)
+    await charge(request, current_user, "search", get_settings().rate_limit_search, search_cost(mode, skip, facets))
+    if skip == 0:
+        record_query(q, mode)  # replayed on worker start to warm caches
     like_query = f"%{q}%"
 
     like_conditions = or_(
@@ -65,30 +104,75 @@ async def search(
         )
         lev_score = 1.0 - cast(lev_dist, Float) / q_len
         relevance = func.greatest(word_sim, key_sim, path_sim, lev_score).label("relevance")
+    elif mode == "phonetic" and (code_groups := query_code_groups(q)):
+        # Every query name must share a Daitch–Mokotoff code with the record: one index probe per name
+        filter_conditions = and_(*(
+            SearchObject.id.in_(select(PhoneticCode.search_object_id).where(PhoneticCode.code.in_(sorted(codes))))
+            for codes in code_groups
+        ))
+        # Among sound-alikes, closer spellings first
+        relevance = func.word_similarity(q, SearchObject.text_content).label("relevance")
+    elif mode == "fulltext" and q.strip():
+        # Every word (or phrase, or alternative) through the GIN index instead of scanning text
+        ts_query = websearch_query(q)
+        filter_conditions = ts_match(SearchObject.search_vector, ts_query)
+        relevance = func.ts_rank_cd(SearchObject.search_vector, ts_query, RANK_NORMALIZATION).label("relevance")
     else:
+        # Exact, a blank full-text query, or a phonetic query without any name to code (a year, an archive key)
         filter_conditions = like_conditions
         relevance = literal(1.0).label("relevance")
 
+    # Structured-field filters narrow candidates through their own indexes before any scoring
+    person_filters = []
+    if surname:
+        person_filters.append(func.lower(SearchObject.surname) == surname.strip().lower())
+    if year_from is not None:
+        person_filters.append(SearchObject.year >= year_from)
+    if year_to is not None:
+        person_filters.append(SearchObject.year <= year_to)
+    if residence:
+        person_filters.append(SearchObject.residence.ilike(f"%{residence.strip()}%"))
+    if person_filters:
+        filter_conditions = and_(*person_filters, filter_conditions)
+
     source_filter = Image.image_source_id == source_id if source_id else true()
 
-    total = await db.scalar(
-        select(func.count(SearchObject.id)).join(Image).where(filter_conditions, source_filter)
-    )
+    facet_counts = None
+    with SEARCH_PHASE_LATENCY.labels("count", mode).time():
+        if facets and not q.strip() and not person_filters:
+            # Everything matches an empty query; the maintained per-source counts answer it without a scan
+            facet_counts = await source_counts(db)
+        elif facets:
+            # Counts for every source in the same pass; the selected source's count is the total
+            grouped = await db.execute(
+                select(Image.image_source_id, func.count(SearchObject.id))
+                .join(Image)
+                .where(filter_conditions)
+                .group_by(Image.image_source_id)
+            )
+            facet_counts = dict(grouped.all())
+        else:
+            total = await db.scalar(
+                select(func.count(SearchObject.id)).join(Image).where(filter_conditions, source_filter)
+            )
+    if facet_counts is not None:
+        total = facet_counts.get(source_id, 0) if source_id else sum(facet_counts.values())
 
     if sort == "date":
         order = [SearchObject.created_at.desc(), SearchObject.id.asc()]
     else:
         order = [text("relevance DESC"), SearchObject.id.asc()]
 
-    results = await db.execute(
-        select(SearchObject, relevance)
-        .join(Image)
-        .options(selectinload(SearchObject.image).selectinload(Image.source))
-        .where(filter_conditions, source_filter)
-        .order_by(*order)
-        .offset(skip)
-        .limit(limit)
-    )
+    with SEARCH_PHASE_LATENCY.labels("results", mode).time():
+        results = await db.execute(
+            select(SearchObject, relevance, *IMAGE_COLUMNS)
+            .join(Image)
+            .options(raiseload(SearchObject.image))
+            .where(filter_conditions, source_filter)
+            .order_by(*order)
+            .offset(skip)
+            .limit(limit)
+        )
 
     search_objects = results.all()
     objects_with_urls = []
@@ -98,25 +182,30 @@ async def search(
         len(search_objects), q, current_user.email if current_user else "Anonymous",
     )
 
-    purchased_images: set[int] = set()
-    if current_user and current_user.is_verified:
-        result = await db.execute(
-            select(ImagePurchase).where(
-                ImagePurchase.user_id == current_user.id,
-                ImagePurchase.image_id.in_([obj.image.id for obj, _ in search_objects if obj.image]),
-            )
+    purchased_images = PurchasedImages(())
+    if current_user and current_user.is_verified and not current_user.is_admin:
+        with SEARCH_PHASE_LATENCY.labels("purchases", mode).time():
+            purchased_images = await get_purchased_images(db, current_user.id)
+
+    sources = (await get_source_catalog(db)).by_id if search_objects else {}
+    for row in search_objects:
+        image = ImageSchema(
+            **ImageFields.model_validate(row).model_dump(), source=sources.get(row.image_source_id),
         )
-        purchased_images = {purchase.image_id for purchase in result.scalars().all()}
-
-    for obj, score in search_objects:
-        obj_data = SearchObjectSchema.model_validate(obj, from_attributes=True)
-        if obj.image:
-            obj_data.image_id = obj.image.id
-            cdn = get_settings().cdn_base
-            obj_data.thumbnail_url = f"{cdn}/api/images/{obj.image.id}/thumbnail"
-            if not current_user or (not current_user.is_admin and obj.image.id not in purchased_images):
-                obj_data.image.image_path = "********"
-        obj_data.similarity_score = round(score * 100)
-        objects_with_urls.append(obj_data)
-
-    return {"items": objects_with_urls, "total": total}
+        if not current_user or (not current_user.is_admin and image.id not in purchased_images):
+            image.image_path = "********"
+        objects_with_urls.append(SearchObjectSchema(
+            **SearchObjectFields.model_validate(row.SearchObject).model_dump(),
+            image=image,
+            image_id=image.id,
+            thumbnail_url=thumbnail_url(image.id, image.sha512_hash),
+            similarity_score=round(row.relevance * 100),
+        ))
+
+    response = {"items": objects_with_urls, "total": total}
+    if facet_counts is not None:
+        response["facets"] = [
+            {"source_id": facet_source_id, "count": count}
+            for facet_source_id, count in sorted(facet_counts.items(), key=lambda item: -item[1])
+        ]
+    return response
@@ -9,10 +9,12 @@ from starlette.responses import Response
 
 from app.config import get_settings
 from app.database import get_db
-from app.models import Image, ImagePurchase, User
-from app.schemas import AccessRequest, Update
+from app.models import Image, ImageAccessRequest, User
+from app.schemas import AccessRequest, Message, Update
+from app.services.access import decide_access_requests, decision_text, grant_access, mark_requests_decided
 from app.services.auth import get_current_user_optional
-from app.services.telegram import answer_callback_query, edit_message_caption, send_photo_to_chat
+from app.services.outbox import enqueue_telegram_photo
+from app.services.telegram import answer_callback_query, edit_message_caption
 
 logger = logging.getLogger("jroots")
 
@@ -72,20 +74,13 @@ async def request_access(
         ]
     }
 
-    response = await send_photo_to_chat(image, caption, reply_markup)
-
-    if response.status_code == 200 and not image.telegram_file_id:
-        try:
-            resp_data = response.json()
-            file_id = resp_data["result"]["photo"][-1]["file_id"]
-            image.telegram_file_id = file_id
-            await db.commit()
-            logger.info("Updated image %s with telegram file_id", image.id)
-        except (KeyError, IndexError, TypeError):
-            logger.exception("Failed to extract file_id from Telegram response")
-
-    if response.status_code != 200:
-        raise HTTPException(status_code=500, detail="Не удалось отправить сообщение в Telegram.")
+    access_request = ImageAccessRequest(
+        user_id=current_user.id, image_id=image.id, status="pending", caption=caption,
+    )
+    db.add(access_request)
+    await db.flush()
+    enqueue_telegram_photo(db, image.id, caption, reply_markup, access_request_id=access_request.id)
+    await db.commit()
 
     return {"ok": True}
 
@@ -101,6 +96,9 @@ async def handle_access_decision(
         if x_telegram_bot_api_secret_token != settings.telegram_webhook_secret:
             raise HTTPException(status_code=403, detail="Invalid webhook secret")
 
+    if update.message and update.message.text:
+        return await _handle_admin_command(update.message, db)
+
     if not update.callback_query:
         return Response(status_code=200)
 
@@ -121,8 +119,11 @@ async def handle_access_decision(
 
     if action == "deny":
         logger.info("Denying access for %s to image %d by admin %s", user_email, image_id, admin_user.username)
-        new_text = f"❌ ДОСТУП ОТКЛОНЕН для {user_email} (админом @{admin_user.username})"
-        await _update_access_request_message(callback_query, new_text)
+        user_to_deny = await db.scalar(select(User).where(User.email == user_email))
+        if user_to_deny is not None:
+            await mark_requests_decided(db, user_to_deny.id, image_id, False, admin_user.username)
+            await db.commit()
+        await _update_access_request_message(callback_query, decision_text(False, user_email, admin_user.username))
         return Response(status_code=200)
 
     if action != "approve":
@@ -136,35 +137,45 @@ async def handle_access_decision(
         logger.error("User with email '%s' not found when granting access", user_email)
         return Response(status_code=404)
 
-    existing_purchase_result = await db.execute(
-        select(ImagePurchase).where(
-            ImagePurchase.user_id == user_to_grant_access.id,
-            ImagePurchase.image_id == image_id,
-        )
-    )
-    existing_purchase = existing_purchase_result.scalars().first()
-
-    if existing_purchase:
-        logger.info("Image %d already purchased by user %d", image_id, user_to_grant_access.id)
-    else:
-        new_image_purchase = ImagePurchase(user_id=user_to_grant_access.id, image_id=image_id)
-        db.add(new_image_purchase)
-        logger.info("Created new ImagePurchase for user %d, image %d", user_to_grant_access.id, image_id)
-
     try:
+        granted = await grant_access(db, [(user_to_grant_access.id, image_id)])
+        await mark_requests_decided(db, user_to_grant_access.id, image_id, True, admin_user.username)
         await db.commit()
-        logger.info("Access granted for image %d to user '%s'", image_id, user_to_grant_access.email)
+        if granted:
+            logger.info("Access granted for image %d to user '%s'", image_id, user_to_grant_access.email)
+        else:
+            logger.info("Image %d already purchased by user %d", image_id, user_to_grant_access.id)
     except Exception:
         await db.rollback()
         logger.exception("Database commit failed while granting access")
         raise HTTPException(status_code=500, detail="Failed to save changes.")
 
-    new_text = f"✅ ДОСТУП ПРЕДОСТАВЛЕН для {user_to_grant_access.email} (админом @{admin_user.username})"
+    new_text = decision_text(True, user_to_grant_access.email, admin_user.username)
     await _update_access_request_message(callback_query, new_text)
 
     return Response(status_code=200)
 
 
+ADMIN_COMMANDS = {"/approve_all": True, "/deny_all": False}
+
+
+async def _handle_admin_command(message: Message, db: AsyncSession):
+    """Batch decisions typed into the admin chat: ``/approve_all`` or ``/deny_all``."""
+    settings = get_settings()
+    command = message.text.split()[0].split("@")[0]
+    if command not in ADMIN_COMMANDS or str(message.chat.id) != settings.telegram_chat_id:
+        return Response(status_code=200)
+
+    approved = ADMIN_COMMANDS[command]
+    admin_username = message.from_user.username if message.from_user else None
+    decided = await decide_access_requests(db, approved, admin_username)
+    logger.info("Admin %s ran %s on %d pending requests", admin_username, command, len(decided))
+
+    verb = "Одобрено" if approved else "Отклонено"
+    # Replying with a method in the webhook response saves a separate sendMessage call
+    return {"method": "sendMessage", "chat_id": message.chat.id, "text": f"{verb} запросов: {len(decided)}"}
+
+
 async def _update_access_request_message(callback_query, new_text: str):
     if callback_query.message:
         original_caption = callback_query.message.caption or ""
@@ -1,11 +1,14 @@
-from app.schemas.image import ImageSourceSchema, ImageSchema
-from app.schemas.search import SearchObjectSchema, PaginatedResults
+from app.schemas.image import ImageSourceSchema, ImageFields, ImageSchema
+from app.schemas.search import (
+    AdminObjectPage, SearchObjectFields, SearchObjectSchema, PersonFields, PaginatedResults, SourceFacet, Suggestion,
+)
 from app.schemas.user import RegisterRequest, LoginRequest, ForgotPasswordRequest, ResetPasswordRequest, AccessRequest
 from app.schemas.telegram import TelegramUser, Chat, Message, CallbackQuery, Update
 
 __all__ = [
-    "ImageSourceSchema", "ImageSchema",
-    "SearchObjectSchema", "PaginatedResults",
+    "ImageSourceSchema", "ImageFields", "ImageSchema",
+    "AdminObjectPage", "SearchObjectFields", "SearchObjectSchema", "PersonFields", "PaginatedResults", "SourceFacet",
+    "Suggestion",
     "RegisterRequest", "LoginRequest", "ForgotPasswordRequest", "ResetPasswordRequest", "AccessRequest",
     "TelegramUser", "Chat", "Message", "CallbackQuery", "Update",
 ]
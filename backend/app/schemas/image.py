@@ -9,12 +9,17 @@ class ImageSourceSchema(BaseModel):
     model_config = {"from_attributes": True}
 
 
-class ImageSchema(BaseModel):
+class ImageFields(BaseModel):
+    """An image's own columns, without the source relationship."""
+
     id: int
     image_path: str
     image_key: str
     telegram_file_id: str | None = None
-    source: ImageSourceSchema | None = None
     sha512_hash: str
 
     model_config = {"from_attributes": True}
+
+
+class ImageSchema(ImageFields):
+    source: ImageSourceSchema | None = None
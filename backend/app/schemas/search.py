@@ -3,9 +3,27 @@ from pydantic import BaseModel
 from app.schemas.image import ImageSchema
 
 
-class SearchObjectSchema(BaseModel):
+class PersonFields(BaseModel):
+    """Structured fields of the person a record is about, when the ingest pipeline extracted them."""
+
+    surname: str | None = None
+    given_name: str | None = None
+    patronymic: str | None = None
+    nationality: str | None = None
+    residence: str | None = None
+    year: int | None = None
+
+
+class SearchObjectFields(PersonFields):
+    """A search object's own columns, without the image relationship."""
+
     id: int
     text_content: str
+
+    model_config = {"from_attributes": True}
+
+
+class SearchObjectSchema(SearchObjectFields):
     image: ImageSchema | None = None
     image_id: int | None = None
     thumbnail_url: str | None = None
@@ -14,8 +32,27 @@ class SearchObjectSchema(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class SourceFacet(BaseModel):
+    source_id: int | None
+    count: int
+
+
+class Suggestion(BaseModel):
+    text: str
+    count: int
+
+
 class PaginatedResults(BaseModel):
     items: list[SearchObjectSchema]
     total: int
+    facets: list[SourceFacet] | None = None
 
     model_config = {"from_attributes": True}
+
+
+class AdminObjectPage(BaseModel):
+    items: list[SearchObjectSchema]
+    # Only on the first page; an estimate (planner statistics) when no filter is applied
+    total: int | None = None
+    total_is_estimate: bool = False
+    next_cursor: str | None = None
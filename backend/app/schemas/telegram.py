@@ -17,7 +17,9 @@ class Chat(BaseModel):
 class Message(BaseModel):
     message_id: int
     chat: Chat
+    from_user: Optional[TelegramUser] = Field(default=None, alias="from")
     caption: str | None = None
+    text: str | None = None
 
 
 class CallbackQuery(BaseModel):
@@ -29,4 +31,5 @@ class CallbackQuery(BaseModel):
 
 class Update(BaseModel):
     update_id: int
+    message: Optional[Message] = None
     callback_query: Optional[CallbackQuery] = None
@@ -0,0 +1,101 @@
+import logging
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.database import dialect_insert
+from app.models import ImageAccessRequest, ImagePurchase
+from app.services.outbox import enqueue_caption_edits
+from app.services.purchase_cache import invalidate_purchases_on_commit
+from app.services.telegram import decision_text
+
+logger = logging.getLogger("jroots")
+
+STATUS_PENDING = "pending"
+STATUS_APPROVED = "approved"
+STATUS_DENIED = "denied"
+
+
+async def grant_access(db: AsyncSession, pairs: Iterable[tuple[int, int]]) -> int:
+    """Grant (user_id, image_id) pairs in one ``INSERT ... ON CONFLICT DO NOTHING``.
+
+    Returns the number of new purchases. The caller commits; the purchase cache is invalidated then.
+    """
+    rows = [{"user_id": user_id, "image_id": image_id} for user_id, image_id in sorted(set(pairs))]
+    if not rows:
+        return 0
+    result = await db.execute(
+        dialect_insert(db, ImagePurchase)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["user_id", "image_id"])
+    )
+    invalidate_purchases_on_commit(db, {row["user_id"] for row in rows})
+    return result.rowcount
+
+
+async def mark_requests_decided(
+    db: AsyncSession, user_id: int, image_id: int, approved: bool, decided_by: str | None,
+) -> None:
+    """Close pending requests for a pair decided outside the batch flow (e.g. an inline button)."""
+    await db.execute(
+        update(ImageAccessRequest)
+        .where(
+            ImageAccessRequest.user_id == user_id,
+            ImageAccessRequest.image_id == image_id,
+            ImageAccessRequest.status == STATUS_PENDING,
+        )
+        .values(
+            status=STATUS_APPROVED if approved else STATUS_DENIED,
+            decided_at=datetime.now(timezone.utc),
+            decided_by=decided_by,
+        )
+    )
+
+
+async def decide_access_requests(
+    db: AsyncSession,
+    approved: bool,
+    decided_by: str | None,
+    request_ids: list[int] | None = None,
+) -> list[ImageAccessRequest]:
+    """Approve or deny pending requests (all of them when ``request_ids`` is None) in one transaction.
+
+    Grants go through a single insert; Telegram caption edits are queued in the outbox,
+    one per message, and delivered by the rate-limited dispatcher. Requests whose notification
+    has not gone out yet get no edit: the outbox sends those already closed. The rows are locked
+    so a notification being sent right now finishes storing its message id first.
+    """
+    query = (
+        select(ImageAccessRequest)
+        .options(selectinload(ImageAccessRequest.user))
+        .where(ImageAccessRequest.status == STATUS_PENDING)
+        .order_by(ImageAccessRequest.id)
+        .with_for_update(of=ImageAccessRequest)
+    )
+    if request_ids is not None:
+        query = query.where(ImageAccessRequest.id.in_(request_ids))
+    requests = list((await db.execute(query)).scalars().all())
+    if not requests:
+        return []
+
+    if approved:
+        granted = await grant_access(db, [(r.user_id, r.image_id) for r in requests])
+        logger.info("Granted %d new purchases for %d access requests", granted, len(requests))
+
+    now = datetime.now(timezone.utc)
+    edits = []
+    for access_request in requests:
+        access_request.status = STATUS_APPROVED if approved else STATUS_DENIED
+        access_request.decided_at = now
+        access_request.decided_by = decided_by
+        if access_request.chat_id is not None and access_request.message_id is not None:
+            text = decision_text(approved, access_request.user.email, decided_by)
+            caption = f"{access_request.caption}\n\n---\n{text}"
+            edits.append((access_request.chat_id, access_request.message_id, caption))
+    await enqueue_caption_edits(db, edits)
+
+    await db.commit()
+    return requests
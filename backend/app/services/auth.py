@@ -1,38 +1,44 @@
 import logging
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 
-import httpx
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 import jwt
 from jwt.exceptions import PyJWTError
-from passlib.context import CryptContext
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import User
 
 logger = logging.getLogger("jroots")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 admin_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login")
 user_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login", auto_error=False)
 
 
+@lru_cache
+def _pwd_context():
+    # passlib and bcrypt load on the first login or registration, not at startup
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    return _pwd_context().verify(plain, hashed)
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 
 def _get_admin_hashed_password() -> str:
     settings = get_settings()
-    return pwd_context.hash(settings.admin_password)
+    return _pwd_context().hash(settings.admin_password)
 
 
 def authenticate(user: User | None, username: str, password: str) -> str:
@@ -112,6 +118,18 @@ def verify_reset_token(token: str) -> tuple[str, str]:
         raise HTTPException(status_code=400, detail="Ссылка для сброса пароля истекла или недействительна")
 
 
+def email_from_token(token: Optional[str]) -> Optional[str]:
+    """Subject of a valid token, without touching the database (used for request logging)."""
+    if not token:
+        return None
+    settings = get_settings()
+    try:
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    except PyJWTError:
+        return None
+    return payload.get("sub")
+
+
 async def resolve_user_from_token(token: Optional[str], db: AsyncSession) -> Optional[User]:
     if not token:
         return None
@@ -149,11 +167,21 @@ async def get_current_user_optional(
     return await resolve_user_from_token(token, db)
 
 
+async def get_current_user_optional_read(
+    token: Optional[str] = Depends(user_oauth2_scheme),
+    db: AsyncSession = Depends(get_read_db),
+) -> Optional[User]:
+    # Shares the endpoint's read session (dependencies are cached per request): one connection, not two
+    return await resolve_user_from_token(token, db)
+
+
 async def verify_hcaptcha(token: str) -> bool:
     settings = get_settings()
     if not settings.hcaptcha_secret_key:
         logger.warning("hCaptcha secret key not configured, skipping verification")
         return True
+    import httpx
+
     async with httpx.AsyncClient(timeout=10.0) as client:
         response = await client.post(
             "https://hcaptcha.com/siteverify",
@@ -0,0 +1,89 @@
+"""Set-based admin corrections to search objects.
+
+An edit is a handful of statements however many objects it touches, and keeps the derived search
+data current in the same transaction: phonetic codes for changed text, per-source counts for objects
+moved to another image. Person fields come from the ingest pipelines rather than from the text, so
+corrections carry them explicitly. ``search_vector`` is a generated column and follows on its own. The caller
+commits, then applies the returned text changes to the suggest index.
+"""
+from fastapi import HTTPException
+from sqlalchemy import Integer, String, Text, column, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import values_table
+from app.models import Image, SearchObject
+from app.schemas import PersonFields
+from app.services.phonetic import reindex_phonetic_codes
+from app.services.source_stats import adjust_source_count, subtract_source_counts
+
+# Rows per UPDATE: SQLite's compound SELECT limit, and far under asyncpg's bind parameter cap
+VALUES_CHUNK = 500
+PERSON_COLUMNS = [
+    column(name, Integer if name == "year" else String) for name in PersonFields.model_fields
+]
+
+
+async def update_object_rows(
+    db: AsyncSession, rows: list[tuple],
+) -> tuple[int, dict[int, tuple[str, str]]]:
+    """Apply (id, text_content, price, *person fields) rows with ``UPDATE ... FROM (VALUES ...)``.
+
+    Person fields follow in ``PersonFields`` order; ``None`` leaves any field as is. Returns the number
+    of objects updated and the text changes as id -> (old, new). Unknown ids are a 404 before anything
+    is written.
+    """
+    ids = [row[0] for row in rows]
+    old_texts = dict((await db.execute(
+        select(SearchObject.id, SearchObject.text_content).where(SearchObject.id.in_(ids))
+    )).all())
+    missing = sorted(set(ids) - old_texts.keys())
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Objects not found: {missing}")
+
+    columns = [column("id", Integer), column("text_content", Text), column("price", Integer), *PERSON_COLUMNS]
+    updated = 0
+    for start in range(0, len(rows), VALUES_CHUNK):
+        edits = values_table(db, "edits", columns, rows[start:start + VALUES_CHUNK])
+        result = await db.execute(
+            update(SearchObject)
+            .where(SearchObject.id == edits.c.id)
+            .values({
+                name: func.coalesce(edits.c[name], getattr(SearchObject, name))
+                for name in ("text_content", "price", *PersonFields.model_fields)
+            })
+            .execution_options(synchronize_session=False)
+        )
+        updated += result.rowcount
+
+    changes = {
+        object_id: (old_texts[object_id], text)
+        for object_id, text, *_ in rows
+        if text is not None and text != old_texts[object_id]
+    }
+    await reindex_phonetic_codes(db, {object_id: new for object_id, (_, new) in changes.items()})
+    return updated, changes
+
+
+async def update_objects_where(
+    db: AsyncSession, where: list, price: int | None = None, image_id: int | None = None,
+) -> int:
+    """Set ``price`` and/or ``image_id`` on every object matching ``where``. Returns the number updated.
+
+    Moving objects to another image moves them between sources' counts too: one grouped statement
+    takes them off their current sources, one adds them to the new image's.
+    """
+    values = {}
+    if price is not None:
+        values["price"] = price
+    if image_id is not None:
+        if await db.scalar(select(Image.id).where(Image.id == image_id)) is None:
+            raise HTTPException(status_code=404, detail="Image not found")
+        values["image_id"] = image_id
+        await subtract_source_counts(db, *where)
+
+    result = await db.execute(
+        update(SearchObject).where(*where).values(**values).execution_options(synchronize_session=False)
+    )
+    if image_id is not None:
+        await adjust_source_count(db, image_id, result.rowcount)
+    return result.rowcount
@@ -0,0 +1,81 @@
+"""CDN-facing URLs for image derivatives, and cache purging.
+
+Thumbnail URLs carry a prefix of the image's content hash, so they are served as immutable: a
+different image is a different URL and nothing needs purging. Purges are for the unversioned
+``/api/images/{id}/thumbnail`` URLs that older clients and cached pages still request. They go
+through the outbox (``enqueue_cdn_purge``), so an admin write never waits on the CDN API.
+"""
+import logging
+
+from app.config import get_settings
+
+logger = logging.getLogger("jroots")
+
+THUMBNAIL_VERSION_LENGTH = 16
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def thumbnail_version(sha512_hash: str) -> str:
+    return sha512_hash[:THUMBNAIL_VERSION_LENGTH]
+
+
+def thumbnail_path(image_id: int, sha512_hash: str) -> str:
+    return f"/api/images/{image_id}/thumbnail/{thumbnail_version(sha512_hash)}"
+
+
+def thumbnail_url(image_id: int, sha512_hash: str) -> str:
+    return f"{get_settings().cdn_base}{thumbnail_path(image_id, sha512_hash)}"
+
+
+def unversioned_thumbnail_url(image_id: int) -> str:
+    return f"{get_settings().cdn_base}/api/images/{image_id}/thumbnail"
+
+
+class BunnyPurger:
+    """Purges single URLs through the bunny.net API."""
+
+    API_URL = "https://api.bunny.net/purge"
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+
+    async def purge(self, urls: list[str]) -> None:
+        import httpx
+
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            for url in urls:
+                response = await client.post(self.API_URL, params={"url": url}, headers={"AccessKey": self.api_key})
+                if response.status_code >= 300:
+                    raise RuntimeError(f"Bunny purge error: {response.status_code} {response.text}")
+
+
+class FakePurger:
+    """Records purged URLs instead of calling a CDN, for tests and local runs."""
+
+    def __init__(self):
+        self.purged: list[str] = []
+
+    async def purge(self, urls: list[str]) -> None:
+        self.purged.extend(urls)
+
+
+_purger: BunnyPurger | FakePurger | None = None
+
+
+def get_purger() -> BunnyPurger | FakePurger | None:
+    """The configured CDN_PURGE_BACKEND, or None when purging is off."""
+    global _purger
+    settings = get_settings()
+    if _purger is None:
+        if settings.cdn_purge_backend == "bunny":
+            _purger = BunnyPurger(settings.cdn_purge_api_key)
+        elif settings.cdn_purge_backend == "fake":
+            _purger = FakePurger()
+        elif settings.cdn_purge_backend:
+            logger.error("Unknown CDN_PURGE_BACKEND '%s', purging is off", settings.cdn_purge_backend)
+    return _purger
+
+
+def reset_purger() -> None:
+    global _purger
+    _purger = None
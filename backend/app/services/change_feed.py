@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import BigInteger, Text, cast, delete, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ChangeLog, ChangeLogWatermark
+
+
+class CursorPruned(Exception):
+    """Entries after the consumer's cursor were pruned; it has missed changes and must re-export.
+
+    ``resume_from`` is the oldest cursor that is still complete.
+    """
+
+    def __init__(self, since: str, resume_from: str):
+        super().__init__(f"Changes after {since} were pruned")
+        self.resume_from = resume_from
+
+
+def parse_cursor(cursor: str) -> tuple[int, int]:
+    """``"<xid>.<id>"`` as a position; a bare id (cursors from before xids were recorded) has xid 0."""
+    xid, _, change_id = cursor.rpartition(".")
+    return int(xid or 0), int(change_id)
+
+
+def format_cursor(xid: int, change_id: int) -> str:
+    return f"{xid}.{change_id}"
+
+
+async def read_changes(db: AsyncSession, since: str, limit: int) -> dict:
+    """The next batch of changes after cursor ``since``, compacted to the last change per row.
+
+    Ids come from a sequence at write time, so a transaction still open can commit an id below
+    one already handed out. The feed is therefore ordered by the writing transaction's xid and only
+    serves xids below the snapshot's xmin: every such transaction has ended, and any entry that
+    becomes visible later belongs to a transaction with a higher xid, so it sorts after the cursor.
+
+    Raises ``CursorPruned`` when entries after ``since`` have been pruned.
+    """
+    position = parse_cursor(since)
+    watermark = await db.get(ChangeLogWatermark, 1)
+    if watermark is not None and position < (watermark.xid, watermark.change_id):
+        raise CursorPruned(since, format_cursor(watermark.xid, watermark.change_id))
+
+    stmt = (
+        select(ChangeLog.xid, ChangeLog.id, ChangeLog.table_name, ChangeLog.row_id, ChangeLog.op)
+        .where(tuple_(ChangeLog.xid, ChangeLog.id) > tuple_(*position))
+        .order_by(ChangeLog.xid, ChangeLog.id)
+        .limit(limit + 1)
+    )
+    if db.bind.dialect.name == "postgresql":
+        # xid8 has no cast to bigint, text does
+        xmin = cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+        stmt = stmt.where(ChangeLog.xid < xmin)
+    rows = (await db.execute(stmt)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # Consumers re-read or drop each row, so only its latest operation matters
+    latest = {}
+    for row in rows:
+        latest.pop((row.table_name, row.row_id), None)
+        latest[(row.table_name, row.row_id)] = row.op
+    return {
+        "changes": [{"table": table, "id": row_id, "op": op} for (table, row_id), op in latest.items()],
+        "cursor": format_cursor(rows[-1].xid, rows[-1].id) if rows else format_cursor(*position),
+        "has_more": has_more,
+    }
+
+
+async def prune_change_log(db: AsyncSession, days: int) -> None:
+    """Drop entries older than ``days``, raising the watermark to the newest position dropped."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    newest = (
+        await db.execute(
+            select(ChangeLog.xid, ChangeLog.id)
+            .where(ChangeLog.changed_at < cutoff)
+            .order_by(ChangeLog.xid.desc(), ChangeLog.id.desc())
+            .limit(1)
+        )
+    ).first()
+    if newest is None:
+        return
+    watermark = await db.get(ChangeLogWatermark, 1)
+    if watermark is None:
+        db.add(ChangeLogWatermark(id=1, xid=newest.xid, change_id=newest.id))
+    elif (newest.xid, newest.id) > (watermark.xid, watermark.change_id):
+        watermark.xid, watermark.change_id = newest.xid, newest.id
+    await db.execute(delete(ChangeLog).where(ChangeLog.changed_at < cutoff))
+    await db.commit()
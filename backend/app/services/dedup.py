@@ -0,0 +1,88 @@
+"""Near-duplicate images by perceptual hash.
+
+``save_unique_image`` already reuses byte-identical uploads (same SHA-512). Re-scans and
+re-compressions of the same page differ in bytes but not in dHash, so they are found by Hamming
+distance. At ingest (only with MERGE_NEAR_DUPLICATE_IMAGES) that is a scan computing the distance to
+every hashed image: the ``ix_images_phash`` btree cannot serve a Hamming predicate. The admin report
+loads all hashes into a BK-tree instead.
+
+On Postgres the distance is ``bit_count()``, which needs PostgreSQL 14 or later.
+"""
+import asyncio
+from collections.abc import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models import Image
+from app.utils.phash import BKTree, hamming_distance
+
+
+async def find_near_duplicate(db: AsyncSession, phash: int, max_distance: int) -> Image | None:
+    """The stored image closest to ``phash``, if any is within ``max_distance`` bits. Scans every hashed image."""
+    dialect = db.get_bind().dialect
+    if dialect.name == "postgresql" and dialect.server_version_info and dialect.server_version_info < (14,):
+        raise RuntimeError("MERGE_NEAR_DUPLICATE_IMAGES needs PostgreSQL 14 or later for bit_count()")
+    distance = hamming_distance(Image.phash, phash)
+    return await db.scalar(
+        select(Image)
+        .options(selectinload(Image.source))
+        .where(Image.phash.is_not(None), distance <= max_distance)
+        .order_by(distance, Image.id)
+        .limit(1)
+    )
+
+
+def near_duplicate_groups(hashes: Iterable[tuple[int, int]], max_distance: int) -> list[list[int]]:
+    """Image ids linked by chains of hashes within ``max_distance``; groups of two or more, largest first."""
+    tree = BKTree()
+    parent: dict[int, int] = {}
+
+    def find(image_id: int) -> int:
+        while parent[image_id] != image_id:
+            parent[image_id] = parent[parent[image_id]]
+            image_id = parent[image_id]
+        return image_id
+
+    for image_id, value in hashes:
+        parent[image_id] = image_id
+        for other_id, _ in tree.search(value, max_distance):
+            parent[find(other_id)] = find(image_id)
+        tree.add(value, image_id)
+
+    groups: dict[int, list[int]] = {}
+    for image_id in parent:
+        groups.setdefault(find(image_id), []).append(image_id)
+    return sorted((sorted(ids) for ids in groups.values() if len(ids) > 1), key=lambda ids: (-len(ids), ids[0]))
+
+
+async def near_duplicate_report(db: AsyncSession, max_distance: int, limit: int) -> dict:
+    hashes = (await db.execute(
+        select(Image.id, Image.phash).where(Image.phash.is_not(None)).order_by(Image.id)
+    )).all()
+    groups = await asyncio.to_thread(near_duplicate_groups, hashes, max_distance)
+
+    shown = groups[:limit]
+    ids = [image_id for group in shown for image_id in group]
+    rows = {
+        row.id: row
+        for row in (await db.execute(
+            select(Image.id, Image.image_path, Image.image_key, Image.image_source_id)
+            .where(Image.id.in_(ids))
+        )).all()
+    }
+    return {
+        "hashed_images": len(hashes),
+        "groups_total": len(groups),
+        "groups": [
+            [
+                {
+                    "id": image_id, "image_path": rows[image_id].image_path, "image_key": rows[image_id].image_key,
+                    "source_id": rows[image_id].image_source_id,
+                }
+                for image_id in group
+            ]
+            for group in shown
+        ],
+    }
@@ -1,21 +1,29 @@
 import logging
 
-import certifi
-import httpx
-import sentry_sdk
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_fixed
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_fixed
 
 from app.config import get_settings
 
 logger = logging.getLogger("jroots")
 
 
+def _is_network_error(exc: BaseException) -> bool:
+    # httpx, certifi and sentry are imported on first send, not when the app starts
+    import httpx
+
+    return isinstance(exc, httpx.RequestError)
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_fixed(1),
-    retry=retry_if_exception_type((httpx.ConnectError, httpx.ReadTimeout, httpx.RequestError)),
+    retry=retry_if_exception(_is_network_error),
 )
 async def send_email(to_email: str, subject: str, html_content: str):
+    import certifi
+    import httpx
+    import sentry_sdk
+
     settings = get_settings()
     headers = {
         "Authorization": f"Bearer {settings.resend_api_key}",
@@ -50,6 +58,8 @@ async def send_email(to_email: str, subject: str, html_content: str):
 
 async def _notify_telegram(message: str):
     """Best-effort alert to admin Telegram chat."""
+    import httpx
+
     settings = get_settings()
     if not settings.telegram_bot_token or not settings.telegram_chat_id:
         return
@@ -0,0 +1,76 @@
+"""Streaming dumps of search objects for offline audit and incremental syncs.
+
+Rows come off a server-side cursor (``yield_per``) in batches of ``EXPORT_BATCH`` and are encoded
+one batch at a time, so memory stays flat however large the table is. The export opens its own
+session: the response body is produced after the endpoint has returned.
+"""
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models import Image, SearchObject
+
+EXPORT_BATCH = 2000
+EXPORT_COLUMNS = [
+    "id", "text_content", "price", "image_id", "image_path", "image_key", "source_id",
+    "surname", "given_name", "patronymic", "nationality", "residence", "year", "created_at", "updated_at",
+]
+
+
+def export_statement(source_id: int | None = None, modified_since: datetime | None = None):
+    stmt = (
+        select(
+            SearchObject.id, SearchObject.text_content, SearchObject.price, SearchObject.image_id,
+            Image.image_path, Image.image_key, Image.image_source_id.label("source_id"),
+            SearchObject.surname, SearchObject.given_name, SearchObject.patronymic,
+            SearchObject.nationality, SearchObject.residence, SearchObject.year,
+            SearchObject.created_at, SearchObject.updated_at,
+        )
+        .outerjoin(Image, SearchObject.image_id == Image.id)
+        .order_by(SearchObject.id)
+    )
+    if source_id is not None:
+        stmt = stmt.where(Image.image_source_id == source_id)
+    if modified_since is not None:
+        if modified_since.tzinfo is not None:
+            # Timestamps are stored naive, in UTC
+            modified_since = modified_since.astimezone(timezone.utc).replace(tzinfo=None)
+        stmt = stmt.where(SearchObject.updated_at >= modified_since)
+    return stmt
+
+
+async def _batches(stmt) -> AsyncIterator[list]:
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH))
+        async for batch in result.partitions():
+            yield batch
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def csv_chunks(stmt) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    async for batch in _batches(stmt):
+        writer.writerows([[_value(value) for value in row] for row in batch])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def ndjson_chunks(stmt) -> AsyncIterator[str]:
+    async for batch in _batches(stmt):
+        yield "".join(
+            json.dumps({key: _value(value) for key, value in row._mapping.items()}, ensure_ascii=False) + "\n"
+            for row in batch
+        )
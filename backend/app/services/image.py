@@ -5,15 +5,24 @@ import hmac
 import logging
 import os
 from io import BytesIO
+from typing import TYPE_CHECKING
 
-import PIL
-from PIL import Image as PILImage, ImageDraw, ImageFont, ImageOps
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.config import get_settings
-from app.models import Image, ImagePurchase, SearchObject
+from app.models import Image, ImageAlias, SearchObject
+from app.schemas import PersonFields
+from app.services.dedup import find_near_duplicate
+from app.services.outbox import enqueue_telegram_prewarm
+from app.services.phonetic import index_phonetic_codes
+from app.services.source_stats import adjust_source_count
+from app.services.suggest import record_object_change
+from app.utils.phash import dhash_bytes
+
+if TYPE_CHECKING:
+    from PIL.Image import Image as PILImageType
 
 logger = logging.getLogger("jroots")
 
@@ -21,7 +30,10 @@ logger = logging.getLogger("jroots")
 MAX_WATERMARK_DIM = 1600
 
 
-def _apply_watermark_sync(image_bytes: bytes) -> PILImage.Image:
+# Pillow is imported on first use rather than at startup (see tests/test_import_time.py)
+def _apply_watermark_sync(image_bytes: bytes) -> "PILImageType":
+    from PIL import Image as PILImage, ImageDraw, ImageFont, ImageOps
+
     original = PILImage.open(BytesIO(image_bytes))
     original = ImageOps.exif_transpose(original)
 
@@ -41,7 +53,7 @@ def _apply_watermark_sync(image_bytes: bytes) -> PILImage.Image:
     watermark_text = "JRoots.co"
     opacity = 150
 
-    single_watermark = PIL.Image.new(
+    single_watermark = PILImage.new(
         "RGBA", (font_size * len(watermark_text), font_size + 10), (255, 255, 255, 0)
     )
     single_draw = ImageDraw.Draw(single_watermark)
@@ -60,7 +72,7 @@ def _apply_watermark_sync(image_bytes: bytes) -> PILImage.Image:
     return original.convert("RGB")
 
 
-async def apply_watermark(image_bytes: bytes) -> PILImage.Image:
+async def apply_watermark(image_bytes: bytes) -> "PILImageType":
     return await asyncio.to_thread(_apply_watermark_sync, image_bytes)
 
 
@@ -73,6 +85,8 @@ def generate_etag(image: Image, has_access: bool) -> str:
 
 
 def _create_thumbnail_sync(image_binary: bytes) -> bytes:
+    from PIL import Image as PILImage, ImageOps
+
     original_image = PILImage.open(BytesIO(image_binary))
     original_image = ImageOps.exif_transpose(original_image)
     original_image.thumbnail((200, 200))
@@ -93,6 +107,18 @@ def _save_to_disk(media_path: str, sha512_hash: str, image_binary: bytes, thumbn
     return image_file_path, thumbnail_file_path
 
 
+def image_by_sha512(sha512_hash: str):
+    """The image stored under this file hash, or the one an upload with this hash was merged into."""
+    return (
+        select(Image)
+        .options(selectinload(Image.source))
+        .where(or_(
+            Image.sha512_hash == sha512_hash,
+            Image.id.in_(select(ImageAlias.image_id).where(ImageAlias.sha512_hash == sha512_hash)),
+        ))
+    )
+
+
 async def save_unique_image(
     db: AsyncSession,
     image_path: str,
@@ -102,16 +128,25 @@ async def save_unique_image(
 ) -> Image:
     sha512_hash = hashlib.sha512(image_binary).hexdigest()
 
-    existing_image = await db.execute(
-        select(Image).options(selectinload(Image.source)).where(Image.sha512_hash == sha512_hash)
-    )
+    existing_image = await db.execute(image_by_sha512(sha512_hash))
     existing = existing_image.scalar_one_or_none()
     if existing:
         return existing
 
+    settings = get_settings()
+    phash = await asyncio.to_thread(dhash_bytes, image_binary)
+    if settings.merge_near_duplicate_images:
+        duplicate = await find_near_duplicate(db, phash, settings.near_duplicate_distance)
+        if duplicate is not None:
+            logger.info("Upload %s/%s merged into near-duplicate image %d", image_path, image_key, duplicate.id)
+            db.add(ImageAlias(
+                sha512_hash=sha512_hash, image_id=duplicate.id, image_path=image_path, image_key=image_key,
+            ))
+            await db.commit()
+            return duplicate
+
     thumbnail_binary = await asyncio.to_thread(_create_thumbnail_sync, image_binary)
 
-    settings = get_settings()
     image_file_path, thumbnail_file_path = await asyncio.to_thread(
         _save_to_disk, settings.media_path, sha512_hash, image_binary, thumbnail_binary,
     )
@@ -123,10 +158,14 @@ async def save_unique_image(
         image_data=image_binary,
         thumbnail_data=thumbnail_binary,
         sha512_hash=sha512_hash,
+        phash=phash,
         image_file_path=image_file_path,
         thumbnail_file_path=thumbnail_file_path,
     )
     db.add(new_image)
+    await db.flush()
+    # Upload the Telegram derivative now, so the first access request only sends the file_id
+    enqueue_telegram_prewarm(db, new_image.id)
     await db.commit()
 
     result = await db.execute(
@@ -135,10 +174,17 @@ async def save_unique_image(
     return result.scalar_one()
 
 
-async def create_search_object(db: AsyncSession, text_content: str, image_id: int, price: int = 0) -> SearchObject:
-    obj = SearchObject(text_content=text_content, price=price, image_id=image_id)
+async def create_search_object(
+    db: AsyncSession, text_content: str, image_id: int, price: int = 0, person: PersonFields | None = None,
+) -> SearchObject:
+    fields = person.model_dump(exclude_none=True) if person else {}
+    obj = SearchObject(text_content=text_content, price=price, image_id=image_id, **fields)
     db.add(obj)
+    await db.flush()
+    await index_phonetic_codes(db, obj.id, text_content)
+    await adjust_source_count(db, image_id, 1)
     await db.commit()
+    record_object_change(None, text_content)
 
     result = await db.execute(
         select(SearchObject)
@@ -147,12 +193,3 @@ async def create_search_object(db: AsyncSession, text_content: str, image_id: in
     )
     return result.scalar_one()
 
-
-async def user_has_access_to_image(db: AsyncSession, user_id: int, image_id: int) -> bool:
-    result = await db.execute(
-        select(ImagePurchase).where(
-            ImagePurchase.user_id == user_id,
-            ImagePurchase.image_id == image_id,
-        )
-    )
-    return result.scalars().first() is not None
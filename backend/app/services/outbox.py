@@ -0,0 +1,302 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, selectinload
+
+from app.config import get_settings
+from app.models import Image, ImageAccessRequest, OutboxMessage
+from app.services.cdn import get_purger
+from app.services.email import send_email
+from app.services.telegram import decision_text, edit_message_caption, ensure_telegram_file_id, send_photo_to_chat
+
+logger = logging.getLogger("jroots")
+
+EMAIL = "email"
+TELEGRAM_PHOTO = "telegram_photo"
+TELEGRAM_EDIT_CAPTION = "telegram_edit_caption"
+TELEGRAM_PREWARM = "telegram_prewarm"
+CDN_PURGE = "cdn_purge"
+
+STATUS_PENDING = "pending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+
+def enqueue(db: AsyncSession, channel: str, payload: dict, dedupe_key: str | None = None) -> OutboxMessage:
+    """Add a message to the outbox. It is committed together with the caller's transaction."""
+    message = OutboxMessage(
+        channel=channel,
+        dedupe_key=dedupe_key,
+        payload=payload,
+        status=STATUS_PENDING,
+        attempts=0,
+        next_attempt_at=datetime.now(timezone.utc),
+    )
+    db.add(message)
+    return message
+
+
+def enqueue_email(db: AsyncSession, to_email: str, subject: str, html_content: str) -> OutboxMessage:
+    return enqueue(db, EMAIL, {"to_email": to_email, "subject": subject, "html_content": html_content})
+
+
+def enqueue_telegram_photo(
+    db: AsyncSession,
+    image_id: int,
+    caption: str,
+    reply_markup: dict,
+    access_request_id: int | None = None,
+) -> OutboxMessage:
+    payload = {
+        "image_id": image_id,
+        "caption": caption,
+        "reply_markup": reply_markup,
+        "access_request_id": access_request_id,
+    }
+    return enqueue(db, TELEGRAM_PHOTO, payload)
+
+
+def enqueue_telegram_prewarm(db: AsyncSession, image_id: int) -> OutboxMessage | None:
+    """Queue the upload of a new image's Telegram derivative; nothing when Telegram is not set up."""
+    if not get_settings().telegram_bot_token:
+        return None
+    return enqueue(db, TELEGRAM_PREWARM, {"image_id": image_id}, dedupe_key=f"{TELEGRAM_PREWARM}:{image_id}")
+
+
+async def enqueue_caption_edits(db: AsyncSession, edits: list[tuple[int, int, str]]) -> None:
+    """Queue ``(chat_id, message_id, caption)`` edits, replacing not-yet-sent edits of the same messages.
+
+    The pending edits to replace are looked up in one query.
+    """
+    if not edits:
+        return
+    keys = {f"{TELEGRAM_EDIT_CAPTION}:{chat_id}:{message_id}": (chat_id, message_id, caption)
+            for chat_id, message_id, caption in edits}
+    result = await db.execute(
+        select(OutboxMessage).where(
+            OutboxMessage.dedupe_key.in_(keys),
+            OutboxMessage.status == STATUS_PENDING,
+        )
+    )
+    pending = {message.dedupe_key: message for message in result.scalars()}
+    for dedupe_key, (chat_id, message_id, caption) in keys.items():
+        payload = {"chat_id": chat_id, "message_id": message_id, "caption": caption}
+        if dedupe_key in pending:
+            pending[dedupe_key].payload = payload
+        else:
+            enqueue(db, TELEGRAM_EDIT_CAPTION, payload, dedupe_key=dedupe_key)
+
+
+def enqueue_cdn_purge(db: AsyncSession, urls: list[str]) -> OutboxMessage | None:
+    """Queue a purge of ``urls`` with the caller's transaction; nothing when purging is off."""
+    if not urls or get_purger() is None:
+        return None
+    return enqueue(db, CDN_PURGE, {"urls": urls})
+
+
+async def _deliver_email(db: AsyncSession, payload: dict) -> None:
+    await send_email(
+        to_email=payload["to_email"],
+        subject=payload["subject"],
+        html_content=payload["html_content"],
+    )
+
+
+async def _deliver_telegram_photo(db: AsyncSession, payload: dict) -> None:
+    image = await db.scalar(
+        select(Image)
+        .options(selectinload(Image.source), defer(Image.image_data), defer(Image.thumbnail_data))
+        .where(Image.id == payload["image_id"])
+    )
+    if image is None:
+        logger.warning("Dropping Telegram message for missing image %s", payload["image_id"])
+        return
+
+    caption, reply_markup = payload["caption"], payload["reply_markup"]
+    access_request = None
+    access_request_id = payload.get("access_request_id")
+    if access_request_id is not None:
+        # Locked until this message commits, so a concurrent decision waits for the message id
+        access_request = await db.scalar(
+            select(ImageAccessRequest)
+            .options(selectinload(ImageAccessRequest.user))
+            .where(ImageAccessRequest.id == access_request_id)
+            .with_for_update(of=ImageAccessRequest)
+        )
+    if access_request is not None and access_request.decided_at is not None:
+        # Decided before the notification went out: send it closed rather than with live buttons
+        approved = access_request.status == "approved"
+        caption = f"{caption}\n\n---\n{decision_text(approved, access_request.user.email, access_request.decided_by)}"
+        reply_markup = {"inline_keyboard": []}
+
+    await ensure_telegram_file_id(image)
+    response = await send_photo_to_chat(image, caption, reply_markup)
+    if response.status_code != 200:
+        raise RuntimeError(f"Telegram API error: {response.status_code} {response.text}")
+
+    if access_request is not None:
+        try:
+            sent = response.json()["result"]
+            access_request.chat_id = sent["chat"]["id"]
+            access_request.message_id = sent["message_id"]
+        except (KeyError, TypeError, ValueError):
+            logger.exception("Failed to extract message_id from Telegram response")
+
+
+async def _deliver_telegram_prewarm(db: AsyncSession, payload: dict) -> None:
+    image = await db.scalar(
+        select(Image)
+        .options(defer(Image.image_data), defer(Image.thumbnail_data))
+        .where(Image.id == payload["image_id"])
+    )
+    if image is None:
+        logger.warning("Dropping Telegram pre-warm for missing image %s", payload["image_id"])
+        return
+    await ensure_telegram_file_id(image)
+
+
+async def _deliver_caption_edit(db: AsyncSession, payload: dict) -> None:
+    await edit_message_caption(payload["chat_id"], payload["message_id"], payload["caption"])
+
+
+async def _deliver_cdn_purge(db: AsyncSession, payload: dict) -> None:
+    purger = get_purger()
+    if purger is None:
+        logger.warning("Dropping CDN purge of %d URLs, CDN_PURGE_BACKEND is not set", len(payload["urls"]))
+        return
+    await purger.purge(payload["urls"])
+
+
+_HANDLERS: dict[str, Callable[[AsyncSession, dict], Awaitable[None]]] = {
+    EMAIL: _deliver_email,
+    TELEGRAM_PHOTO: _deliver_telegram_photo,
+    TELEGRAM_EDIT_CAPTION: _deliver_caption_edit,
+    TELEGRAM_PREWARM: _deliver_telegram_prewarm,
+    CDN_PURGE: _deliver_cdn_purge,
+}
+
+
+def _rate_bucket(message: OutboxMessage) -> tuple[str, str]:
+    """(provider, bucket) pair. Telegram limits are per chat, so every chat gets its own bucket."""
+    if message.channel == EMAIL:
+        return "email", "email"
+    if message.channel == CDN_PURGE:
+        return "cdn", "cdn"
+    if message.channel == TELEGRAM_PREWARM:
+        settings = get_settings()
+        return "telegram", f"telegram:{settings.telegram_prewarm_chat_id or settings.telegram_chat_id}"
+    chat_id = message.payload.get("chat_id") or get_settings().telegram_chat_id
+    return "telegram", f"telegram:{chat_id}"
+
+
+class RateLimiter:
+    """Spaces out calls per bucket so the dispatcher stays under provider rate limits."""
+
+    def __init__(self, rates: dict[str, float]):
+        self._intervals = {provider: 1.0 / rate for provider, rate in rates.items() if rate > 0}
+        self._last_call: dict[str, float] = {}
+
+    async def wait(self, provider: str, bucket: str | None = None) -> None:
+        interval = self._intervals.get(provider)
+        if interval is None:
+            return
+        bucket = bucket or provider
+        last = self._last_call.get(bucket)
+        now = time.monotonic()
+        if last is not None and now - last < interval:
+            await asyncio.sleep(interval - (now - last))
+        self._last_call[bucket] = time.monotonic()
+
+
+def default_rate_limiter() -> RateLimiter:
+    settings = get_settings()
+    return RateLimiter({
+        "email": settings.outbox_email_rate_per_second,
+        "telegram": settings.outbox_telegram_rate_per_second,
+    })
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    settings = get_settings()
+    seconds = settings.outbox_backoff_base_seconds * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, settings.outbox_backoff_max_seconds))
+
+
+async def claim_batch(db: AsyncSession, batch_size: int) -> list[OutboxMessage]:
+    """Lease a batch of due messages and commit, so no lock or transaction outlives the claim.
+
+    Each claimed message counts an attempt and is hidden from other dispatchers for
+    OUTBOX_LEASE_SECONDS; a dispatcher that dies mid-batch leaves the rest to be retried then.
+    """
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        select(OutboxMessage)
+        .where(
+            OutboxMessage.status == STATUS_PENDING,
+            OutboxMessage.next_attempt_at <= now,
+        )
+        .order_by(OutboxMessage.next_attempt_at, OutboxMessage.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    batch = list(result.scalars().all())
+    lease_until = now + timedelta(seconds=get_settings().outbox_lease_seconds)
+    for message in batch:
+        message.attempts += 1
+        message.next_attempt_at = lease_until
+    await db.commit()
+    return batch
+
+
+async def dispatch_pending(db: AsyncSession, rate_limiter: RateLimiter | None = None) -> int:
+    """Deliver one batch of due messages. Returns the number of messages processed.
+
+    Every message's outcome is committed right after its delivery, so a failing handler only
+    rolls back its own writes and messages already delivered are not sent again.
+    """
+    settings = get_settings()
+    rate_limiter = rate_limiter or default_rate_limiter()
+
+    batch = await claim_batch(db, settings.outbox_batch_size)
+    # A failed handler's rollback expires every loaded row, so each message is fetched by id
+    # (from the identity map unless that happened)
+    claimed = [(message.id, message.channel, message.payload) for message in batch]
+    for message_id, channel, payload in claimed:
+        message = await db.get(OutboxMessage, message_id)
+        handler = _HANDLERS.get(channel)
+        if handler is None:
+            message.status = STATUS_FAILED
+            message.last_error = f"Unknown channel '{channel}'"
+            logger.error("Outbox message %d has unknown channel '%s'", message_id, channel)
+            await db.commit()
+            continue
+
+        await rate_limiter.wait(*_rate_bucket(message))
+        try:
+            await handler(db, payload)
+        except Exception as exc:
+            # Drop whatever the handler wrote before failing, then record the failure on its own
+            await db.rollback()
+            message = await db.get(OutboxMessage, message_id)
+            message.last_error = str(exc)[:2000]
+            if message.attempts >= settings.outbox_max_attempts:
+                message.status = STATUS_FAILED
+                logger.exception("Outbox message %d (%s) failed permanently", message_id, channel)
+            else:
+                message.next_attempt_at = datetime.now(timezone.utc) + backoff_delay(message.attempts)
+                logger.warning(
+                    "Outbox message %d (%s) failed, attempt %d: %s",
+                    message_id, channel, message.attempts, exc,
+                )
+        else:
+            message.status = STATUS_SENT
+            message.sent_at = datetime.now(timezone.utc)
+            message.last_error = None
+        await db.commit()
+
+    return len(claimed)
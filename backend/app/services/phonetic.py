@@ -0,0 +1,30 @@
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import PhoneticCode
+from app.utils.soundex import phonetic_codes
+
+
+async def index_phonetic_codes(db: AsyncSession, search_object_id: int, text: str, replace: bool = False) -> None:
+    """Store the codes of ``text`` for a search object. Part of the caller's transaction."""
+    if replace:
+        await db.execute(delete(PhoneticCode).where(PhoneticCode.search_object_id == search_object_id))
+    codes = phonetic_codes(text)
+    if codes:
+        await db.execute(
+            insert(PhoneticCode), [{"search_object_id": search_object_id, "code": code} for code in sorted(codes)],
+        )
+
+
+async def reindex_phonetic_codes(db: AsyncSession, texts: dict[int, str]) -> None:
+    """Replace the codes of many search objects at once (id -> new text). Part of the caller's transaction."""
+    if not texts:
+        return
+    await db.execute(delete(PhoneticCode).where(PhoneticCode.search_object_id.in_(texts)))
+    rows = [
+        {"search_object_id": object_id, "code": code}
+        for object_id, text in texts.items()
+        for code in sorted(phonetic_codes(text))
+    ]
+    if rows:
+        await db.execute(insert(PhoneticCode), rows)
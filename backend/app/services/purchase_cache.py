@@ -0,0 +1,91 @@
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import ImagePurchase
+
+
+class PurchasedImages:
+    """A user's purchased image ids as a sorted int array: ~8 bytes per id, O(log n) lookups."""
+
+    __slots__ = ("_ids",)
+
+    def __init__(self, image_ids: Iterable[int]):
+        self._ids = array("q", sorted(set(image_ids)))
+
+    def __contains__(self, image_id: object) -> bool:
+        i = bisect_left(self._ids, image_id)
+        return i < len(self._ids) and self._ids[i] == image_id
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+# Per-process cache: user_id -> (expires_at, purchased). Grants invalidate the local entry once
+# they commit; other workers only learn of them through ``confirm_purchase`` or the TTL.
+_cache: dict[int, tuple[float, PurchasedImages]] = {}
+# Session.info key holding the user ids to invalidate when the session commits
+_PENDING_KEY = "invalidate_purchases"
+
+
+async def get_purchased_images(db: AsyncSession, user_id: int) -> PurchasedImages:
+    now = time.monotonic()
+    entry = _cache.get(user_id)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+
+    result = await db.execute(select(ImagePurchase.image_id).where(ImagePurchase.user_id == user_id))
+    purchased = PurchasedImages(result.scalars().all())
+
+    settings = get_settings()
+    _cache.pop(user_id, None)
+    while len(_cache) >= settings.purchase_cache_max_users:
+        _cache.pop(next(iter(_cache)))  # oldest insertion first
+    _cache[user_id] = (now + settings.purchase_cache_ttl_seconds, purchased)
+    return purchased
+
+
+async def confirm_purchase(db: AsyncSession, user_id: int, image_id: int) -> bool:
+    """Ask the database about an image missing from the cached set.
+
+    Grants made in another worker only reach this worker's cache when its entry expires, and a paid
+    image must not be refused meanwhile. A hit refreshes the user's entry.
+    """
+    purchased = await db.scalar(
+        select(ImagePurchase.image_id).where(ImagePurchase.user_id == user_id, ImagePurchase.image_id == image_id)
+    ) is not None
+    if purchased:
+        invalidate_purchases(user_id)
+    return purchased
+
+
+def invalidate_purchases(user_id: int | None = None) -> None:
+    if user_id is None:
+        _cache.clear()
+    else:
+        _cache.pop(user_id, None)
+
+
+def invalidate_purchases_on_commit(db: AsyncSession, user_ids: Iterable[int]) -> None:
+    """Drop the users' entries once ``db`` commits.
+
+    Invalidating earlier lets a concurrent request re-cache the pre-commit set for a whole TTL.
+    """
+    db.info.setdefault(_PENDING_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_purchases(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
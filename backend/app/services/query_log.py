@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal, dialect_insert
+from app.models import QueryLog
+
+logger = logging.getLogger("jroots")
+
+MAX_QUERY_LENGTH = 200
+
+# Per-process tallies, written out as one upsert at most every QUERY_LOG_FLUSH_SECONDS
+_pending: Counter[tuple[str, str]] = Counter()
+_last_flush = time.monotonic()
+_flush_task: asyncio.Task | None = None
+_suppressed: ContextVar[bool] = ContextVar("query_log_suppressed", default=False)
+
+
+def normalize_query(q: str) -> str:
+    return " ".join(q.lower().split())[:MAX_QUERY_LENGTH]
+
+
+@contextmanager
+def suppress_query_log():
+    """Searches run inside (warm-up replays) are not counted."""
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+def record_query(q: str, mode: str) -> None:
+    global _flush_task
+    query = normalize_query(q)
+    if not query or _suppressed.get():
+        return
+    _pending[(query, mode)] += 1
+    due = time.monotonic() - _last_flush >= get_settings().query_log_flush_seconds
+    if due and (_flush_task is None or _flush_task.done()):
+        _flush_task = asyncio.create_task(flush_query_log())
+
+
+async def flush_query_log() -> None:
+    global _last_flush
+    _last_flush = time.monotonic()
+    if not _pending:
+        return
+    rows = [{"day": date.today(), "query": q, "mode": mode, "hits": hits} for (q, mode), hits in _pending.items()]
+    _pending.clear()
+    try:
+        async with AsyncSessionLocal() as db:
+            stmt = dialect_insert(db, QueryLog)
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["day", "query", "mode"], set_={"hits": QueryLog.hits + stmt.excluded.hits},
+                ),
+                rows,
+            )
+            await db.commit()
+    except Exception:
+        logger.exception("Failed to write %d query log rows", len(rows))
+
+
+async def top_queries(db: AsyncSession, limit: int, days: int) -> list[tuple[str, str]]:
+    """Most frequent (query, mode) pairs of the last ``days`` days."""
+    since = date.today() - timedelta(days=days)
+    hits = func.sum(QueryLog.hits)
+    result = await db.execute(
+        select(QueryLog.query, QueryLog.mode)
+        .where(QueryLog.day >= since)
+        .group_by(QueryLog.query, QueryLog.mode)
+        .order_by(hits.desc(), QueryLog.query)
+        .limit(limit)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def prune_query_log(db: AsyncSession, days: int) -> None:
+    await db.execute(delete(QueryLog).where(QueryLog.day < date.today() - timedelta(days=days)))
+    await db.commit()
+
+
+def reset_query_log() -> None:
+    global _last_flush
+    _pending.clear()
+    _last_flush = time.monotonic()
@@ -0,0 +1,49 @@
+"""Per-process copy of ``image_sources``.
+
+The table is seeded once and edited by hand at most a few times a year, so ``/api/sources`` and
+search results are served from memory. Edits show up in every worker within
+SOURCE_CACHE_TTL_SECONDS; ``invalidate_sources`` drops the local copy at once.
+"""
+import hashlib
+import json
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models import ImageSource
+from app.schemas import ImageSourceSchema
+
+
+class SourceCatalog:
+    """All sources sorted by name, the serialized ``/api/sources`` body and its ETag."""
+
+    __slots__ = ("sources", "by_id", "body", "etag")
+
+    def __init__(self, sources: list[ImageSourceSchema]):
+        self.sources = sources
+        self.by_id = {source.id: source for source in sources}
+        self.body = json.dumps([source.model_dump() for source in sources], ensure_ascii=False).encode()
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+
+_catalog: SourceCatalog | None = None
+_expires_at = 0.0
+
+
+async def get_source_catalog(db: AsyncSession) -> SourceCatalog:
+    global _catalog, _expires_at
+    now = time.monotonic()
+    if _catalog is not None and _expires_at > now:
+        return _catalog
+
+    result = await db.execute(select(ImageSource).order_by(ImageSource.source_name))
+    _catalog = SourceCatalog([ImageSourceSchema.model_validate(source) for source in result.scalars()])
+    _expires_at = now + get_settings().source_cache_ttl_seconds
+    return _catalog
+
+
+def invalidate_sources() -> None:
+    global _catalog
+    _catalog = None
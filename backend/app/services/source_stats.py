@@ -0,0 +1,66 @@
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import dialect_insert
+from app.models import Image, SearchObject, SourceStat
+from app.models.source_stats import NO_SOURCE
+
+
+async def adjust_source_count(db: AsyncSession, image_id: int | None, delta: int) -> None:
+    """Add ``delta`` objects to the source of ``image_id``. Part of the caller's transaction."""
+    if image_id is None or delta == 0:
+        return
+    stmt = dialect_insert(db, SourceStat).from_select(
+        ["image_source_id", "object_count"],
+        select(func.coalesce(Image.image_source_id, NO_SOURCE), literal(delta)).where(Image.id == image_id),
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["image_source_id"],
+            set_={"object_count": SourceStat.object_count + stmt.excluded.object_count, "updated_at": func.now()},
+        )
+    )
+
+
+async def refresh_source_stats(db: AsyncSession) -> None:
+    """Recount from scratch, e.g. after bulk loads that bypass ``adjust_source_count``. Caller commits."""
+    await db.execute(delete(SourceStat))
+    await db.execute(
+        dialect_insert(db, SourceStat).from_select(
+            ["image_source_id", "object_count"],
+            select(func.coalesce(Image.image_source_id, NO_SOURCE), func.count(SearchObject.id))
+            .join(Image, SearchObject.image_id == Image.id)
+            .group_by(func.coalesce(Image.image_source_id, NO_SOURCE)),
+        )
+    )
+
+
+async def source_counts(db: AsyncSession) -> dict[int | None, int]:
+    rows = await db.execute(select(SourceStat.image_source_id, SourceStat.object_count))
+    return {
+        (None if source_id == NO_SOURCE else source_id): count
+        for source_id, count in rows.all()
+        if count > 0
+    }
+
+
+async def subtract_source_counts(db: AsyncSession, *where) -> None:
+    """Take the objects matching ``where`` off their sources' counts in one grouped statement.
+
+    For set-based moves between images; the caller adds them back to the new source. Part of the
+    caller's transaction.
+    """
+    source = func.coalesce(Image.image_source_id, NO_SOURCE)
+    stmt = dialect_insert(db, SourceStat).from_select(
+        ["image_source_id", "object_count"],
+        select(source, -func.count(SearchObject.id))
+        .join(Image, SearchObject.image_id == Image.id)
+        .where(*where)
+        .group_by(source),
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["image_source_id"],
+            set_={"object_count": SourceStat.object_count + stmt.excluded.object_count, "updated_at": func.now()},
+        )
+    )
@@ -0,0 +1,230 @@
+import asyncio
+import contextlib
+import heapq
+import logging
+import re
+import sys
+import time
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import AsyncReadSessionLocal
+from app.models import ChangeLog, SearchObject
+
+logger = logging.getLogger("jroots")
+
+# Names, including hyphenated doubles (Сося-Бейла); years, initials and punctuation are dropped
+TOKEN_RE = re.compile(r"[^\W\d_]+(?:-[^\W\d_]+)*")
+MIN_TOKEN_LENGTH = 2
+# Prefix ranges wider than this (one or two letters) have their top-k memoized until the next write
+MEMO_RANGE = 1000
+
+
+def tokenize(text: str) -> set[str]:
+    return {token for token in TOKEN_RE.findall(text) if len(token) >= MIN_TOKEN_LENGTH}
+
+
+class SuggestIndex:
+    """Sorted array of lowercased name tokens with per-token object counts.
+
+    A prefix is a contiguous slice of the array, found with two bisects; the top-k by count within
+    it is a heap selection. Counts are per search object, not per occurrence.
+    """
+
+    def __init__(self):
+        self._keys: list[str] = []
+        self._counts: dict[str, int] = {}
+        self._display: dict[str, str] = {}
+        self._memo: dict[tuple[str, int], list[tuple[str, int]]] = {}
+        self.objects = 0
+
+    @classmethod
+    def build(cls, texts: Iterable[str]) -> "SuggestIndex":
+        index = cls()
+        for text in texts:
+            index.count(text)
+        return index.finish()
+
+    def count(self, text: str) -> None:
+        """Bulk-load step: tally tokens without keeping the key array sorted; call ``finish`` after."""
+        self.objects += 1
+        for token in tokenize(text):
+            key = token.lower()
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self._display.setdefault(key, token)
+
+    def finish(self) -> "SuggestIndex":
+        self._keys = sorted(self._counts)
+        return self
+
+    def add(self, text: str) -> None:
+        self._memo.clear()
+        self.objects += 1
+        for token in tokenize(text):
+            key = token.lower()
+            if key not in self._counts:
+                insort(self._keys, key)
+                self._counts[key] = 0
+                self._display[key] = token
+            self._counts[key] += 1
+
+    def remove(self, text: str) -> None:
+        self._memo.clear()
+        self.objects -= 1
+        for token in tokenize(text):
+            key = token.lower()
+            count = self._counts.get(key)
+            if count is None:
+                continue
+            if count > 1:
+                self._counts[key] = count - 1
+                continue
+            del self._counts[key], self._display[key]
+            i = bisect_left(self._keys, key)
+            if i < len(self._keys) and self._keys[i] == key:
+                del self._keys[i]
+
+    def complete(self, prefix: str, limit: int = 10) -> list[tuple[str, int]]:
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        memoized = self._memo.get((prefix, limit))
+        if memoized is not None:
+            return memoized
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\U0010ffff", lo)
+        best = heapq.nlargest(limit, self._keys[lo:hi], key=self._counts.__getitem__)
+        result = [(self._display[key], self._counts[key]) for key in best]
+        if hi - lo > MEMO_RANGE:
+            self._memo[(prefix, limit)] = result
+        return result
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def approx_bytes(self) -> int:
+        strings = sum(sys.getsizeof(key) for key in self._keys)
+        strings += sum(sys.getsizeof(shown) for key, shown in self._display.items() if shown != key)
+        return sys.getsizeof(self._keys) + sys.getsizeof(self._counts) + sys.getsizeof(self._display) + strings
+
+
+# Per-process index. Admin writes update it in place; other workers pick changes up on the
+# periodic rebuild (SUGGEST_REBUILD_SECONDS), which only rescans when ``change_log`` shows that
+# search objects changed since the last build. The build scans every object, so it never runs on
+# the request or start-up path: until the first build finishes, ``suggest_from_db`` answers.
+_index: SuggestIndex | None = None
+_built_at = 0.0
+_built_cursor: int | None = None
+_rebuild_task: asyncio.Task | None = None
+# Writes recorded while a build streams; replayed onto the new index before it replaces the old one
+_pending_changes: list[tuple[str | None, str | None]] | None = None
+# Matching rows the fallback tallies; counts from a sample, fine for ordering suggestions
+FALLBACK_ROWS = 1000
+
+
+async def _change_cursor(db: AsyncSession) -> int | None:
+    return await db.scalar(select(func.max(ChangeLog.id)).where(ChangeLog.table_name == "search_objects"))
+
+
+async def build_suggest_index(db: AsyncSession) -> SuggestIndex:
+    global _index, _built_at, _built_cursor, _pending_changes
+    start = time.perf_counter()
+    _pending_changes = []
+    try:
+        cursor = await _change_cursor(db)
+        index = SuggestIndex()
+        texts = await db.stream_scalars(select(SearchObject.text_content).execution_options(yield_per=5000))
+        async for text in texts:
+            index.count(text)
+        index.finish()
+        for old_text, new_text in _pending_changes:
+            _apply_change(index, old_text, new_text)
+    finally:
+        _pending_changes = None
+    _index, _built_at, _built_cursor = index, time.monotonic(), cursor
+    logger.info(
+        "Suggest index built: %d tokens from %d objects in %.3fs, ~%.1f MB",
+        len(index), index.objects, time.perf_counter() - start, index.approx_bytes() / 1e6,
+    )
+    return index
+
+
+async def _rebuild_in_background() -> None:
+    global _built_at
+    try:
+        async with AsyncReadSessionLocal() as db:
+            if _index is not None and await _change_cursor(db) == _built_cursor:
+                _built_at = time.monotonic()  # nothing changed since the last build
+                return
+            await build_suggest_index(db)
+    except Exception:
+        logger.exception("Suggest index rebuild failed")
+
+
+def start_suggest_index_build() -> asyncio.Task:
+    """Build (or rebuild) the index in a background task, unless one is already running."""
+    global _rebuild_task
+    if _rebuild_task is None or _rebuild_task.done():
+        _rebuild_task = asyncio.create_task(_rebuild_in_background())
+    return _rebuild_task
+
+
+async def stop_suggest_index_build() -> None:
+    if _rebuild_task is not None and not _rebuild_task.done():
+        _rebuild_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _rebuild_task
+
+
+def get_suggest_index() -> SuggestIndex | None:
+    """This worker's index, or None while the first build is still running."""
+    if _index is None:
+        start_suggest_index_build()
+    elif time.monotonic() - _built_at > get_settings().suggest_rebuild_seconds:
+        # Serve the current index while a fresh one is built
+        start_suggest_index_build()
+    return _index
+
+
+async def suggest_from_db(db: AsyncSession, prefix: str, limit: int = 10) -> list[tuple[str, int]]:
+    """Completions from objects starting with ``prefix``, while the index is not built.
+
+    Only leading words match: an anchored ILIKE is served by the text trigram index, a match
+    anywhere in the text would not be.
+    """
+    prefix = prefix.strip()
+    if not prefix:
+        return []
+    rows = await db.scalars(
+        select(SearchObject.text_content)
+        .where(SearchObject.text_content.istartswith(prefix, autoescape=True))
+        .limit(FALLBACK_ROWS)
+    )
+    index = SuggestIndex.build(rows)
+    return index.complete(prefix, limit)
+
+
+def _apply_change(index: SuggestIndex, old_text: str | None, new_text: str | None) -> None:
+    if old_text is not None:
+        index.remove(old_text)
+    if new_text is not None:
+        index.add(new_text)
+
+
+def record_object_change(old_text: str | None, new_text: str | None) -> None:
+    """Apply an admin write to this worker's index, and to the one being built if a build is running."""
+    if old_text == new_text:
+        return
+    if _pending_changes is not None:
+        _pending_changes.append((old_text, new_text))
+    if _index is not None:
+        _apply_change(_index, old_text, new_text)
+
+
+def reset_suggest_index() -> None:
+    global _index, _built_at, _built_cursor, _rebuild_task, _pending_changes
+    _index, _built_at, _built_cursor, _rebuild_task, _pending_changes = None, 0.0, None, None, None
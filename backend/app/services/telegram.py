@@ -1,46 +1,134 @@
+import asyncio
 import io
-import json
 import logging
+import os
+from typing import TYPE_CHECKING
 
-import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
+from app.database import AsyncSessionLocal
 from app.models import Image
 
+if TYPE_CHECKING:
+    import httpx
+
 logger = logging.getLogger("jroots")
 
 
-async def send_photo_to_chat(
-    image: Image,
-    caption: str,
-    reply_markup: dict,
-) -> httpx.Response:
+def _client(timeout: float) -> "httpx.AsyncClient":
+    # httpx and Pillow are imported on first use: most workers never talk to Telegram
+    import httpx
+
+    return httpx.AsyncClient(timeout=timeout)
+
+
+def decision_text(approved: bool, user_email: str, admin_username: str | None) -> str:
+    if approved:
+        return f"✅ ДОСТУП ПРЕДОСТАВЛЕН для {user_email} (админом @{admin_username})"
+    return f"❌ ДОСТУП ОТКЛОНЕН для {user_email} (админом @{admin_username})"
+
+
+# Uploads in flight per image id, so concurrent first requests share one upload.
+_inflight_uploads: dict[int, asyncio.Task] = {}
+
+
+def _make_telegram_derivative_sync(image_bytes: bytes, max_dim: int) -> bytes:
+    """Downscale to what Telegram would keep anyway, so we never push full-size scans."""
+    from PIL import Image as PILImage, ImageOps
+
+    original = PILImage.open(io.BytesIO(image_bytes))
+    original = ImageOps.exif_transpose(original)
+    if max(original.size) > max_dim:
+        original.thumbnail((max_dim, max_dim))
+    buffer = io.BytesIO()
+    original.convert("RGB").save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def load_telegram_photo(db: AsyncSession, image_id: int) -> bytes:
+    """Build the upload derivative from the on-disk file, only falling back to the DB blob."""
+    file_path = await db.scalar(select(Image.image_file_path).where(Image.id == image_id))
+    if file_path and os.path.exists(file_path):
+        image_bytes = await asyncio.to_thread(_read_file, file_path)
+    else:
+        image_bytes = await db.scalar(select(Image.image_data).where(Image.id == image_id))
+    max_dim = get_settings().telegram_photo_max_dim
+    return await asyncio.to_thread(_make_telegram_derivative_sync, image_bytes, max_dim)
+
+
+async def upload_photo_for_file_id(photo: bytes) -> str:
+    """Upload a photo once and return its file_id. The carrier message is deleted right away."""
+    settings = get_settings()
+    chat_id = settings.telegram_prewarm_chat_id or settings.telegram_chat_id
+    base_url = f"https://api.telegram.org/bot{settings.telegram_bot_token}"
+
+    async with _client(30.0) as client:
+        response = await client.post(
+            f"{base_url}/sendPhoto",
+            data={"chat_id": chat_id, "disable_notification": "true"},
+            files={"photo": ("image.jpg", io.BytesIO(photo), "image/jpeg")},
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Telegram API error: {response.status_code} {response.text}")
+
+        result = response.json()["result"]
+        await client.post(
+            f"{base_url}/deleteMessage",
+            json={"chat_id": chat_id, "message_id": result["message_id"]},
+        )
+    return result["photo"][-1]["file_id"]
+
+
+async def ensure_telegram_file_id(image: Image) -> str:
+    """Make sure ``image.telegram_file_id`` is set. The caller commits."""
+    if image.telegram_file_id:
+        return image.telegram_file_id
+
+    image_id = image.id
+    task = _inflight_uploads.get(image_id)
+    if task is None:
+        # The task outlives the caller that started it, so it reads through its own session
+        async def _upload() -> str:
+            async with AsyncSessionLocal() as upload_db:
+                photo = await load_telegram_photo(upload_db, image_id)
+            return await upload_photo_for_file_id(photo)
+
+        task = asyncio.create_task(_upload())
+        _inflight_uploads[image_id] = task
+        task.add_done_callback(lambda _: _inflight_uploads.pop(image_id, None))
+
+    image.telegram_file_id = await asyncio.shield(task)
+    logger.info("Pre-warmed telegram file_id for image %s", image_id)
+    return image.telegram_file_id
+
+
+async def send_photo_to_chat(image: Image, caption: str, reply_markup: dict) -> "httpx.Response":
+    """Send by ``telegram_file_id``; callers set it first with ``ensure_telegram_file_id``."""
+    if not image.telegram_file_id:
+        raise ValueError(f"Image {image.id} has no telegram_file_id")
     settings = get_settings()
     url = f"https://api.telegram.org/bot{settings.telegram_bot_token}/sendPhoto"
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        if image.telegram_file_id:
-            json_request = {
-                "chat_id": settings.telegram_chat_id,
-                "photo": image.telegram_file_id,
-                "caption": caption,
-                "reply_markup": reply_markup,
-            }
-            return await client.post(url, json=json_request)
-        else:
-            serialized_reply_markup = json.dumps(reply_markup)
-            payload = {
-                "chat_id": settings.telegram_chat_id,
-                "caption": caption,
-                "reply_markup": serialized_reply_markup,
-            }
-            files = {"photo": ("image.jpg", io.BytesIO(image.image_data), "image/jpeg")}
-            return await client.post(url, data=payload, files=files)
+    async with _client(30.0) as client:
+        json_request = {
+            "chat_id": settings.telegram_chat_id,
+            "photo": image.telegram_file_id,
+            "caption": caption,
+            "reply_markup": reply_markup,
+        }
+        return await client.post(url, json=json_request)
 
 
 async def answer_callback_query(callback_query_id: str) -> None:
     settings = get_settings()
-    async with httpx.AsyncClient(timeout=10.0) as client:
+    async with _client(10.0) as client:
         await client.post(
             f"https://api.telegram.org/bot{settings.telegram_bot_token}/answerCallbackQuery",
             json={"callback_query_id": callback_query_id},
@@ -49,7 +137,7 @@ async def answer_callback_query(callback_query_id: str) -> None:
 
 async def edit_message_caption(chat_id: int, message_id: int, caption: str) -> None:
     settings = get_settings()
-    async with httpx.AsyncClient(timeout=10.0) as client:
+    async with _client(10.0) as client:
         await client.post(
             f"https://api.telegram.org/bot{settings.telegram_bot_token}/editMessageCaption",
             json={
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.services.query_log import suppress_query_log, top_queries
+
+logger = logging.getLogger("jroots")
+
+# Indexes the search modes probe, loaded into shared buffers in this order; missing ones (older
+# schema) are skipped. Heaps are left to the query replay, which touches only the rows it returns.
+PREWARM_RELATIONS = (
+    "idx_search_objects_text_trgm",
+    "idx_images_key_trgm",
+    "idx_images_path_trgm",
+    "ix_search_objects_search_vector",
+    "search_object_phonetic_pkey",
+    "images_pkey",
+)
+# Shared buffers are shared by every worker: the first one to start loads them, the rest skip
+PREWARM_LOCK_ID = 0x6A726F6F7473  # "jroots"
+
+Replay = Callable[[AsyncSession, str, str], Awaitable[object]]
+
+
+async def prewarm_relations(db: AsyncSession) -> int:
+    """``pg_prewarm`` the search indexes, when the extension is installed. Returns relations loaded.
+
+    Skipped when another worker holds the prewarm lock, i.e. is already loading the same buffers.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return 0
+    if not await db.scalar(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_prewarm'")):
+        logger.info("pg_prewarm is not installed, skipping buffer warm-up")
+        return 0
+    if not await db.scalar(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": PREWARM_LOCK_ID}):
+        return 0
+    loaded = 0
+    for relation in PREWARM_RELATIONS:
+        if await db.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": relation}):
+            await db.execute(text("SELECT pg_prewarm(:name)"), {"name": relation})
+            loaded += 1
+    await db.commit()  # releases the lock before the replay
+    return loaded
+
+
+async def warm_up(replay: Replay) -> None:
+    """Prewarm buffers, then replay recent top queries, all within WARMUP_BUDGET_SECONDS.
+
+    Runs before the worker accepts traffic. Whatever is unfinished at the deadline is cancelled,
+    and failures are logged, never raised: a cold worker is better than one that does not start.
+    """
+    settings = get_settings()
+    if settings.warmup_budget_seconds <= 0:
+        return
+    start = time.monotonic()
+    prewarmed = replayed = 0
+    try:
+        async with asyncio.timeout(settings.warmup_budget_seconds):
+            async with AsyncSessionLocal() as db:
+                prewarmed = await prewarm_relations(db)
+                queries = await top_queries(db, settings.warmup_queries, settings.query_log_days)
+                with suppress_query_log():
+                    for q, mode in queries:
+                        await replay(db, q, mode)
+                        replayed += 1
+    except TimeoutError:
+        logger.warning("Warm-up hit its %.1fs budget", settings.warmup_budget_seconds)
+    except Exception:
+        logger.exception("Warm-up failed")
+    logger.info(
+        "Warm-up: %d relations prewarmed, %d queries replayed in %.2fs",
+        prewarmed, replayed, time.monotonic() - start,
+    )
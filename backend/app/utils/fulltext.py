@@ -0,0 +1,36 @@
+"""SQL pieces for ``mode=fulltext`` over ``search_objects.search_vector``.
+
+Migration 009 creates the ``jroots`` text search configuration (the ``simple`` parser and
+dictionary behind ``unaccent``) and ``modernize_orthography()``, the SQL twin of the ingest
+scripts' ``modernize_name``. The vector column is generated from both, so queries must go through
+the same normalization to match.
+"""
+from sqlalchemy import Boolean, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+
+FTS_CONFIG = "jroots"
+# ts_rank_cd normalization 32 maps the rank into [0, 1), like the fuzzy similarity scores
+RANK_NORMALIZATION = 32
+
+
+class ts_match(GenericFunction):
+    """``vector @@ query`` on Postgres, where only the operator form can use the GIN index.
+
+    Other dialects get a plain ``ts_match()`` call, which the SQLite test database provides.
+    """
+
+    type = Boolean()
+    inherit_cache = True
+    name = "ts_match"
+
+
+@compiles(ts_match, "postgresql")
+def _compile_ts_match(element, compiler, **kw):
+    vector, query = element.clauses
+    return f"{compiler.process(vector, **kw)} @@ {compiler.process(query, **kw)}"
+
+
+def websearch_query(q: str):
+    """Quoted phrases, ``or`` and ``-word`` as in web search engines; never raises on bad syntax."""
+    return func.websearch_to_tsquery(FTS_CONFIG, func.modernize_orthography(q))
@@ -0,0 +1,109 @@
+"""Perceptual image hashes and near-duplicate lookup.
+
+dHash: the image is shrunk to 9x8 grayscale and each bit records whether a pixel is brighter than
+its right-hand neighbour. Re-scans and re-compressions of the same page land within a few bits of
+each other; different pages rarely come closer than ~10. Hashes are stored as signed 64-bit
+integers to fit a Postgres BIGINT.
+"""
+from io import BytesIO
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Integer
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+
+if TYPE_CHECKING:
+    from PIL.Image import Image as PILImageType
+
+HASH_BITS = 64
+_WIDTH, _HEIGHT = 9, 8
+
+
+def dhash(image: "PILImageType") -> int:
+    from PIL import Image as PILImage, ImageOps
+
+    gray = ImageOps.exif_transpose(image).convert("L").resize((_WIDTH, _HEIGHT), PILImage.Resampling.LANCZOS)
+    pixels = gray.tobytes()  # one byte per "L" pixel, row-major; indexing yields ints
+    value = 0
+    for row in range(_HEIGHT):
+        for col in range(_WIDTH - 1):
+            left = pixels[row * _WIDTH + col]
+            value = (value << 1) | (left > pixels[row * _WIDTH + col + 1])
+    return to_signed(value)
+
+
+def dhash_bytes(image_bytes: bytes) -> int:
+    from PIL import Image as PILImage
+
+    return dhash(PILImage.open(BytesIO(image_bytes)))
+
+
+def to_signed(value: int) -> int:
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def hamming(a: int, b: int) -> int:
+    return ((a ^ b) & ((1 << HASH_BITS) - 1)).bit_count()
+
+
+class hamming_distance(GenericFunction):
+    """Differing bits of two BIGINT hashes: ``bit_count((a # b)::bit(64))`` on Postgres 14 and later.
+
+    Other dialects get a plain ``hamming_distance()`` call, which the SQLite test database provides.
+    """
+
+    type = Integer()
+    inherit_cache = True
+    name = "hamming_distance"
+
+
+@compiles(hamming_distance, "postgresql")
+def _compile_hamming_distance(element, compiler, **kw):
+    a, b = element.clauses
+    return f"bit_count(({compiler.process(a, **kw)} # {compiler.process(b, **kw)})::bit(64))"
+
+
+class BKTree:
+    """Burkhard–Keller tree over Hamming distance.
+
+    Each child edge is labelled with its distance to the parent, so by the triangle inequality a
+    search within ``d`` of a query only descends edges labelled within ``d`` of the node's own
+    distance, skipping most of the tree for small ``d``.
+    """
+
+    def __init__(self):
+        # node: (hash, ids with that hash, {distance: child node})
+        self._root: tuple[int, list[int], dict] | None = None
+        self.size = 0
+
+    def add(self, value: int, item_id: int) -> None:
+        self.size += 1
+        if self._root is None:
+            self._root = (value, [item_id], {})
+            return
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item_id)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, [item_id], {})
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> list[tuple[int, int]]:
+        """(item id, distance) of every item within ``max_distance`` of ``value``."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node_value, ids, children = stack.pop()
+            distance = hamming(value, node_value)
+            if distance <= max_distance:
+                found.extend((item_id, distance) for item_id in ids)
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return found
+
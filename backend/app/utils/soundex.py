@@ -0,0 +1,123 @@
+"""Daitch–Mokotoff Soundex for Cyrillic and Latin-script Ashkenazi names.
+
+Cyrillic is transliterated to the German/Polish-style Latin spelling the coding table was built
+for, so Шлема, Шлойма and Schlojme all code the same. A name can have more than one code because
+some letter groups (CH, CK, C, J, RS, RZ) are ambiguous; all branches are returned.
+"""
+import re
+import unicodedata
+
+CODE_LENGTH = 6
+MIN_TOKEN_LENGTH = 2
+VOWELS = frozenset("aeiou")
+# Names only, hyphenated doubles (Сося-Бейла) coded per part; initials are dropped by length
+TOKEN_RE = re.compile(r"[^\W\d_]+")
+
+TRANSLITERATION = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "ґ": "g", "д": "d", "е": "e", "ё": "e", "є": "ye", "ж": "zh",
+    "з": "z", "и": "i", "і": "i", "ї": "yi", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ў": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "tch",
+    "ш": "sh", "щ": "shch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+    # Latin letters that NFKD does not decompose
+    "ł": "l", "ß": "ss", "ø": "o",
+}
+
+# (letters, at the start, before a vowel, elsewhere); "" means not coded. A list holds alternative codings.
+_RULES: dict[str, tuple[str, str, str] | list[tuple[str, str, str]]] = {
+    "ai": ("0", "1", ""), "aj": ("0", "1", ""), "ay": ("0", "1", ""), "au": ("0", "7", ""), "a": ("0", "", ""),
+    "b": ("7", "7", "7"),
+    "chs": ("5", "54", "54"), "ch": [("5", "5", "5"), ("4", "4", "4")], "ck": [("5", "5", "5"), ("45", "45", "45")],
+    "cz": ("4", "4", "4"), "cs": ("4", "4", "4"), "csz": ("4", "4", "4"), "czs": ("4", "4", "4"),
+    "c": [("5", "5", "5"), ("4", "4", "4")],
+    "drz": ("4", "4", "4"), "drs": ("4", "4", "4"), "ds": ("4", "4", "4"), "dsh": ("4", "4", "4"),
+    "dsz": ("4", "4", "4"), "dz": ("4", "4", "4"), "dzh": ("4", "4", "4"), "dzs": ("4", "4", "4"),
+    "d": ("3", "3", "3"), "dt": ("3", "3", "3"),
+    "ei": ("0", "1", ""), "ej": ("0", "1", ""), "ey": ("0", "1", ""), "eu": ("1", "1", ""), "e": ("0", "", ""),
+    "fb": ("7", "7", "7"), "f": ("7", "7", "7"),
+    "g": ("5", "5", "5"), "h": ("5", "5", ""),
+    "ia": ("1", "", ""), "ie": ("1", "", ""), "io": ("1", "", ""), "iu": ("1", "", ""), "i": ("0", "", ""),
+    "j": [("1", "1", "1"), ("4", "4", "4")],
+    "ks": ("5", "54", "54"), "kh": ("5", "5", "5"), "k": ("5", "5", "5"),
+    "l": ("8", "8", "8"),
+    "mn": ("66", "66", "66"), "m": ("6", "6", "6"), "nm": ("66", "66", "66"), "n": ("6", "6", "6"),
+    "oi": ("0", "1", ""), "oj": ("0", "1", ""), "oy": ("0", "1", ""), "o": ("0", "", ""),
+    "p": ("7", "7", "7"), "pf": ("7", "7", "7"), "ph": ("7", "7", "7"),
+    "q": ("5", "5", "5"),
+    "rz": [("94", "94", "94"), ("4", "4", "4")], "rs": [("94", "94", "94"), ("4", "4", "4")], "r": ("9", "9", "9"),
+    "schtsch": ("2", "4", "4"), "schtsh": ("2", "4", "4"), "schtch": ("2", "4", "4"), "sch": ("4", "4", "4"),
+    "shtch": ("2", "4", "4"), "shch": ("2", "4", "4"), "shtsh": ("2", "4", "4"),
+    "sht": ("2", "43", "43"), "scht": ("2", "43", "43"), "schd": ("2", "43", "43"), "sh": ("4", "4", "4"),
+    "stch": ("2", "4", "4"), "stsch": ("2", "4", "4"), "sc": ("2", "4", "4"),
+    "strz": ("2", "4", "4"), "strs": ("2", "4", "4"), "stsh": ("2", "4", "4"), "st": ("2", "43", "43"),
+    "szcz": ("2", "4", "4"), "szcs": ("2", "4", "4"),
+    "szt": ("2", "43", "43"), "shd": ("2", "43", "43"), "szd": ("2", "43", "43"), "sd": ("2", "43", "43"),
+    "sz": ("4", "4", "4"), "s": ("4", "4", "4"),
+    "tch": ("4", "4", "4"), "ttch": ("4", "4", "4"), "ttsch": ("4", "4", "4"), "th": ("3", "3", "3"),
+    "trz": ("4", "4", "4"), "trs": ("4", "4", "4"), "tsch": ("4", "4", "4"), "tsh": ("4", "4", "4"),
+    "ts": ("4", "4", "4"), "tts": ("4", "4", "4"), "ttsz": ("4", "4", "4"), "tc": ("4", "4", "4"),
+    "tz": ("4", "4", "4"), "ttz": ("4", "4", "4"), "tzs": ("4", "4", "4"), "tsz": ("4", "4", "4"),
+    "t": ("3", "3", "3"),
+    "ui": ("0", "1", ""), "uj": ("0", "1", ""), "uy": ("0", "1", ""), "u": ("0", "", ""), "ue": ("0", "", ""),
+    "v": ("7", "7", "7"), "w": ("7", "7", "7"),
+    "x": ("5", "54", "54"),
+    "y": ("1", "", ""),
+    "zdz": ("2", "4", "4"), "zdzh": ("2", "4", "4"), "zhdzh": ("2", "4", "4"),
+    "zd": ("2", "43", "43"), "zhd": ("2", "43", "43"),
+    "zh": ("4", "4", "4"), "zs": ("4", "4", "4"), "zsch": ("4", "4", "4"), "zsh": ("4", "4", "4"), "z": ("4", "4", "4"),
+}
+_LONGEST = max(map(len, _RULES))
+
+
+def to_latin(word: str) -> str:
+    """Lowercase ASCII letters: Cyrillic transliterated, diacritics stripped, everything else dropped."""
+    word = "".join(TRANSLITERATION.get(ch, ch) for ch in word.lower())
+    word = unicodedata.normalize("NFKD", word)
+    return "".join(ch for ch in word if "a" <= ch <= "z")
+
+
+def daitch_mokotoff(word: str) -> set[str]:
+    """All six-digit codes for a single name; empty for a word without codable letters."""
+    word = to_latin(word)
+    if not word:
+        return set()
+    # Each branch: (code so far, last letter group's code), so repeats collapse unless a vowel intervenes
+    branches = {("", None)}
+    i = 0
+    while i < len(word):
+        for length in range(min(_LONGEST, len(word) - i), 0, -1):
+            rule = _RULES.get(word[i:i + length])
+            if rule is not None:
+                break
+        else:  # unreachable for a-z, kept for safety
+            i += 1
+            continue
+        following = word[i + length] if i + length < len(word) else ""
+        slot = 0 if i == 0 else 1 if following in VOWELS else 2
+        codes = [alt[slot] for alt in rule] if isinstance(rule, list) else [rule[slot]]
+        # M and N next to each other are both coded (MN/NM as one group are already 66)
+        force = word[i - 1:i + 1] in ("mn", "nm") if i else False
+        branches = {
+            (code + digits if (last is None or not last.endswith(digits) or force) else code, digits)
+            for code, last in branches
+            for digits in codes
+        }
+        i += length
+    return {(code + "0" * CODE_LENGTH)[:CODE_LENGTH] for code, _ in branches}
+
+
+def phonetic_codes(text: str) -> set[str]:
+    """Codes for every name-like token of ``text``, for indexing and for matching a query."""
+    codes = set()
+    for token in TOKEN_RE.findall(text):
+        if len(token) >= MIN_TOKEN_LENGTH:
+            codes |= daitch_mokotoff(token)
+    return codes
+
+
+def query_code_groups(text: str) -> list[set[str]]:
+    """One set of alternative codes per query token; a match needs a code from every group."""
+    groups = []
+    for token in TOKEN_RE.findall(text):
+        if len(token) >= MIN_TOKEN_LENGTH and (codes := daitch_mokotoff(token)):
+            groups.append(codes)
+    return groups
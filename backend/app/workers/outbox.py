@@ -0,0 +1,69 @@
+"""Outbox dispatcher process.
+
+Run alongside the web workers with ``python -m app.workers.outbox``. Being the single background
+process, it also prunes ``search_query_log`` and ``change_log`` every LOG_PRUNE_INTERVAL_SECONDS.
+"""
+import asyncio
+import logging
+import signal
+import time
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.services.change_feed import prune_change_log
+from app.services.outbox import default_rate_limiter, dispatch_pending
+from app.services.query_log import prune_query_log
+from app.utils.logging_config import setup_logging
+
+logger = logging.getLogger("jroots")
+
+
+async def prune_logs() -> None:
+    settings = get_settings()
+    async with AsyncSessionLocal() as db:
+        await prune_query_log(db, settings.query_log_days)
+        await prune_change_log(db, settings.change_log_days)
+
+
+async def run(stop_event: asyncio.Event) -> None:
+    settings = get_settings()
+    rate_limiter = default_rate_limiter()
+    logger.info("Outbox dispatcher started")
+
+    next_prune = 0.0
+    while not stop_event.is_set():
+        if time.monotonic() >= next_prune:
+            try:
+                await prune_logs()
+            except Exception:
+                logger.exception("Log pruning failed")
+            next_prune = time.monotonic() + settings.log_prune_interval_seconds
+
+        try:
+            async with AsyncSessionLocal() as db:
+                processed = await dispatch_pending(db, rate_limiter)
+        except Exception:
+            logger.exception("Outbox dispatch failed")
+            processed = 0
+
+        if processed == 0:
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=settings.outbox_poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    logger.info("Outbox dispatcher stopped")
+
+
+async def main() -> None:
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+    await run(stop_event)
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    setup_logging(loki_hostname=settings.loki_hostname, environment=settings.environment)
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""Compute perceptual hashes for images stored before ``images.phash`` existed.
+
+Run with ``python -m app.workers.phash_backfill [--limit N]``. Safe to interrupt and re-run: it
+only picks up images whose hash is still NULL.
+"""
+import argparse
+import asyncio
+import logging
+import os
+
+from sqlalchemy import select, update
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models import Image
+from app.utils.logging_config import setup_logging
+from app.utils.phash import dhash_bytes
+
+logger = logging.getLogger("jroots")
+
+BATCH_SIZE = 100
+
+
+def _hash_file(path: str) -> int | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return dhash_bytes(f.read())
+
+
+async def backfill(limit: int | None = None) -> int:
+    hashed = 0
+    last_id = 0
+    while limit is None or hashed < limit:
+        async with AsyncSessionLocal() as db:
+            images = (await db.execute(
+                select(Image.id, Image.image_file_path)
+                .where(Image.phash.is_(None), Image.id > last_id)
+                .order_by(Image.id)
+                .limit(BATCH_SIZE)
+            )).all()
+            if not images:
+                break
+
+            for image_id, image_file_path in images:
+                last_id = image_id
+                try:
+                    phash = await asyncio.to_thread(_hash_file, image_file_path) if image_file_path else None
+                    if phash is None:
+                        data = await db.scalar(select(Image.image_data).where(Image.id == image_id))
+                        phash = await asyncio.to_thread(dhash_bytes, data)
+                except Exception:
+                    logger.exception("Failed to hash image %s", image_id)
+                    continue
+                await db.execute(update(Image).where(Image.id == image_id).values(phash=phash))
+                hashed += 1
+                if limit is not None and hashed >= limit:
+                    break
+            await db.commit()
+
+    logger.info("Computed perceptual hashes for %d images", hashed)
+    return hashed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many images")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    setup_logging(loki_hostname=settings.loki_hostname, environment=settings.environment)
+    asyncio.run(backfill(args.limit))
@@ -0,0 +1,66 @@
+"""Upload Telegram photos for images that do not have a ``telegram_file_id`` yet.
+
+Run with ``python -m app.workers.telegram_prewarm [--limit N]``. Each image is uploaded
+once as a size-bounded derivative, so later access requests only send the file_id.
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.orm import defer
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models import Image
+from app.services.telegram import ensure_telegram_file_id
+from app.utils.logging_config import setup_logging
+
+logger = logging.getLogger("jroots")
+
+BATCH_SIZE = 50
+
+
+async def prewarm(limit: int | None = None, delay_seconds: float = 1.0) -> int:
+    warmed = 0
+    last_id = 0
+    while limit is None or warmed < limit:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Image)
+                .options(defer(Image.image_data), defer(Image.thumbnail_data))
+                .where(Image.telegram_file_id.is_(None), Image.id > last_id)
+                .order_by(Image.id)
+                .limit(BATCH_SIZE)
+            )
+            images = result.scalars().all()
+            if not images:
+                break
+
+            for image in images:
+                last_id = image.id
+                try:
+                    await ensure_telegram_file_id(image)
+                    await db.commit()
+                    warmed += 1
+                except Exception:
+                    logger.exception("Failed to pre-warm telegram file_id for image %s", image.id)
+                    await db.rollback()
+                    break  # rollback expires the batch; continue from a fresh one after last_id
+                if limit is not None and warmed >= limit:
+                    break
+                await asyncio.sleep(delay_seconds)
+
+    logger.info("Pre-warmed telegram file_id for %d images", warmed)
+    return warmed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many uploads")
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds between uploads")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    setup_logging(loki_hostname=settings.loki_hostname, environment=settings.environment)
+    asyncio.run(prewarm(args.limit, args.delay))
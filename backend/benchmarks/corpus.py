@@ -0,0 +1,115 @@
+"""Deterministic synthetic archive: register pages (images) holding ~20 person entries each."""
+import hashlib
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from benchmarks.names import (
+    FEMALE_GIVEN,
+    FEMININE_SUFFIXES,
+    MALE_GIVEN,
+    ORTHOGRAPHIC_SWAPS,
+    PATRONYMIC_SUFFIXES,
+    SURNAMES,
+    TOWNS,
+)
+
+ENTRIES_PER_PAGE = 20
+# Search never reads image_data, so a bare SOI/EOI marker pair keeps COPY fast at 1M rows
+PLACEHOLDER_IMAGE = b"\xff\xd8\xff\xd9"
+
+
+@dataclass(frozen=True)
+class Page:
+    id: int
+    image_path: str
+    image_key: str
+    image_source_id: int
+    sha512_hash: str
+    created_at: datetime
+
+
+@dataclass(frozen=True)
+class Entry:
+    id: int
+    image_id: int
+    text_content: str
+    created_at: datetime
+
+
+def feminine(surname: str) -> str:
+    for suffix, replacement in FEMININE_SUFFIXES.items():
+        if surname.endswith(suffix):
+            return surname[: -len(suffix)] + replacement
+    return surname
+
+
+def patronymic(rng: random.Random, female: bool) -> str:
+    father = rng.choice(MALE_GIVEN).split("-")[0].rstrip("ьйоаеи")
+    return father + rng.choice(PATRONYMIC_SUFFIXES["female" if female else "male"])
+
+
+def person_name(rng: random.Random) -> str:
+    female = rng.random() < 0.45
+    surname = rng.choice(SURNAMES)
+    if female:
+        surname = feminine(surname)
+    given = rng.choice(FEMALE_GIVEN if female else MALE_GIVEN)
+
+    layout = rng.random()
+    if layout < 0.45:
+        text = f"{surname} {given} {patronymic(rng, female)}"
+    elif layout < 0.75:
+        text = f"{surname} {given}"
+    elif layout < 0.9:
+        text = f"{surname} {given[0]}. {rng.choice(MALE_GIVEN)[0]}."
+    else:
+        text = surname
+    if rng.random() < 0.3:
+        text += f", {rng.randint(1850, 1925)}"
+    return text
+
+
+def generate(size: int, source_ids: list[int], seed: int = 1) -> tuple[list[Page], Iterator[Entry]]:
+    """``size`` entries spread over ``ceil(size / ENTRIES_PER_PAGE)`` pages. Same seed, same corpus."""
+    rng = random.Random(seed)
+    epoch = datetime(2024, 1, 1)
+    page_count = -(-size // ENTRIES_PER_PAGE)
+
+    pages = []
+    for page_id in range(1, page_count + 1):
+        town = rng.choice(TOWNS)
+        year = rng.randint(1850, 1939)
+        fond, opis, delo = rng.randint(1, 3000), rng.randint(1, 12), rng.randint(1, 900)
+        pages.append(Page(
+            id=page_id,
+            image_path=f"{fond}-{opis}-{delo}/{rng.randint(1, 400):04d}",
+            image_key=f"Посімейний список євреїв м. {town}, {year}",
+            image_source_id=rng.choice(source_ids),
+            sha512_hash=hashlib.sha512(f"bench-{seed}-{page_id}".encode()).hexdigest(),
+            created_at=epoch + timedelta(minutes=page_id),
+        ))
+
+    def entries() -> Iterator[Entry]:
+        entry_rng = random.Random(seed + 1)
+        for entry_id in range(1, size + 1):
+            page = pages[(entry_id - 1) // ENTRIES_PER_PAGE]
+            yield Entry(
+                id=entry_id,
+                image_id=page.id,
+                text_content=person_name(entry_rng),
+                created_at=page.created_at + timedelta(seconds=entry_id % ENTRIES_PER_PAGE),
+            )
+
+    return pages, entries()
+
+
+def misspell(rng: random.Random, word: str) -> str:
+    """One realistic reading error: an orthographic swap, otherwise an adjacent transposition."""
+    swaps = [(a, b) for a, b in ORTHOGRAPHIC_SWAPS if a in word]
+    if swaps:
+        a, b = rng.choice(swaps)
+        return word.replace(a, b, 1)
+    i = rng.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
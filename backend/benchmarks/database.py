@@ -0,0 +1,112 @@
+"""Schema and corpus setup for a local benchmark Postgres.
+
+Everything here TRUNCATEs, so it refuses to touch a database whose name does not contain
+"bench" unless forced.
+"""
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.utils.soundex import phonetic_codes
+from benchmarks.corpus import PLACEHOLDER_IMAGE, generate
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+INIT_SQL = BACKEND_DIR.parent / "db" / "init.sql"
+COPY_CHUNK = 50_000
+IMAGE_COLUMNS = ["id", "image_path", "image_key", "image_source_id", "image_data", "sha512_hash", "created_at"]
+ENTRY_COLUMNS = ["id", "text_content", "price", "image_id", "created_at", "updated_at"]
+PHONETIC_COLUMNS = ["code", "search_object_id"]
+
+
+def check_bench_database(engine: AsyncEngine, force: bool = False) -> None:
+    name = engine.url.database or ""
+    if engine.dialect.name != "postgresql":
+        sys.exit(f"Benchmarks need Postgres (pg_trgm, fuzzystrmatch), got {engine.dialect.name}")
+    if "bench" not in name and not force:
+        sys.exit(f"Refusing to load a corpus into '{name}': use a database named *bench* or pass --force")
+
+
+async def ensure_schema(engine: AsyncEngine) -> None:
+    """Production schema: ``db/init.sql`` plus Alembic migrations, exactly as deployed."""
+    async with engine.connect() as conn:
+        exists = await conn.scalar(text("SELECT to_regclass('search_objects') IS NOT NULL"))
+        if not exists:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.execute(INIT_SQL.read_text(encoding="utf-8"))
+    if not exists:
+        subprocess.run(["alembic", "stamp", "001_baseline"], cwd=BACKEND_DIR, check=True)
+    subprocess.run(["alembic", "upgrade", "head"], cwd=BACKEND_DIR, check=True)
+
+
+async def source_ids(engine: AsyncEngine) -> list[int]:
+    async with engine.connect() as conn:
+        return list((await conn.scalars(text("SELECT id FROM image_sources ORDER BY id"))).all())
+
+
+def _corpus_tag(size: int, seed: int) -> str:
+    return f"bench corpus size={size} seed={seed}"
+
+
+async def load_corpus(engine: AsyncEngine, size: int, seed: int = 1) -> float:
+    """(Re)load ``size`` entries unless that exact corpus is already there. Returns load seconds."""
+    tag = _corpus_tag(size, seed)
+    async with engine.connect() as conn:
+        current = await conn.scalar(text("SELECT obj_description('search_objects'::regclass, 'pg_class')"))
+    if current == tag:
+        print(f"Corpus of {size} rows already loaded")
+        return 0.0
+
+    start = time.perf_counter()
+    pages, entries = generate(size, await source_ids(engine), seed)
+    async with engine.begin() as conn:
+        await conn.execute(text("TRUNCATE search_objects, images, change_log RESTART IDENTITY CASCADE"))
+        # A corpus load is not a change for feed consumers; keep COPY off the change_log triggers
+        for table in ("images", "search_objects"):
+            await conn.execute(text(f"ALTER TABLE {table} DISABLE TRIGGER {table}_change_log"))
+        raw = (await conn.get_raw_connection()).driver_connection
+        await raw.copy_records_to_table(
+            "images",
+            columns=IMAGE_COLUMNS,
+            records=[
+                (p.id, p.image_path, p.image_key, p.image_source_id, PLACEHOLDER_IMAGE, p.sha512_hash, p.created_at)
+                for p in pages
+            ],
+        )
+        chunk, codes = [], []
+        for entry in entries:
+            chunk.append((entry.id, entry.text_content, 0, entry.image_id, entry.created_at, entry.created_at))
+            # COPY bypasses ingest, so compute the phonetic codes it would have stored
+            codes.extend((code, entry.id) for code in phonetic_codes(entry.text_content))
+            if len(chunk) >= COPY_CHUNK:
+                await raw.copy_records_to_table("search_objects", columns=ENTRY_COLUMNS, records=chunk)
+                await raw.copy_records_to_table("search_object_phonetic", columns=PHONETIC_COLUMNS, records=codes)
+                chunk, codes = [], []
+        if chunk:
+            await raw.copy_records_to_table("search_objects", columns=ENTRY_COLUMNS, records=chunk)
+            await raw.copy_records_to_table("search_object_phonetic", columns=PHONETIC_COLUMNS, records=codes)
+        for table in ("images", "search_objects"):
+            await conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), max(id)) FROM {table}"))
+        # COPY bypasses ingest, so recount the per-source facets it would have maintained
+        await conn.execute(text("DELETE FROM source_stats"))
+        await conn.execute(text(
+            "INSERT INTO source_stats (image_source_id, object_count) "
+            "SELECT COALESCE(i.image_source_id, 0), COUNT(*) FROM search_objects so "
+            "JOIN images i ON i.id = so.image_id GROUP BY 1"
+        ))
+        for table in ("images", "search_objects"):
+            await conn.execute(text(f"ALTER TABLE {table} ENABLE TRIGGER {table}_change_log"))
+        await conn.execute(text(f"COMMENT ON TABLE search_objects IS '{tag}'"))
+
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE images"))
+        await conn.execute(text("VACUUM ANALYZE search_objects"))
+        await conn.execute(text("VACUUM ANALYZE search_object_phonetic"))
+
+    elapsed = time.perf_counter() - start
+    print(f"Loaded {size} rows ({len(pages)} pages) in {elapsed:.1f}s")
+    return elapsed
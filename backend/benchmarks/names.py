@@ -0,0 +1,47 @@
+"""Name material for synthetic archive corpora.
+
+Drawn from the census and ledger processing prompts and review lists in ``cli/``
+(``export_fio.py``, ``process_ledger.py``, ``process_shpykiv.py``), i.e. the spellings that
+actually come out of ЦДАВО/ДАКО registers: Russian pre-reform and Soviet orthography,
+Yiddish diminutives and hyphenated double names.
+"""
+
+SURNAMES = [
+    "Пинхасик", "Подоксик", "Фундылер", "Крейндель", "Эбех", "Талесмахер", "Гермизо", "Тугер",
+    "Блинчик", "Эленбоген", "Месенгисер", "Кнопов", "Глейзер", "Бранспис", "Бык", "Ройтбур",
+    "Шамис", "Лейбельс", "Нысензон", "Ярмульник", "Юхт", "Блех", "Биленкин", "Коренфельд",
+    "Бродский", "Аронкин", "Рабинович", "Каган", "Коган", "Шапиро", "Гуревич", "Хайкин",
+    "Левин", "Фельдман", "Гольдберг", "Зильберман", "Розенблюм", "Вайнштейн", "Шварцман",
+    "Кацнельсон", "Гринберг", "Тверской", "Бердичевский", "Литвак", "Штейнгарт", "Шнайдер",
+    "Портной", "Кравец", "Резник", "Меламед", "Ходоровский", "Запишковецкий", "Иерусалимский",
+    "Мурованный", "Письменный", "Горбонос", "Безсмертный", "Спокойный", "Рыбак", "Шойхет",
+    "Зингер", "Перельман", "Эпштейн", "Гофман", "Лифшиц", "Пейсахович", "Берков", "Абрамович",
+    "Мордкович", "Хаимович", "Янкелевич", "Ицкович", "Шмуйлович", "Гершкович", "Лейбович",
+]
+
+# Female forms for surnames that decline; the rest are used as-is.
+FEMININE_SUFFIXES = {"ский": "ская", "цкий": "цкая", "ный": "ная", "ин": "ина", "ов": "ова", "ев": "ева"}
+
+MALE_GIVEN = [
+    "Тевель", "Хонон", "Овший", "Гейнах", "Ноях", "Нусин", "Файвель", "Зиндель", "Сруль",
+    "Гершко", "Шмуль", "Фроим", "Неух", "Нуто", "Хаим", "Мойше", "Янкель", "Ицко", "Лейба",
+    "Берко", "Мордко", "Абрам", "Исаак", "Яков", "Давид", "Шлема", "Мендель", "Зельман",
+    "Пейсах", "Борух", "Ошер", "Хаим-Меер", "Файвель-Ицхок", "Иосиф", "Моисей", "Арон",
+]
+
+FEMALE_GIVEN = [
+    "Стера", "Груня", "Песя", "Итка", "Эска", "Фало", "Устурка", "Дыся", "Идка", "Ципа",
+    "Сося", "Двойра", "Гитля", "Церлия", "Ента", "Геся", "Хана", "Рейзя", "Малка", "Фейга",
+    "Бейла", "Рохля", "Сура", "Хая", "Либа", "Эстер", "Сося-Бейла", "Хая-Сура", "Ривка",
+]
+
+# Patronymics are built from MALE_GIVEN; these are the common written forms.
+PATRONYMIC_SUFFIXES = {"male": ["ович", "евич", "ов"], "female": ["овна", "евна", "ова"]}
+
+TOWNS = [
+    "Бердичев", "Шпиков", "Бердичевский у.", "Житомир", "Винница", "Умань", "Бар", "Немиров",
+    "Тульчин", "Брацлав", "Проскуров", "Каменец-Подольский", "Киев", "Радомысль", "Чуднов",
+]
+
+# Orthographic variants seen between pre-1917 and Soviet documents, used for "typo" queries.
+ORTHOGRAPHIC_SWAPS = [("е", "э"), ("и", "і"), ("ш", "щ"), ("о", "а"), ("ц", "тс"), ("г", "х"), ("й", "и")]
@@ -0,0 +1,116 @@
+"""Latency percentiles, EXPLAIN plan summaries and result-file diffs shared by the benchmarks."""
+import json
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+SCAN_NODES = {"Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Heap Scan", "Bitmap Index Scan"}
+
+
+def percentiles(samples_ms: list[float]) -> dict:
+    if len(samples_ms) < 2:
+        value = round(samples_ms[0], 3) if samples_ms else None
+        return {"n": len(samples_ms), "p50_ms": value, "p95_ms": value, "p99_ms": value, "mean_ms": value}
+    cuts = statistics.quantiles(samples_ms, n=100, method="inclusive")
+    return {
+        "n": len(samples_ms),
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+        "mean_ms": round(statistics.fmean(samples_ms), 3),
+    }
+
+
+def _node_label(node: dict) -> str:
+    label = node["Node Type"]
+    target = node.get("Index Name") or node.get("Relation Name")
+    return f"{label} on {target}" if target else label
+
+
+def plan_shape(node: dict) -> str:
+    """Compact one-line tree, e.g. ``Limit(Sort(Hash Join(Seq Scan on search_objects, Hash(...))))``."""
+    children = node.get("Plans", [])
+    if not children:
+        return _node_label(node)
+    return f"{_node_label(node)}({', '.join(plan_shape(child) for child in children)})"
+
+
+def rows_scanned(node: dict) -> int:
+    """Rows read by scan nodes, including the ones their filters threw away."""
+    total = 0
+    if node["Node Type"] in SCAN_NODES and node["Node Type"] != "Bitmap Index Scan":
+        per_loop = (
+            node.get("Actual Rows", 0)
+            + node.get("Rows Removed by Filter", 0)
+            + node.get("Rows Removed by Index Recheck", 0)
+        )
+        total += int(per_loop * node.get("Actual Loops", 1))
+    return total + sum(rows_scanned(child) for child in node.get("Plans", []))
+
+
+def summarize_plan(explain_json: list[dict]) -> dict:
+    """Summary of ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`` output."""
+    top = explain_json[0]
+    plan = top["Plan"]
+    return {
+        "shape": plan_shape(plan),
+        "rows_scanned": rows_scanned(plan),
+        "execution_ms": round(top.get("Execution Time", 0.0), 3),
+        "shared_hit_blocks": plan.get("Shared Hit Blocks", 0),
+        "shared_read_blocks": plan.get("Shared Read Blocks", 0),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(results: dict, out_dir: Path, name: str) -> Path:
+    commit = git_commit() or "nogit"
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"{name}-{stamp}-{commit}.json"
+    results.setdefault("meta", {}).update(commit=commit, created_at=stamp)
+    path.write_text(json.dumps(results, ensure_ascii=False, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return path
+
+
+def compare(old: dict, new: dict, threshold: float = 0.25, group: str = "sizes") -> tuple[list[str], bool]:
+    """Line-per-case diff of two result files, and whether any p95 regressed beyond ``threshold``.
+
+    ``group`` is the top-level key runs are filed under (corpus size, concurrency level...).
+    """
+    lines = []
+    regressed = False
+    for size, old_cases in sorted(old.get(group, {}).items(), key=lambda item: (len(item[0]), item[0])):
+        new_cases = new.get(group, {}).get(size, {})
+        for case, before in sorted(old_cases.get("cases", {}).items()):
+            after = new_cases.get("cases", {}).get(case)
+            if after is None or not before.get("p95_ms") or after.get("p95_ms") is None:
+                continue
+            change = (after["p95_ms"] - before["p95_ms"]) / before["p95_ms"]
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressed = True
+            lines.append(
+                f"{size:>8} {case:<16} p50 {before['p50_ms']:>9.2f} -> {after['p50_ms']:>9.2f}  "
+                f"p95 {before['p95_ms']:>9.2f} -> {after['p95_ms']:>9.2f} ({change:+.0%}){flag}"
+            )
+            for query, old_plan in sorted(before.get("plans", {}).items()):
+                new_plan = after.get("plans", {}).get(query)
+                if new_plan is None:
+                    continue
+                if old_plan["shape"] != new_plan["shape"]:
+                    lines.append(f"{'':>8} {case}/{query} plan: {old_plan['shape']} -> {new_plan['shape']}")
+                if old_plan["rows_scanned"] != new_plan["rows_scanned"]:
+                    lines.append(
+                        f"{'':>8} {case}/{query} rows scanned: {old_plan['rows_scanned']} -> {new_plan['rows_scanned']}"
+                    )
+    return lines, regressed
@@ -31,5 +31,10 @@ else:
 
 alembic upgrade head
 
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 echo "Migrations complete. Starting server..."
 exec "$@"
@@ -0,0 +1,7 @@
+# Picked up automatically by gunicorn from the working directory.
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    # Drop live gauges of dead workers from the aggregated /api/metrics output.
+    multiprocess.mark_process_dead(worker.pid)
@@ -11,18 +11,28 @@ os.environ.setdefault("TELEGRAM_CHAT_ID", "12345")
 
 import hashlib
 import io
+import random
+import re
+from contextlib import contextmanager
 from unittest.mock import MagicMock
 
 import pytest
 from httpx import ASGITransport, AsyncClient
-from PIL import Image as PILImage
+from PIL import Image as PILImage, ImageDraw
 from sqlalchemy import event
 
-from app.database import AsyncSessionLocal, engine, get_db
+from app.database import AsyncSessionLocal, engine, get_db, get_read_db
 from app.main import app
-from app.models import User, Image, SearchObject
+from app.models import ChangeLog, User, Image, SearchObject
 from app.models.base import Base
+from app.query_stats import install as install_query_stats, track_queries
+from app.rate_limit import reset_budgets
 from app.services.auth import hash_password, create_access_token
+from app.services.purchase_cache import invalidate_purchases
+from app.services.source_cache import invalidate_sources
+from app.services.query_log import reset_query_log
+from app.services.suggest import reset_suggest_index, stop_suggest_index_build
+from app.utils.phash import hamming
 
 
 def _levenshtein(s1, s2):
@@ -64,6 +74,41 @@ def _best_word_levenshtein(content, query):
     return min((_levenshtein(w, q) for w in words), default=999)
 
 
+def _modernize_orthography(content):
+    content = re.sub(r"ъ\b", "", content)
+    return content.translate(str.maketrans("іІiIѣѢѳѲёЁ", "иИиИеЕфФеЕ"))
+
+
+def _to_tsvector(config, content):
+    return " ".join(sorted(set(re.findall(r"\w+", content.lower()))))
+
+
+def _websearch_terms(query):
+    """(required, excluded) word sets per ``or`` alternative of a websearch_to_tsquery string."""
+    alternatives = []
+    for part in re.split(r"\s+or\s+", query.lower()):
+        words = re.findall(r"-?\w+", part.replace('"', " "))
+        alternatives.append((
+            {w for w in words if not w.startswith("-")},
+            {w[1:] for w in words if w.startswith("-")},
+        ))
+    return alternatives
+
+
+def _ts_match(vector, query):
+    lexemes = set(vector.split())
+    return any(
+        required and required <= lexemes and not excluded & lexemes
+        for required, excluded in _websearch_terms(query)
+    )
+
+
+def _ts_rank_cd(vector, query, normalization):
+    lexemes = set(vector.split())
+    hits = max(len(required & lexemes) for required, _ in _websearch_terms(query))
+    return hits / (hits + 1)
+
+
 @event.listens_for(engine.sync_engine, "connect")
 def _register_sqlite_functions(dbapi_conn, connection_record):
     dbapi_conn.create_function(
@@ -73,16 +118,47 @@ def _register_sqlite_functions(dbapi_conn, connection_record):
     dbapi_conn.create_function("word_similarity", 2, _word_similarity)
     dbapi_conn.create_function("best_word_levenshtein", 2, _best_word_levenshtein)
     dbapi_conn.create_function("greatest", -1, lambda *args: max(args) if args else 0.0)
+    # SQLite's lower() (and so ILIKE) only folds ASCII; Postgres folds Cyrillic too
+    dbapi_conn.create_function("lower", 1, lambda value: value.lower() if isinstance(value, str) else value)
+    # Full-text search: search_vector is a generated column here too, so its functions must be deterministic
+    dbapi_conn.create_function("modernize_orthography", 1, _modernize_orthography, deterministic=True)
+    dbapi_conn.create_function("to_tsvector", 2, _to_tsvector, deterministic=True)
+    dbapi_conn.create_function("websearch_to_tsquery", 2, lambda config, query: query)
+    dbapi_conn.create_function("ts_match", 2, _ts_match)
+    dbapi_conn.create_function("ts_rank_cd", 3, _ts_rank_cd)
+    # bit_count((a # b)::bit(64)) on Postgres
+    dbapi_conn.create_function("hamming_distance", 2, lambda a, b: None if a is None or b is None else hamming(a, b))
+
+
+install_query_stats(engine.sync_engine)
+
+
+@contextmanager
+def statement_budget(max_statements):
+    """Fail the test if the block issues more than ``max_statements`` SQL statements."""
+    with track_queries() as stats:
+        yield stats
+    if stats.statements > max_statements:
+        statements = "\n".join(f"{n}x {sql}" for sql, n in stats.by_statement.most_common())
+        pytest.fail(f"{stats.statements} SQL statements, budget is {max_statements}:\n{statements}")
 
 
 @pytest.fixture(autouse=True)
 async def setup_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    invalidate_purchases()
+    invalidate_sources()
+    reset_budgets()
+    reset_suggest_index()
+    reset_query_log()
     yield
+    await stop_suggest_index_build()
     async with AsyncSessionLocal() as session:
         for table in reversed(Base.metadata.sorted_tables):
             await session.execute(table.delete())
+        # The deletes above are logged by the change triggers
+        await session.execute(ChangeLog.__table__.delete())
         await session.commit()
 
 
@@ -98,6 +174,7 @@ async def client(db_session):
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
         yield c
     app.dependency_overrides.clear()
@@ -112,6 +189,23 @@ def make_test_image_bytes(width=100, height=100, color="red"):
     return buf.getvalue()
 
 
+def make_page(seed: int, size=(400, 560)) -> PILImage.Image:
+    """A light 'page' with dark text-like strokes; the seed decides where they go."""
+    rng = random.Random(seed)
+    page = PILImage.new("L", size, 235)
+    draw = ImageDraw.Draw(page)
+    for _ in range(60):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        draw.rectangle((x, y, x + rng.randint(20, 120), y + rng.randint(4, 30)), fill=rng.randint(10, 90))
+    return page
+
+
+def jpeg(image: PILImage.Image, quality: int) -> bytes:
+    buf = io.BytesIO()
+    image.convert("RGB").save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+
 async def create_user(
     db, *, username="testuser", email="test@example.com",
     password="testpass123", is_admin=False, is_verified=True,
@@ -148,8 +242,10 @@ async def create_image_record(db, image_bytes=None, image_path="test/path", imag
     return image
 
 
-async def create_search_obj(db, text_content="test search text", price=100, image_id=None):
+async def create_search_obj(db, text_content="test search text", price=100, image_id=None, created_at=None):
     obj = SearchObject(text_content=text_content, price=price, image_id=image_id)
+    if created_at is not None:
+        obj.created_at = created_at
     db.add(obj)
     await db.commit()
     await db.refresh(obj)
@@ -1,9 +1,24 @@
+import csv
 import hashlib
+import io
+import json
+from unittest.mock import patch
+from datetime import datetime, timedelta, timezone
 
-from app.models import ImageSource
+from sqlalchemy import delete, func, select, update
+
+from app.config import get_settings
+from app.models import (
+    ChangeLog, ImageAccessRequest, ImageAlias, ImagePurchase, ImageSource, OutboxMessage, PhoneticCode,
+    SearchObject, SourceStat,
+)
+from app.models.source_stats import NO_SOURCE
+from app.services.cdn import reset_purger
+from app.services.change_feed import prune_change_log
+from app.services.image import create_search_object
 from tests.conftest import (
     create_user, create_image_record, create_search_obj,
-    make_test_image_bytes, auth_header,
+    make_test_image_bytes, auth_header, jpeg, make_page,
 )
 
 
@@ -48,6 +63,27 @@ async def test_create_object_success(client, db_session):
     assert response.json()["text_content"] == "Test content"
 
 
+async def test_create_object_with_person_fields(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    image = await create_image_record(db_session)
+
+    response = await client.post(
+        "/api/admin/objects",
+        data={
+            "text_content": "Шапиро Мендель Ицкович, Бердичев, 1901",
+            "image_file_sha512": image.sha512_hash,
+            "surname": "Шапиро", "given_name": "Мендель", "patronymic": "Ицкович",
+            "residence": "Бердичев", "year": 1901,
+        },
+        files={"image_file": ("test.jpg", b"unused", "image/jpeg")},
+        headers=auth_header(admin),
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["surname"], body["patronymic"], body["year"]) == ("Шапиро", "Ицкович", 1901)
+    assert body["nationality"] is None
+
+
 async def test_list_objects(client, db_session):
     admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
     image = await create_image_record(db_session)
@@ -58,7 +94,118 @@ async def test_list_objects(client, db_session):
     assert response.status_code == 200
     data = response.json()
     assert data["total"] == 2
+    assert data["total_is_estimate"] is False
     assert len(data["items"]) == 2
+    assert data["items"][0]["image"]["sha512_hash"] == image.sha512_hash
+    assert data["items"][0]["thumbnail_url"].endswith(f"/api/images/{image.id}/thumbnail/{image.sha512_hash[:16]}")
+
+
+async def test_list_objects_keyset_pages(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    image = await create_image_record(db_session)
+    day = datetime(2026, 3, 1)
+    # Two share a timestamp: id breaks the tie
+    for i, created_at in enumerate([day, day + timedelta(hours=1), day + timedelta(hours=1), day + timedelta(hours=2)]):
+        await create_search_obj(db_session, text_content=f"Obj {i}", image_id=image.id, created_at=created_at)
+
+    seen, cursor, totals = [], None, []
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        data = (await client.get("/api/admin/objects", params=params, headers=auth_header(admin))).json()
+        seen += [item["text_content"] for item in data["items"]]
+        totals.append(data["total"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == ["Obj 3", "Obj 2", "Obj 1", "Obj 0"]
+    assert totals == [4, None]
+
+
+async def test_list_objects_filters(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    archive = ImageSource(source_name="ДАЖО")
+    db_session.add(archive)
+    await db_session.commit()
+    image_a = await create_image_record(db_session, make_test_image_bytes(color="red"), image_path="r-1/1/2_1")
+    image_b = await create_image_record(db_session, make_test_image_bytes(color="blue"), image_path="r-10/1/2_1")
+    image_a.image_source_id = archive.id
+    await db_session.commit()
+    await create_search_obj(db_session, text_content="Коган Хаим", image_id=image_a.id, created_at=datetime(2026, 1, 5))
+    await create_search_obj(db_session, text_content="Шапиро Лея", image_id=image_b.id, created_at=datetime(2026, 2, 5))
+
+    async def texts(**params):
+        response = await client.get("/api/admin/objects", params=params, headers=auth_header(admin))
+        assert response.json()["total"] == len(response.json()["items"])
+        return [item["text_content"] for item in response.json()["items"]]
+
+    assert await texts(source_id=archive.id) == ["Коган Хаим"]
+    assert await texts(text="шапиро") == ["Шапиро Лея"]
+    assert await texts(image_path_prefix="r-1/") == ["Коган Хаим"]
+    assert await texts(created_from="2026-02-01T00:00:00") == ["Шапиро Лея"]
+    assert await texts(created_to="2026-02-01T00:00:00") == ["Коган Хаим"]
+
+
+async def test_list_objects_rejects_a_bad_cursor(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    response = await client.get("/api/admin/objects", params={"cursor": "bm9wZQ=="}, headers=auth_header(admin))
+    assert response.status_code == 400
+
+
+async def test_export_objects_csv(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    image = await create_image_record(db_session)
+    await create_search_obj(db_session, text_content="Коган, Шлема", price=5, image_id=image.id)
+    await create_search_obj(db_session, text_content="Без скана")
+
+    response = await client.get("/api/admin/objects/export", headers=auth_header(admin))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "x-export-started-at" in response.headers
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["text_content"] for row in rows] == ["Коган, Шлема", "Без скана"]
+    assert rows[0]["image_path"] == image.image_path and rows[0]["price"] == "5"
+    assert rows[1]["image_id"] == ""
+
+
+async def test_export_objects_ndjson_filters(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    source = ImageSource(source_name="Archive", description="")
+    db_session.add(source)
+    await db_session.commit()
+    image = await create_image_record(db_session)
+    image.image_source_id = source.id
+    await db_session.commit()
+    old = await create_search_obj(db_session, text_content="Old", image_id=image.id)
+    old.updated_at = datetime(2020, 1, 1)
+    await db_session.commit()
+    await create_search_obj(db_session, text_content="New", image_id=image.id)
+    await create_search_obj(db_session, text_content="Elsewhere")
+
+    response = await client.get(
+        "/api/admin/objects/export",
+        params={"format": "ndjson", "source_id": source.id, "modified_since": "2024-01-01T00:00:00Z"},
+        headers=auth_header(admin),
+    )
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["text_content"] for record in records] == ["New"]
+    assert records[0]["source_id"] == source.id
+
+
+async def test_export_cursor_leaves_room_for_open_transactions(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    with patch.object(get_settings(), "export_settle_seconds", 60):
+        before = datetime.now(timezone.utc).replace(tzinfo=None)
+        response = await client.get("/api/admin/objects/export", headers=auth_header(admin))
+    started_at = datetime.fromisoformat(response.headers["X-Export-Started-At"])
+    assert before - timedelta(seconds=60) <= started_at < before - timedelta(seconds=55)
+
+
+async def test_export_objects_requires_admin(client, db_session):
+    user = await create_user(db_session)
+    response = await client.get("/api/admin/objects/export", headers=auth_header(user))
+    assert response.status_code == 401
 
 
 async def test_update_object(client, db_session):
@@ -78,6 +225,25 @@ async def test_update_object(client, db_session):
     assert response.json()["text_content"] == "Updated"
 
 
+async def test_update_object_corrects_person_fields(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    image = await create_image_record(db_session)
+    obj = await create_search_obj(db_session, text_content="Каган Шлема", image_id=image.id)
+    obj.surname, obj.year = "Каган", 1901
+    await db_session.commit()
+
+    response = await client.put(
+        f"/api/admin/objects/{obj.id}",
+        data={
+            "text_content": "Коган Шлема", "image_path": image.image_path, "image_key": image.image_key,
+            "surname": "Коган", "given_name": "Шлема",
+        },
+        headers=auth_header(admin),
+    )
+    body = response.json()
+    assert (body["surname"], body["given_name"], body["year"]) == ("Коган", "Шлема", 1901)
+
+
 async def test_delete_object(client, db_session):
     admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
     image = await create_image_record(db_session)
@@ -88,12 +254,261 @@ async def test_delete_object(client, db_session):
     assert response.json()["status"] == "deleted"
 
 
+async def test_create_and_delete_object_maintain_source_stats(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    image = await create_image_record(db_session)
+
+    response = await client.post(
+        "/api/admin/objects",
+        data={"text_content": "Counted", "image_file_sha512": image.sha512_hash},
+        files={"image_file": ("test.jpg", b"unused", "image/jpeg")},
+        headers=auth_header(admin),
+    )
+    assert response.status_code == 200
+    stat = await db_session.get(SourceStat, NO_SOURCE)
+    assert stat.object_count == 1
+
+    await client.delete(f"/api/admin/objects/{response.json()['id']}", headers=auth_header(admin))
+    await db_session.refresh(stat)
+    assert stat.object_count == 0
+
+
 async def test_delete_object_not_found(client, db_session):
     admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
     response = await client.delete("/api/admin/objects/999", headers=auth_header(admin))
     assert response.status_code == 404
 
 
+async def test_bulk_edit_rows(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    image = await create_image_record(db_session)
+    first = await create_search_obj(db_session, text_content="Каган Шлема", price=10, image_id=image.id)
+    second = await create_search_obj(db_session, text_content="Рабинович Хая", price=20)
+    await db_session.execute(PhoneticCode.__table__.insert(), [{"code": "000000", "search_object_id": first.id}])
+    await db_session.commit()
+
+    response = await client.patch(
+        "/api/admin/objects:bulk",
+        json={"rows": [{"id": first.id, "text_content": "Коган Шлема"}, {"id": second.id, "price": 30}]},
+        headers=auth_header(admin),
+    )
+    assert response.status_code == 200
+    assert response.json() == {"updated": 2, "text_changed": 1}
+
+    rows = dict((await db_session.execute(
+        select(SearchObject.text_content, SearchObject.price).order_by(SearchObject.id)
+    )).all())
+    assert rows == {"Коган Шлема": 10, "Рабинович Хая": 30}
+    codes = set(await db_session.scalars(select(PhoneticCode.code).where(PhoneticCode.search_object_id == first.id)))
+    assert "000000" not in codes and codes
+
+    response = await client.get("/api/search", params={"q": "Коган", "mode": "phonetic"})
+    assert response.json()["total"] == 1
+
+
+async def test_bulk_edit_rows_sets_person_fields(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    obj = await create_search_obj(db_session, text_content="Каган Шлема")
+    obj.residence = "Бердичев"
+    await db_session.commit()
+
+    response = await client.patch(
+        "/api/admin/objects:bulk",
+        json={"rows": [{"id": obj.id, "text_content": "Коган Шлема", "surname": "Коган", "year": 1901}]},
+        headers=auth_header(admin),
+    )
+    assert response.status_code == 200
+    await db_session.refresh(obj)
+    assert (obj.surname, obj.year, obj.residence) == ("Коган", 1901, "Бердичев")
+
+
+async def test_bulk_edit_rows_is_all_or_nothing(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    obj = await create_search_obj(db_session, text_content="Original", price=10)
+
+    response = await client.patch(
+        "/api/admin/objects:bulk",
+        json={"rows": [{"id": obj.id, "price": 99}, {"id": 999, "price": 1}]},
+        headers=auth_header(admin),
+    )
+    assert response.status_code == 404
+    await db_session.refresh(obj)
+    assert obj.price == 10
+
+    response = await client.patch(
+        "/api/admin/objects:bulk",
+        json={"rows": [{"id": obj.id, "price": 1}, {"id": obj.id, "price": 2}]},
+        headers=auth_header(admin),
+    )
+    assert response.status_code == 400
+
+
+async def test_bulk_edit_where_moves_objects_between_sources(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    source = ImageSource(source_name="Archive", description="")
+    db_session.add(source)
+    await db_session.commit()
+    old_image = await create_image_record(db_session, image_path="fond/1", image_key="1")
+    new_image = await create_image_record(db_session, image_bytes=make_test_image_bytes(color="blue"), image_key="2")
+    new_image.image_source_id = source.id
+    db_session.add(SourceStat(image_source_id=NO_SOURCE, object_count=3))
+    await db_session.commit()
+    for text in ("one", "two", "three"):
+        await create_search_obj(db_session, text_content=text, image_id=old_image.id)
+
+    response = await client.patch(
+        "/api/admin/objects:bulk",
+        json={"where": {"image_path_prefix": "fond/", "text": "o"}, "changes": {"image_id": new_image.id, "price": 7}},
+        headers=auth_header(admin),
+    )
+    assert response.status_code == 200
+    assert response.json()["updated"] == 2
+
+    counts = dict((await db_session.execute(select(SourceStat.image_source_id, SourceStat.object_count))).all())
+    assert counts == {NO_SOURCE: 1, source.id: 2}
+    moved = (await db_session.scalars(select(SearchObject.price).where(SearchObject.image_id == new_image.id))).all()
+    assert moved == [7, 7]
+
+
+async def test_bulk_edit_where_needs_a_filter(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    for body in (
+        {"where": {}, "changes": {"price": 1}},
+        {"where": {"ids": [1]}},
+        {"rows": [], "where": {"ids": [1]}, "changes": {"price": 1}},
+    ):
+        response = await client.patch("/api/admin/objects:bulk", json=body, headers=auth_header(admin))
+        assert response.status_code in (400, 422)
+
+
+async def test_change_feed(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    image = await create_image_record(db_session)
+    first = await create_search_obj(db_session, text_content="One", image_id=image.id)
+    second = await create_search_obj(db_session, text_content="Two", image_id=image.id)
+
+    response = await client.get("/api/admin/changes", headers=auth_header(admin))
+    feed = response.json()
+    assert feed["changes"] == [
+        {"table": "images", "id": image.id, "op": "insert"},
+        {"table": "search_objects", "id": first.id, "op": "insert"},
+        {"table": "search_objects", "id": second.id, "op": "insert"},
+    ]
+    assert feed["has_more"] is False
+
+    await client.patch(
+        "/api/admin/objects:bulk", json={"rows": [{"id": first.id, "price": 1}]}, headers=auth_header(admin),
+    )
+    await client.delete(f"/api/admin/objects/{first.id}", headers=auth_header(admin))
+    response = await client.get("/api/admin/changes", params={"since": feed["cursor"]}, headers=auth_header(admin))
+    # The update and the delete of the same row compact to the delete
+    assert response.json()["changes"] == [{"table": "search_objects", "id": first.id, "op": "delete"}]
+    assert response.json()["cursor"] != feed["cursor"]
+
+
+async def test_change_feed_pages_in_transaction_order(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    objects = [await create_search_obj(db_session, text_content=f"Object {i}") for i in range(3)]
+    # A transaction that started first sorts first, whatever ids its entries drew
+    last_id = await db_session.scalar(select(func.max(ChangeLog.id)))
+    await db_session.execute(update(ChangeLog).where(ChangeLog.id == last_id).values(xid=1))
+    await db_session.execute(update(ChangeLog).where(ChangeLog.id < last_id).values(xid=2))
+    await db_session.commit()
+
+    response = await client.get("/api/admin/changes", params={"limit": 2}, headers=auth_header(admin))
+    page = response.json()
+    assert [c["id"] for c in page["changes"]] == [objects[2].id, objects[0].id] and page["has_more"] is True
+    assert page["cursor"].startswith("2.")
+    response = await client.get(
+        "/api/admin/changes", params={"since": page["cursor"], "limit": 2}, headers=auth_header(admin),
+    )
+    assert [c["id"] for c in response.json()["changes"]] == [objects[1].id]
+    assert response.json()["has_more"] is False
+
+    response = await client.get("/api/admin/changes", params={"since": "not-a-cursor"}, headers=auth_header(admin))
+    assert response.status_code == 422
+
+
+async def test_change_feed_reports_a_pruned_cursor(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    for i in range(3):
+        await create_search_obj(db_session, text_content=f"Object {i}")
+    first, second, third = (await db_session.scalars(select(ChangeLog.id).order_by(ChangeLog.id))).all()
+    await db_session.execute(update(ChangeLog).where(ChangeLog.id < third).values(changed_at=datetime(2020, 1, 1)))
+    # A gap left by a rolled-back insert is not mistaken for pruning
+    await db_session.execute(delete(ChangeLog).where(ChangeLog.id == second))
+    await db_session.commit()
+    response = await client.get("/api/admin/changes", params={"since": str(first)}, headers=auth_header(admin))
+    assert response.status_code == 200
+
+    await prune_change_log(db_session, days=30)
+    assert (await db_session.scalars(select(ChangeLog.id))).all() == [third]
+
+    response = await client.get("/api/admin/changes", params={"since": "0"}, headers=auth_header(admin))
+    assert response.status_code == 410
+    assert response.json()["detail"].endswith(f"continue from 0.{first}")
+    response = await client.get("/api/admin/changes", params={"since": f"0.{first}"}, headers=auth_header(admin))
+    assert response.status_code == 200 and len(response.json()["changes"]) == 1
+
+
+async def test_update_image_queues_cdn_purge(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    image = await create_image_record(db_session)
+
+    with patch.object(get_settings(), "cdn_purge_backend", "fake"), patch.object(get_settings(), "cdn_base", "https://cdn"):
+        reset_purger()
+        try:
+            response = await client.patch(
+                f"/api/admin/images/{image.id}", data={"image_key": "new-key"}, headers=auth_header(admin),
+            )
+        finally:
+            reset_purger()
+    assert response.status_code == 200
+    message = (await db_session.execute(select(OutboxMessage))).scalar_one()
+    assert message.channel == "cdn_purge"
+    assert message.payload == {"urls": [f"https://cdn/api/images/{image.id}/thumbnail"]}
+
+
+async def test_near_duplicate_report_and_ingest_merge(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    page = make_page(1)
+    scan, rescan, other = jpeg(page, 95), jpeg(page.resize((300, 420)), 40), jpeg(make_page(2), 95)
+    for key, image_bytes in (("scan", scan), ("rescan", rescan), ("other", other)):
+        sha512 = hashlib.sha512(image_bytes).hexdigest()
+        response = await client.post(
+            "/api/admin/images",
+            data={"image_path": "fond/1", "image_key": key, "image_file_sha512": sha512},
+            files={"image_file": ("page.jpg", image_bytes, "image/jpeg")},
+            headers=auth_header(admin),
+        )
+        assert response.status_code == 200
+
+    response = await client.get("/api/admin/images/near-duplicates", headers=auth_header(admin))
+    report = response.json()
+    assert report["hashed_images"] == 3 and report["groups_total"] == 1
+    assert [image["image_key"] for image in report["groups"][0]] == ["scan", "rescan"]
+
+    # With merging on, another re-scan is stored as an alias of the first scan
+    again = jpeg(page.resize((320, 448)), 60)
+    sha512 = hashlib.sha512(again).hexdigest()
+    with patch.object(get_settings(), "merge_near_duplicate_images", True):
+        response = await client.post(
+            "/api/admin/images",
+            data={"image_path": "fond/1", "image_key": "again", "image_file_sha512": sha512},
+            files={"image_file": ("page.jpg", again, "image/jpeg")},
+            headers=auth_header(admin),
+        )
+    assert response.json()["image_key"] == "scan"
+    alias = await db_session.get(ImageAlias, sha512)
+    assert (alias.image_path, alias.image_key) == ("fond/1", "again")
+    # An object referencing the merged upload by its own hash lands on the kept image
+    response = await client.post(
+        "/api/admin/objects", data={"text_content": "Коган", "image_file_sha512": sha512}, headers=auth_header(admin),
+    )
+    assert response.status_code == 200
+    assert response.json()["image"]["image_key"] == "scan"
+
+
 async def test_list_image_sources(client, db_session):
     admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
     source = ImageSource(source_name="Test Archive", description="A test source")
@@ -105,3 +520,65 @@ async def test_list_image_sources(client, db_session):
     data = response.json()
     assert len(data) == 1
     assert data[0]["source_name"] == "Test Archive"
+
+
+async def test_moving_an_image_between_sources_moves_its_facet_counts(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    archive_a, archive_b = ImageSource(source_name="Archive A"), ImageSource(source_name="Archive B")
+    db_session.add_all([archive_a, archive_b])
+    await db_session.commit()
+    image = await create_image_record(db_session)
+    image.image_source_id = archive_a.id
+    await db_session.commit()
+    image_id = image.id
+    for text in ("Коган", "Шапиро"):
+        await create_search_object(db_session, text, image_id)
+
+    async def facets():
+        response = await client.get("/api/search", params={"q": "", "facets": True})
+        return {facet["source_id"]: facet["count"] for facet in response.json()["facets"]}
+
+    assert await facets() == {archive_a.id: 2}
+    response = await client.patch(
+        f"/api/admin/images/{image_id}", data={"image_source_id": archive_b.id}, headers=auth_header(admin),
+    )
+    assert response.status_code == 200
+    assert await facets() == {archive_b.id: 2}
+
+
+async def test_bulk_decide_access_requests(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    user = await create_user(db_session, email="u@example.com")
+    image1 = await create_image_record(db_session, image_bytes=make_test_image_bytes(color="red"))
+    image2 = await create_image_record(db_session, image_bytes=make_test_image_bytes(color="blue"))
+    requests = [
+        ImageAccessRequest(user_id=user.id, image_id=image.id, status="pending", caption="cap")
+        for image in (image1, image2)
+    ]
+    db_session.add_all(requests)
+    # Already purchased: the bulk insert must skip it instead of failing
+    db_session.add(ImagePurchase(user_id=user.id, image_id=image1.id))
+    await db_session.commit()
+
+    response = await client.post(
+        "/api/admin/access-requests/decide",
+        json={"action": "approve"},
+        headers=auth_header(admin),
+    )
+    assert response.status_code == 200
+    assert response.json()["decided"] == 2
+
+    purchases = (await db_session.execute(select(ImagePurchase))).scalars().all()
+    assert sorted(p.image_id for p in purchases) == sorted([image1.id, image2.id])
+
+    listing = await client.get("/api/admin/access-requests", headers=auth_header(admin))
+    assert listing.json() == []
+
+
+async def test_pool_stats(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    response = await client.get("/api/admin/pool-stats", headers=auth_header(admin))
+    assert response.status_code == 200
+    data = response.json()
+    assert data["checkouts"] >= 1
+    assert {"pid", "size", "checked_out", "overflow", "wait_seconds_max"} <= data.keys()
@@ -1,11 +1,18 @@
 from unittest.mock import patch, AsyncMock
 
+from sqlalchemy import select
+
+from app.models import OutboxMessage
 from tests.conftest import create_user
 
 
+async def _outbox_emails(db):
+    result = await db.execute(select(OutboxMessage).where(OutboxMessage.channel == "email"))
+    return result.scalars().all()
+
+
 async def test_register_success(client, db_session):
-    with patch("app.routers.auth.verify_hcaptcha", new_callable=AsyncMock, return_value=True), \
-         patch("app.routers.auth.send_email", new_callable=AsyncMock):
+    with patch("app.routers.auth.verify_hcaptcha", new_callable=AsyncMock, return_value=True):
         response = await client.post("/api/register", json={
             "username": "newuser",
             "email": "new@example.com",
@@ -13,12 +20,13 @@ async def test_register_success(client, db_session):
             "captcha_token": "fake-token",
         })
     assert response.status_code == 200
+    messages = await _outbox_emails(db_session)
+    assert [m.payload["to_email"] for m in messages] == ["new@example.com"]
 
 
 async def test_register_duplicate_email(client, db_session):
     await create_user(db_session, email="dup@example.com")
-    with patch("app.routers.auth.verify_hcaptcha", new_callable=AsyncMock, return_value=True), \
-         patch("app.routers.auth.send_email", new_callable=AsyncMock):
+    with patch("app.routers.auth.verify_hcaptcha", new_callable=AsyncMock, return_value=True):
         response = await client.post("/api/register", json={
             "username": "another",
             "email": "dup@example.com",
@@ -31,8 +39,7 @@ async def test_register_duplicate_email(client, db_session):
 
 async def test_register_duplicate_username_allowed(client, db_session):
     await create_user(db_session, username="taken")
-    with patch("app.routers.auth.verify_hcaptcha", new_callable=AsyncMock, return_value=True), \
-         patch("app.routers.auth.send_email", new_callable=AsyncMock):
+    with patch("app.routers.auth.verify_hcaptcha", new_callable=AsyncMock, return_value=True):
         response = await client.post("/api/register", json={
             "username": "taken",
             "email": "other@example.com",
@@ -43,8 +50,7 @@ async def test_register_duplicate_username_allowed(client, db_session):
 
 
 async def test_register_strips_whitespace(client, db_session):
-    with patch("app.routers.auth.verify_hcaptcha", new_callable=AsyncMock, return_value=True), \
-         patch("app.routers.auth.send_email", new_callable=AsyncMock):
+    with patch("app.routers.auth.verify_hcaptcha", new_callable=AsyncMock, return_value=True):
         response = await client.post("/api/register", json={
             "username": "  spacey  ",
             "email": "spacey@example.com",
@@ -124,27 +130,25 @@ async def test_verify_invalid_token(client):
 
 async def test_forgot_password_existing_user(client, db_session):
     await create_user(db_session, email="forgot@example.com")
-    with patch("app.routers.auth.send_email", new_callable=AsyncMock) as mock_send:
-        response = await client.post("/api/forgot-password", json={"email": "forgot@example.com"})
+    response = await client.post("/api/forgot-password", json={"email": "forgot@example.com"})
     assert response.status_code == 200
     assert "существует" in response.json()["message"]
-    mock_send.assert_called_once()
+    messages = await _outbox_emails(db_session)
+    assert [m.payload["to_email"] for m in messages] == ["forgot@example.com"]
 
 
-async def test_forgot_password_unknown_email(client):
-    with patch("app.routers.auth.send_email", new_callable=AsyncMock) as mock_send:
-        response = await client.post("/api/forgot-password", json={"email": "nobody@example.com"})
+async def test_forgot_password_unknown_email(client, db_session):
+    response = await client.post("/api/forgot-password", json={"email": "nobody@example.com"})
     assert response.status_code == 200
     assert "существует" in response.json()["message"]
-    mock_send.assert_not_called()
+    assert await _outbox_emails(db_session) == []
 
 
 async def test_forgot_password_unverified_user(client, db_session):
     await create_user(db_session, email="unverified@example.com", is_verified=False)
-    with patch("app.routers.auth.send_email", new_callable=AsyncMock) as mock_send:
-        response = await client.post("/api/forgot-password", json={"email": "unverified@example.com"})
+    response = await client.post("/api/forgot-password", json={"email": "unverified@example.com"})
     assert response.status_code == 200
-    mock_send.assert_not_called()
+    assert await _outbox_emails(db_session) == []
 
 
 async def test_reset_password_success(client, db_session):
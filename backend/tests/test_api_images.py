@@ -43,6 +43,18 @@ async def test_get_thumbnail(client, db_session):
     assert response.headers["content-type"] == "image/jpeg"
 
 
+async def test_versioned_thumbnail_is_immutable(client, db_session):
+    image = await create_image_record(db_session)
+    response = await client.get(f"/api/images/{image.id}/thumbnail/{image.sha512_hash[:16]}")
+    assert response.status_code == 200
+    assert "immutable" in response.headers["cache-control"]
+
+    response = await client.get(f"/api/images/{image.id}/thumbnail/0000000000000000")
+    assert response.status_code == 302
+    assert response.headers["location"] == f"/api/images/{image.id}/thumbnail/{image.sha512_hash[:16]}"
+    assert "immutable" not in response.headers["cache-control"]
+
+
 async def test_get_thumbnail_not_found(client):
     response = await client.get("/api/images/999/thumbnail")
     assert response.status_code == 404
@@ -1,4 +1,28 @@
-from tests.conftest import create_user, create_image_record, create_search_obj, auth_header
+from sqlalchemy import select
+
+from app.models import ImageSource, SourceStat
+from app.schemas import PersonFields
+from app.services.image import create_search_object
+from app.services.source_cache import invalidate_sources
+from app.services.source_stats import refresh_source_stats
+from tests.conftest import create_user, create_image_record, create_search_obj, auth_header, make_test_image_bytes
+
+
+async def _two_source_corpus(db):
+    archive_a = ImageSource(source_name="Archive A")
+    archive_b = ImageSource(source_name="Archive B")
+    db.add_all([archive_a, archive_b])
+    await db.commit()
+    image_a = await create_image_record(db, make_test_image_bytes(color="red"), image_key="A-1")
+    image_b = await create_image_record(db, make_test_image_bytes(color="blue"), image_key="B-1")
+    image_a.image_source_id = archive_a.id
+    image_b.image_source_id = archive_b.id
+    await db.commit()
+    for i in range(3):
+        await create_search_object(db, f"Коган {i}", image_a.id)
+    await create_search_object(db, "Коган Хаим", image_b.id)
+    await create_search_object(db, "Шапиро Песя", image_b.id)
+    return archive_a, archive_b
 
 
 async def test_search_returns_results(client, db_session):
@@ -43,3 +67,170 @@ async def test_search_pagination(client, db_session):
     data = response.json()
     assert data["total"] == 5
     assert len(data["items"]) == 2
+
+
+async def test_search_facets_count_every_source_in_one_pass(client, db_session):
+    archive_a, archive_b = await _two_source_corpus(db_session)
+
+    response = await client.get("/api/search", params={"q": "Коган", "mode": "exact", "facets": True})
+    data = response.json()
+    assert data["total"] == 4
+    assert data["facets"] == [{"source_id": archive_a.id, "count": 3}, {"source_id": archive_b.id, "count": 1}]
+
+    # Filtering by a source narrows the page and total, but keeps the other sources' counts
+    response = await client.get(
+        "/api/search", params={"q": "Коган", "mode": "exact", "facets": True, "source_id": archive_b.id},
+    )
+    data = response.json()
+    assert data["total"] == 1
+    assert len(data["items"]) == 1
+    assert len(data["facets"]) == 2
+
+
+async def test_search_attaches_cached_sources(client, db_session):
+    archive_a, archive_b = await _two_source_corpus(db_session)
+    response = await client.get("/api/search", params={"q": "Хаим", "mode": "exact"})
+    assert response.json()["items"][0]["image"]["source"] == {
+        "id": archive_b.id, "source_name": "Archive B", "description": None,
+    }
+
+
+async def test_sources_are_cached_with_etag(client, db_session):
+    db_session.add(ImageSource(source_name="Archive B"))
+    await db_session.commit()
+
+    response = await client.get("/api/sources")
+    assert [source["source_name"] for source in response.json()] == ["Archive B"]
+    assert "max-age" in response.headers["Cache-Control"]
+    etag = response.headers["ETag"]
+    assert (await client.get("/api/sources", headers={"If-None-Match": etag})).status_code == 304
+
+    # Rows added behind the cache's back stay invisible until it expires or is invalidated
+    db_session.add_all([ImageSource(source_name="Archive C"), ImageSource(source_name="Archive A")])
+    await db_session.commit()
+    assert (await client.get("/api/sources", headers={"If-None-Match": etag})).status_code == 304
+
+    invalidate_sources()
+    response = await client.get("/api/sources", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert [source["source_name"] for source in response.json()] == ["Archive A", "Archive B", "Archive C"]
+
+
+async def test_search_without_facets_omits_them(client, db_session):
+    await _two_source_corpus(db_session)
+    response = await client.get("/api/search", params={"q": "Коган"})
+    assert response.json()["facets"] is None
+
+
+async def test_empty_query_facets_come_from_source_stats(client, db_session):
+    archive_a, archive_b = await _two_source_corpus(db_session)
+
+    stats = {row.image_source_id: row.object_count for row in (await db_session.scalars(select(SourceStat))).all()}
+    assert stats == {archive_a.id: 3, archive_b.id: 2}
+
+    # Prove the answer comes from the table, not a scan
+    (await db_session.get(SourceStat, archive_a.id)).object_count = 30
+    await db_session.commit()
+    data = (await client.get("/api/search", params={"q": "", "facets": True})).json()
+    assert data["total"] == 32
+    assert data["facets"][0] == {"source_id": archive_a.id, "count": 30}
+
+    await refresh_source_stats(db_session)
+    await db_session.commit()
+    data = (await client.get("/api/search", params={"q": "", "facets": True})).json()
+    assert data["total"] == 5
+
+
+async def test_phonetic_mode_matches_spelling_variants(client, db_session):
+    image = await create_image_record(db_session)
+    await create_search_object(db_session, "Шлойма Гиршкович", image.id)
+    await create_search_object(db_session, "Шлема Коган", image.id)
+    await create_search_object(db_session, "Лейба Гиршкович", image.id)
+
+    response = await client.get("/api/search", params={"q": "Шлема", "mode": "phonetic"})
+    assert response.json()["total"] == 2
+    # Closer spelling ranks first
+    assert response.json()["items"][0]["text_content"] == "Шлема Коган"
+
+    response = await client.get("/api/search", params={"q": "Шлема Гершкович", "mode": "phonetic"})
+    assert [item["text_content"] for item in response.json()["items"]] == ["Шлойма Гиршкович"]
+
+
+async def test_phonetic_mode_follows_admin_edits(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    image = await create_image_record(db_session)
+    obj = await create_search_object(db_session, "Мойше Коган", image.id)
+
+    response = await client.put(
+        f"/api/admin/objects/{obj.id}",
+        data={"text_content": "Мойше Шапиро", "image_path": image.image_path, "image_key": image.image_key},
+        headers=auth_header(admin),
+    )
+    assert response.status_code == 200
+
+    response = await client.get("/api/search", params={"q": "Каган", "mode": "phonetic"})
+    assert response.json()["total"] == 0
+    response = await client.get("/api/search", params={"q": "Шапира", "mode": "phonetic"})
+    assert response.json()["total"] == 1
+
+
+async def test_phonetic_mode_without_names_falls_back_to_substring(client, db_session):
+    image = await create_image_record(db_session)
+    await create_search_object(db_session, "Коган 1897", image.id)
+
+    response = await client.get("/api/search", params={"q": "1897", "mode": "phonetic"})
+    assert response.json()["total"] == 1
+
+
+async def _ledger_corpus(db):
+    image = await create_image_record(db)
+    rows = [
+        ("Коган Хаим, Бердичев", PersonFields(surname="Коган", given_name="Хаим", residence="Бердичев", year=1897)),
+        ("Коган Сура, Житомир, 1905", PersonFields(surname="Коган", given_name="Сура", residence="Житомир", year=1905)),
+        ("Каганович Мошко, Бердичев, 1899", PersonFields(surname="Каганович", residence="г. Бердичев", year=1899)),
+        ("Коган Ицко", None),
+    ]
+    for text_content, person in rows:
+        await create_search_object(db, text_content, image.id, person=person)
+
+
+async def test_person_filters_narrow_results(client, db_session):
+    await _ledger_corpus(db_session)
+
+    response = await client.get("/api/search", params={"q": "", "surname": "коган"})
+    assert response.json()["total"] == 2
+
+    response = await client.get("/api/search", params={"q": "", "residence": "бердичев", "year_from": 1898})
+    assert [item["text_content"] for item in response.json()["items"]] == ["Каганович Мошко, Бердичев, 1899"]
+
+    response = await client.get("/api/search", params={"q": "Хаим", "surname": "Коган", "year_to": 1900})
+    items = response.json()["items"]
+    assert len(items) == 1
+    assert items[0]["given_name"] == "Хаим"
+    assert items[0]["year"] == 1897
+
+
+async def test_person_filters_apply_to_empty_query_facets(client, db_session):
+    await _ledger_corpus(db_session)
+
+    response = await client.get("/api/search", params={"q": "", "year_from": 1900, "facets": "true"})
+    assert response.json()["total"] == 1
+    assert response.json()["facets"] == [{"source_id": None, "count": 1}]
+
+
+async def test_fulltext_mode_matches_words_in_any_order(client, db_session):
+    image = await create_image_record(db_session)
+    await create_search_object(db_session, "Шлема Гершко, м. Бердичев", image.id)
+    await create_search_object(db_session, "Гершко Ривка, м. Бердичевъ", image.id)
+    await create_search_object(db_session, "Шлема Коган, м. Житомир", image.id)
+
+    response = await client.get("/api/search", params={"q": "Бердичев Шлема", "mode": "fulltext"})
+    assert [item["text_content"] for item in response.json()["items"]] == ["Шлема Гершко, м. Бердичев"]
+
+    # Pre-reform spelling is normalized on both sides
+    response = await client.get("/api/search", params={"q": "Гершко Бердичевъ", "mode": "fulltext"})
+    assert response.json()["total"] == 2
+
+    response = await client.get("/api/search", params={"q": "Гершко -Шлема", "mode": "fulltext"})
+    assert [item["text_content"] for item in response.json()["items"]] == ["Гершко Ривка, м. Бердичевъ"]
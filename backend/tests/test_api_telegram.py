@@ -1,10 +1,9 @@
-from unittest.mock import patch, AsyncMock, MagicMock
+from unittest.mock import patch, AsyncMock
 
-import httpx
 from sqlalchemy import select
 
-from app.models import ImagePurchase
-from tests.conftest import create_user, create_image_record, auth_header
+from app.models import ImageAccessRequest, ImagePurchase, OutboxMessage
+from tests.conftest import create_user, create_image_record, auth_header, make_test_image_bytes
 
 
 async def test_request_access_unauthenticated(client, db_session):
@@ -29,19 +28,20 @@ async def test_request_access_success(client, db_session):
     user = await create_user(db_session, telegram_username="tguser")
     image = await create_image_record(db_session)
 
-    mock_resp = MagicMock(spec=httpx.Response)
-    mock_resp.status_code = 200
-    mock_resp.json.return_value = {"result": {"photo": [{"file_id": "fid"}]}}
-
-    with patch("app.routers.telegram.send_photo_to_chat", new_callable=AsyncMock, return_value=mock_resp):
-        response = await client.post(
-            "/api/request_access",
-            json={"image_id": image.id, "search_text_content": "some text"},
-            headers=auth_header(user),
-        )
+    response = await client.post(
+        "/api/request_access",
+        json={"image_id": image.id, "search_text_content": "some text"},
+        headers=auth_header(user),
+    )
     assert response.status_code == 200
     assert response.json()["ok"] is True
 
+    result = await db_session.execute(select(OutboxMessage))
+    message = result.scalars().one()
+    assert message.channel == "telegram_photo"
+    assert message.payload["image_id"] == image.id
+    assert "@tguser" in message.payload["caption"]
+
 
 async def test_request_access_image_not_found(client, db_session):
     user = await create_user(db_session)
@@ -105,3 +105,62 @@ async def test_handle_access_deny(client, db_session):
 async def test_handle_access_no_callback(client):
     response = await client.post("/api/admin/access", json={"update_id": 3})
     assert response.status_code == 200
+
+
+async def test_request_access_records_pending_request(client, db_session):
+    user = await create_user(db_session)
+    image = await create_image_record(db_session)
+
+    response = await client.post(
+        "/api/request_access",
+        json={"image_id": image.id, "search_text_content": "some text"},
+        headers=auth_header(user),
+    )
+    assert response.status_code == 200
+
+    access_request = (await db_session.execute(select(ImageAccessRequest))).scalar_one()
+    assert (access_request.user_id, access_request.image_id, access_request.status) == (user.id, image.id, "pending")
+    message = (await db_session.execute(select(OutboxMessage))).scalar_one()
+    assert message.payload["access_request_id"] == access_request.id
+
+
+async def test_approve_all_command(client, db_session):
+    user = await create_user(db_session, email="u@example.com")
+    image1 = await create_image_record(db_session, image_bytes=make_test_image_bytes(color="red"))
+    image2 = await create_image_record(db_session, image_bytes=make_test_image_bytes(color="blue"))
+    for image in (image1, image2):
+        db_session.add(ImageAccessRequest(
+            user_id=user.id, image_id=image.id, status="pending", caption="cap", chat_id=12345, message_id=image.id,
+        ))
+    await db_session.commit()
+
+    payload = {
+        "update_id": 4,
+        "message": {
+            "message_id": 10,
+            "chat": {"id": 12345, "type": "group"},
+            "from": {"id": 123, "first_name": "Admin", "username": "adm"},
+            "text": "/approve_all",
+        },
+    }
+    response = await client.post("/api/admin/access", json=payload)
+
+    assert response.status_code == 200
+    assert response.json()["method"] == "sendMessage"
+    purchases = (await db_session.execute(select(ImagePurchase))).scalars().all()
+    assert {p.image_id for p in purchases} == {image1.id, image2.id}
+    edits = (await db_session.execute(
+        select(OutboxMessage).where(OutboxMessage.channel == "telegram_edit_caption")
+    )).scalars().all()
+    assert len(edits) == 2
+    assert all("ДОСТУП ПРЕДОСТАВЛЕН" in e.payload["caption"] for e in edits)
+
+
+async def test_admin_command_from_other_chat_ignored(client, db_session):
+    payload = {
+        "update_id": 5,
+        "message": {"message_id": 11, "chat": {"id": 999, "type": "private"}, "text": "/approve_all"},
+    }
+    response = await client.post("/api/admin/access", json=payload)
+    assert response.status_code == 200
+    assert response.content == b""
@@ -0,0 +1,99 @@
+import random
+from io import BytesIO
+
+import pytest
+from PIL import Image as PILImage
+
+from benchmarks.corpus import ENTRIES_PER_PAGE, feminine, generate, misspell
+from benchmarks.image_load import build_request, parse_cpu_ticks, parse_mix, parse_rss_kb, synthetic_scan
+from benchmarks.report import compare, percentiles, summarize_plan
+
+EXPLAIN = [{
+    "Plan": {
+        "Node Type": "Limit", "Actual Rows": 20, "Actual Loops": 1, "Shared Hit Blocks": 40,
+        "Plans": [{
+            "Node Type": "Hash Join", "Actual Rows": 120, "Actual Loops": 1,
+            "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "search_objects", "Actual Rows": 120,
+                 "Rows Removed by Filter": 9880, "Actual Loops": 1},
+                {"Node Type": "Hash", "Actual Rows": 500, "Actual Loops": 1, "Plans": [
+                    {"Node Type": "Seq Scan", "Relation Name": "images", "Actual Rows": 500, "Actual Loops": 1},
+                ]},
+            ],
+        }],
+    },
+    "Execution Time": 12.5,
+}]
+
+
+def test_generate_is_deterministic():
+    pages_a, entries_a = generate(100, [1, 2, 3], seed=7)
+    pages_b, entries_b = generate(100, [1, 2, 3], seed=7)
+    entries_a, entries_b = list(entries_a), list(entries_b)
+
+    assert pages_a == pages_b
+    assert entries_a == entries_b
+    assert len(pages_a) == 100 // ENTRIES_PER_PAGE
+    assert len({page.sha512_hash for page in pages_a}) == len(pages_a)
+    assert all(entry.image_id == (entry.id - 1) // ENTRIES_PER_PAGE + 1 for entry in entries_a)
+
+
+def test_feminine_and_misspell():
+    assert feminine("Бродский") == "Бродская"
+    assert feminine("Аронкин") == "Аронкина"
+    assert feminine("Блех") == "Блех"
+    assert misspell(random.Random(1), "Шапиро") != "Шапиро"
+
+
+def test_percentiles():
+    stats = percentiles([float(i) for i in range(1, 101)])
+    assert stats["n"] == 100
+    assert stats["p50_ms"] == 50.5
+    assert 95 <= stats["p95_ms"] <= 96
+    assert stats["p99_ms"] > stats["p95_ms"]
+
+
+def test_summarize_plan():
+    summary = summarize_plan(EXPLAIN)
+    assert summary["shape"] == "Limit(Hash Join(Seq Scan on search_objects, Hash(Seq Scan on images)))"
+    assert summary["rows_scanned"] == 10500
+    assert summary["execution_ms"] == 12.5
+
+
+def test_compare_flags_p95_regression_and_plan_change():
+    plan = summarize_plan(EXPLAIN)
+    old = {"sizes": {"10000": {"cases": {"exact": {
+        "p50_ms": 5.0, "p95_ms": 10.0, "plans": {"count": plan},
+    }}}}}
+    new = {"sizes": {"10000": {"cases": {"exact": {
+        "p50_ms": 6.0, "p95_ms": 20.0, "plans": {"count": {**plan, "shape": "Index Scan on x"}},
+    }}}}}
+
+    lines, regressed = compare(old, new, threshold=0.25)
+    assert regressed
+    assert "REGRESSION" in lines[0]
+    assert any("plan:" in line for line in lines)
+    assert compare(old, old)[1] is False
+
+
+def test_proc_parsers():
+    stat = "4242 (gunicorn: worker [app)) S 4200 4200 4200 0 -1 4194560 5000 0 0 0 150 50 0 0 20 0 3 0"
+    assert parse_cpu_ticks(stat) == 200
+    assert parse_rss_kb("Name:\tgunicorn\nVmRSS:\t  123456 kB\n") == 123456
+
+
+def test_parse_mix_and_requests():
+    assert parse_mix("full=1,thumbnail=3") == {"full": 1, "thumbnail": 3}
+    with pytest.raises(Exception):
+        parse_mix("original=1")
+
+    auth = {"Authorization": "Bearer t"}
+    assert build_request("thumbnail", 7, auth, {}) == ("/api/images/7/thumbnail", {})
+    path, headers = build_request("revalidate", 7, auth, {7: "etag"})
+    assert path == "/api/images/7"
+    assert headers == {"Authorization": "Bearer t", "If-None-Match": "etag"}
+
+
+def test_synthetic_scan_is_a_jpeg_of_requested_size():
+    data = synthetic_scan(random.Random(1), 300, 400)
+    assert PILImage.open(BytesIO(data)).size == (300, 400)
@@ -0,0 +1,101 @@
+import time
+from unittest.mock import MagicMock, patch
+
+from fastapi import FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import Integer, Text, column, select
+from sqlalchemy.dialects import postgresql
+from starlette.requests import Request
+
+from app.config import Settings
+from app.database import READ_PRIMARY_COOKIE, engine_kwargs, get_read_db, values_table
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+
+
+def _settings(**overrides):
+    base = {"secret_key": "x", "admin_password": "x", "database_url": "postgresql+asyncpg://u:p@db/jroots"}
+    return Settings(**{**base, **overrides})
+
+
+def test_engine_kwargs_from_settings():
+    kwargs = engine_kwargs(_settings(db_pool_size=3, db_max_overflow=2, db_statement_timeout_ms=5000))
+    assert kwargs["pool_size"] == 3
+    assert kwargs["max_overflow"] == 2
+    assert kwargs["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+
+
+def test_engine_kwargs_pgbouncer_disables_statement_caches():
+    connect_args = engine_kwargs(_settings(db_pgbouncer=True, db_statement_timeout_ms=5000))["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["prepared_statement_name_func"]() != connect_args["prepared_statement_name_func"]()
+    assert "server_settings" not in connect_args
+
+
+def test_engine_kwargs_sqlite_skips_pool_sizing():
+    kwargs = engine_kwargs(_settings(database_url="sqlite+aiosqlite:///./x.db"))
+    assert "pool_size" not in kwargs
+
+
+def _request(cookie: str | None = None) -> Request:
+    headers = [(b"cookie", f"{READ_PRIMARY_COOKIE}={cookie}".encode())] if cookie is not None else []
+    return Request({"type": "http", "headers": headers})
+
+
+async def _read_session_factory(request: Request):
+    replica = object()
+    with patch("app.database.AsyncReadSessionLocal", lambda: _FakeSession(replica)):
+        async for session in get_read_db(request):
+            return "replica" if session is replica else "primary"
+
+
+class _FakeSession:
+    def __init__(self, session):
+        self.session = session
+
+    async def __aenter__(self):
+        return self.session
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+async def test_read_db_uses_the_replica_unless_the_client_just_wrote():
+    assert await _read_session_factory(_request()) == "replica"
+    assert await _read_session_factory(_request(f"{time.time() + 30}")) == "primary"
+    assert await _read_session_factory(_request(f"{time.time() - 1}")) == "replica"
+    assert await _read_session_factory(_request("garbage")) == "replica"
+
+
+async def test_read_your_writes_cookie_follows_successful_admin_writes():
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.post("/api/admin/things")
+    async def write(fail: bool = False):
+        if fail:
+            raise HTTPException(status_code=400)
+        return {}
+
+    @app.get("/api/admin/things")
+    async def read():
+        return {}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/api/admin/things")
+        until = float(response.cookies[READ_PRIMARY_COOKIE])
+        assert time.time() < until <= time.time() + 11
+        assert READ_PRIMARY_COOKIE not in (await client.post("/api/admin/things?fail=true")).cookies
+        assert READ_PRIMARY_COOKIE not in (await client.get("/api/admin/things")).cookies
+
+
+def test_postgres_values_table_types_all_null_columns():
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    columns = [column("id", Integer), column("text_content", Text), column("price", Integer)]
+    edits = values_table(db, "edits", columns, [(1, "Коган", None), (2, "Шапиро", None)])
+
+    sql = str(select(edits).compile(dialect=postgresql.asyncpg.dialect()))
+    # Without the casts Postgres infers text for the price column and COALESCE with an integer fails
+    assert sql.count("CAST(NULL AS INTEGER)") == 2
+    assert "AS TEXT)" in sql
@@ -0,0 +1,19 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models import SearchObject
+from app.utils.fulltext import ts_match, websearch_query
+
+
+def test_ts_match_compiles_to_the_indexable_operator():
+    stmt = select(SearchObject.id).where(ts_match(SearchObject.search_vector, websearch_query("Шлема Гершко")))
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "search_objects.search_vector @@ websearch_to_tsquery(" in sql
+    assert "modernize_orthography(" in sql
+    assert "ts_match" not in sql
+
+
+def test_result_pages_do_not_load_the_vector():
+    sql = str(select(SearchObject).compile(dialect=postgresql.dialect()))
+    assert "search_vector" not in sql
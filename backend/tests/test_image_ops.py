@@ -8,6 +8,7 @@ def get_mock_db():
     db = MagicMock()
     db.execute = AsyncMock()
     db.commit = AsyncMock()
+    db.flush = AsyncMock()
     db.scalar = AsyncMock()
     db.get = AsyncMock()
     db.add = MagicMock()
@@ -1,10 +1,10 @@
 import io
-from unittest.mock import MagicMock, AsyncMock
+from unittest.mock import MagicMock
 
 from PIL import Image as PILImage
 
-from app.models import Image, ImagePurchase
-from app.services.image import generate_etag, user_has_access_to_image, _create_thumbnail_sync
+from app.models import Image
+from app.services.image import generate_etag, _create_thumbnail_sync
 
 
 def _make_image(sha512="abc123"):
@@ -26,25 +26,6 @@ def test_generate_etag_deterministic():
     assert generate_etag(image, True) == generate_etag(image, True)
 
 
-async def test_user_has_access_true():
-    db = AsyncMock()
-    result_mock = MagicMock()
-    purchase = MagicMock(spec=ImagePurchase)
-    result_mock.scalars.return_value.first.return_value = purchase
-    db.execute.return_value = result_mock
-
-    assert await user_has_access_to_image(db, user_id=1, image_id=1) is True
-
-
-async def test_user_has_access_false():
-    db = AsyncMock()
-    result_mock = MagicMock()
-    result_mock.scalars.return_value.first.return_value = None
-    db.execute.return_value = result_mock
-
-    assert await user_has_access_to_image(db, user_id=1, image_id=999) is False
-
-
 def test_create_thumbnail_sync():
     img = PILImage.new("RGB", (500, 500), color="blue")
     buf = io.BytesIO()
@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Every gunicorn worker, restarted worker and container healthcheck pays for `import app.main`
+IMPORT_BUDGET_SECONDS = 3.0
+# Only needed by some requests, so imported on first use
+LAZY_MODULES = ("PIL", "httpx", "passlib", "sentry_sdk")
+
+
+def _import_profile() -> dict[str, int]:
+    """Cumulative microseconds per top-level import of ``app.main`` in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=Path(__file__).resolve().parents[1], env=os.environ, capture_output=True, text=True, check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def test_app_import_time_is_within_budget():
+    profile = _import_profile()
+    assert profile["app.main"] / 1e6 < IMPORT_BUDGET_SECONDS
+    assert [module for module in LAZY_MODULES if module in profile] == []
@@ -0,0 +1,51 @@
+from unittest.mock import patch
+
+from app.config import get_settings
+from tests.conftest import create_user, auth_header, create_image_record
+
+
+def _no_networks():
+    return patch.object(get_settings(), "metrics_allowed_networks", "")
+
+
+async def test_metrics_allowed_from_loopback(client):
+    await client.get("/api/health")
+    response = await client.get("/api/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/api/health"' in response.text
+
+
+async def test_metrics_forbidden_outside_allowed_networks(client):
+    with _no_networks():
+        response = await client.get("/api/metrics")
+    assert response.status_code == 403
+
+
+async def test_metrics_allowed_for_admin(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    with _no_networks():
+        response = await client.get("/api/metrics", headers=auth_header(admin))
+    assert response.status_code == 200
+
+
+async def test_metrics_forbidden_for_regular_user(client, db_session):
+    user = await create_user(db_session)
+    with _no_networks():
+        response = await client.get("/api/metrics", headers=auth_header(user))
+    assert response.status_code == 403
+
+
+async def test_metrics_allowed_with_token(client):
+    with _no_networks(), patch.object(get_settings(), "metrics_token", "scrape-secret"):
+        response = await client.get("/api/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+
+
+async def test_metrics_route_template_and_image_bytes(client, db_session):
+    image = await create_image_record(db_session)
+    await client.get(f"/api/images/{image.id}/thumbnail")
+
+    response = await client.get("/api/metrics")
+    assert 'route="/api/images/{image_id}/thumbnail"' in response.text
+    assert 'jroots_image_bytes_served_total{tier="thumbnail"}' in response.text
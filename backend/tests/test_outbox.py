@@ -0,0 +1,197 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch, AsyncMock, MagicMock
+
+import httpx
+from sqlalchemy import select
+
+from app.models import Image, ImageAccessRequest, OutboxMessage
+from app.services.access import decide_access_requests
+from app.services.outbox import (
+    RateLimiter,
+    backoff_delay,
+    claim_batch,
+    dispatch_pending,
+    enqueue_caption_edits,
+    enqueue_cdn_purge,
+    enqueue_email,
+    enqueue_telegram_photo,
+)
+from app.config import get_settings
+from app.services.cdn import get_purger, reset_purger
+from app.services.image import save_unique_image
+from tests.conftest import create_image_record, create_user, make_test_image_bytes
+
+NO_LIMIT = RateLimiter({})
+
+
+async def test_dispatch_sends_email(db_session):
+    enqueue_email(db_session, "a@example.com", "Subject", "<p>Hi</p>")
+    await db_session.commit()
+
+    with patch("app.services.outbox.send_email", new_callable=AsyncMock) as mock_send:
+        processed = await dispatch_pending(db_session, NO_LIMIT)
+
+    assert processed == 1
+    mock_send.assert_called_once_with(to_email="a@example.com", subject="Subject", html_content="<p>Hi</p>")
+    message = (await db_session.execute(select(OutboxMessage))).scalar_one()
+    assert message.status == "sent"
+    assert message.attempts == 1
+
+
+async def test_dispatch_failure_schedules_retry(db_session):
+    enqueue_email(db_session, "a@example.com", "Subject", "<p>Hi</p>")
+    await db_session.commit()
+
+    with patch("app.services.outbox.send_email", new_callable=AsyncMock, side_effect=RuntimeError("boom")):
+        await dispatch_pending(db_session, NO_LIMIT)
+
+    message = (await db_session.execute(select(OutboxMessage))).scalar_one()
+    assert message.status == "pending"
+    assert message.attempts == 1
+    assert message.last_error == "boom"
+
+    # Not due yet, so a second pass leaves it alone
+    with patch("app.services.outbox.send_email", new_callable=AsyncMock) as mock_send:
+        assert await dispatch_pending(db_session, NO_LIMIT) == 0
+    mock_send.assert_not_called()
+
+
+async def test_dispatch_gives_up_after_max_attempts(db_session):
+    message = enqueue_email(db_session, "a@example.com", "Subject", "<p>Hi</p>")
+    message.attempts = 7
+    await db_session.commit()
+
+    with patch("app.services.outbox.send_email", new_callable=AsyncMock, side_effect=RuntimeError("boom")):
+        await dispatch_pending(db_session, NO_LIMIT)
+
+    message = (await db_session.execute(select(OutboxMessage))).scalar_one()
+    assert message.status == "failed"
+
+
+async def test_failed_handler_does_not_undo_messages_already_sent(db_session):
+    enqueue_email(db_session, "a@example.com", "First", "<p>Hi</p>")
+    enqueue_email(db_session, "b@example.com", "Second", "<p>Hi</p>")
+    await db_session.commit()
+
+    async def send(to_email, subject, html_content):
+        if to_email == "b@example.com":
+            db_session.add(OutboxMessage(channel="email", payload={}, status="pending"))  # half-done write
+            raise RuntimeError("provider down")
+
+    with patch("app.services.outbox.send_email", side_effect=send):
+        await dispatch_pending(db_session, NO_LIMIT)
+
+    messages = (await db_session.scalars(select(OutboxMessage).order_by(OutboxMessage.id))).all()
+    assert [(m.status, m.attempts, m.last_error) for m in messages] == [
+        ("sent", 1, None), ("pending", 1, "provider down"),
+    ]
+
+
+async def test_claimed_messages_are_leased(db_session):
+    enqueue_email(db_session, "a@example.com", "Subject", "<p>Hi</p>")
+    await db_session.commit()
+
+    claimed = await claim_batch(db_session, 10)
+    assert len(claimed) == 1 and claimed[0].attempts == 1
+    assert await claim_batch(db_session, 10) == []  # hidden while the first dispatcher delivers it
+
+
+async def test_dispatch_skips_messages_not_yet_due(db_session):
+    message = enqueue_email(db_session, "a@example.com", "Subject", "<p>Hi</p>")
+    message.next_attempt_at = datetime.now(timezone.utc) + timedelta(hours=1)
+    await db_session.commit()
+
+    assert await dispatch_pending(db_session, NO_LIMIT) == 0
+
+
+async def test_dispatch_telegram_photo_stores_file_id(db_session):
+    image = await create_image_record(db_session)
+    enqueue_telegram_photo(db_session, image.id, "caption", {"inline_keyboard": []})
+    await db_session.commit()
+
+    mock_resp = MagicMock(spec=httpx.Response)
+    mock_resp.status_code = 200
+
+    with patch("app.services.telegram.upload_photo_for_file_id", new_callable=AsyncMock, return_value="fid"), \
+         patch("app.services.outbox.send_photo_to_chat", new_callable=AsyncMock, return_value=mock_resp) as mock_send:
+        await dispatch_pending(db_session, NO_LIMIT)
+
+    assert mock_send.call_args.args[0].telegram_file_id == "fid"
+
+    refreshed = await db_session.get(Image, image.id)
+    await db_session.refresh(refreshed)
+    assert refreshed.telegram_file_id == "fid"
+
+
+async def test_request_decided_before_its_notification_is_sent_closed(db_session):
+    user = await create_user(db_session)
+    image = await create_image_record(db_session)
+    image.telegram_file_id = "fid"
+    access_request = ImageAccessRequest(user_id=user.id, image_id=image.id, status="pending", caption="cap")
+    db_session.add(access_request)
+    await db_session.flush()
+    enqueue_telegram_photo(db_session, image.id, "cap", {"inline_keyboard": [[{"text": "✅"}]]}, access_request.id)
+    await db_session.commit()
+
+    assert await decide_access_requests(db_session, True, "admin")  # before the dispatcher ran
+    assert (await db_session.scalars(select(OutboxMessage.channel))).all() == ["telegram_photo"]
+
+    mock_resp = MagicMock(spec=httpx.Response)
+    mock_resp.status_code = 200
+    mock_resp.json.return_value = {"result": {"chat": {"id": 7}, "message_id": 42}}
+    with patch("app.services.outbox.send_photo_to_chat", new_callable=AsyncMock, return_value=mock_resp) as mock_send:
+        await dispatch_pending(db_session, NO_LIMIT)
+
+    _, caption, reply_markup = mock_send.call_args.args
+    assert "ДОСТУП ПРЕДОСТАВЛЕН" in caption and "@admin" in caption
+    assert reply_markup == {"inline_keyboard": []}
+    await db_session.refresh(access_request)
+    assert (access_request.chat_id, access_request.message_id) == (7, 42)
+
+
+async def test_caption_edits_replace_pending_edits_of_the_same_message(db_session):
+    await enqueue_caption_edits(db_session, [(1, 10, "first"), (1, 11, "other")])
+    await db_session.commit()
+    await enqueue_caption_edits(db_session, [(1, 10, "second")])
+    await db_session.commit()
+
+    edits = (await db_session.scalars(select(OutboxMessage).order_by(OutboxMessage.id))).all()
+    assert [edit.payload["caption"] for edit in edits] == ["second", "other"]
+
+
+async def test_new_images_are_prewarmed_by_the_outbox(db_session):
+    image = await save_unique_image(db_session, "fond/1", "key", None, make_test_image_bytes(color="green"))
+    message = (await db_session.execute(select(OutboxMessage))).scalar_one()
+    assert (message.channel, message.payload) == ("telegram_prewarm", {"image_id": image.id})
+
+    with patch("app.services.telegram.upload_photo_for_file_id", new_callable=AsyncMock, return_value="fid") as upload:
+        await dispatch_pending(db_session, NO_LIMIT)
+
+    assert upload.call_count == 1
+    await db_session.refresh(image)
+    assert image.telegram_file_id == "fid"
+    await db_session.refresh(message)
+    assert message.status == "sent"
+
+
+def test_backoff_delay_grows_exponentially():
+    assert backoff_delay(1) == timedelta(seconds=5)
+    assert backoff_delay(3) == timedelta(seconds=20)
+    assert backoff_delay(30) == timedelta(seconds=3600)
+
+
+async def test_cdn_purge_is_delivered_to_the_configured_backend(db_session):
+    assert enqueue_cdn_purge(db_session, ["https://cdn/a"]) is None  # purging is off by default
+
+    with patch.object(get_settings(), "cdn_purge_backend", "fake"):
+        reset_purger()
+        try:
+            enqueue_cdn_purge(db_session, ["https://cdn/a", "https://cdn/b"])
+            await db_session.commit()
+            await dispatch_pending(db_session, NO_LIMIT)
+            assert get_purger().purged == ["https://cdn/a", "https://cdn/b"]
+        finally:
+            reset_purger()
+
+    message = (await db_session.execute(select(OutboxMessage))).scalar_one()
+    assert message.status == "sent"
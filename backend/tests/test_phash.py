@@ -0,0 +1,40 @@
+import random
+
+from app.services.dedup import near_duplicate_groups
+from app.utils.phash import BKTree, dhash, dhash_bytes, hamming, to_signed
+from tests.conftest import jpeg, make_page
+
+
+def test_rescans_stay_close_and_other_pages_do_not():
+    page = make_page(1)
+    original = dhash_bytes(jpeg(page, 95))
+    recompressed = dhash_bytes(jpeg(page.resize((300, 420)), 40))
+    assert hamming(original, recompressed) <= 4
+    assert hamming(original, dhash(make_page(2))) > 10
+
+
+def test_hashes_fit_a_signed_bigint():
+    for seed in range(20):
+        assert -(2 ** 63) <= dhash(make_page(seed)) < 2 ** 63
+    assert to_signed(2 ** 64 - 1) == -1
+    assert hamming(-1, 0) == 64
+
+
+def test_bk_tree_search_matches_brute_force():
+    rng = random.Random(7)
+    values = [to_signed(rng.getrandbits(64)) for _ in range(300)]
+    values += [value ^ (1 << rng.randrange(63)) for value in values[:50]]  # one-bit neighbours
+    tree = BKTree()
+    for item_id, value in enumerate(values):
+        tree.add(value, item_id)
+
+    for query in values[:20] + [to_signed(rng.getrandbits(64))]:
+        for max_distance in (0, 3, 20):
+            expected = {i for i, value in enumerate(values) if hamming(query, value) <= max_distance}
+            assert {item_id for item_id, _ in tree.search(query, max_distance)} == expected
+
+
+def test_near_duplicate_groups_link_chains():
+    hashes = [(1, 0b0000), (2, 0b0001), (3, 0b0011), (4, 0b1111_0000_0000), (5, 0b1111_0000_0000)]
+    assert near_duplicate_groups(hashes, 1) == [[1, 2, 3], [4, 5]]
+    assert near_duplicate_groups(hashes, 0) == [[4, 5]]
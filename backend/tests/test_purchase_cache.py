@@ -0,0 +1,92 @@
+from unittest.mock import patch
+
+from app.models import ImagePurchase
+from app.services import purchase_cache
+from app.services.access import grant_access
+from app.services.purchase_cache import PurchasedImages, get_purchased_images, invalidate_purchases
+from tests.conftest import create_user, create_image_record, create_search_obj, auth_header
+
+
+def test_purchased_images_membership():
+    purchased = PurchasedImages([5, 1, 9, 5])
+    assert len(purchased) == 3
+    assert 1 in purchased and 9 in purchased
+    assert 4 not in purchased
+    assert 10 not in purchased
+
+
+async def test_cache_hit_until_invalidated(db_session):
+    user = await create_user(db_session)
+    image = await create_image_record(db_session)
+
+    assert image.id not in await get_purchased_images(db_session, user.id)
+
+    db_session.add(ImagePurchase(user_id=user.id, image_id=image.id))
+    await db_session.commit()
+    assert image.id not in await get_purchased_images(db_session, user.id)  # still cached
+
+    invalidate_purchases(user.id)
+    assert image.id in await get_purchased_images(db_session, user.id)
+
+
+async def test_cache_expires_after_ttl(db_session):
+    user = await create_user(db_session)
+    image = await create_image_record(db_session)
+    await get_purchased_images(db_session, user.id)
+
+    db_session.add(ImagePurchase(user_id=user.id, image_id=image.id))
+    await db_session.commit()
+
+    with patch("app.services.purchase_cache.time.monotonic", return_value=10**9):
+        assert image.id in await get_purchased_images(db_session, user.id)
+
+
+async def test_search_unmasks_purchased_image(client, db_session):
+    user = await create_user(db_session)
+    image = await create_image_record(db_session, image_path="fond/1")
+    await create_search_obj(db_session, text_content="test document", image_id=image.id)
+    db_session.add(ImagePurchase(user_id=user.id, image_id=image.id))
+    await db_session.commit()
+
+    response = await client.get("/api/search?q=test", headers=auth_header(user))
+    assert response.json()["items"][0]["image"]["image_path"] == "fond/1"
+
+
+async def test_grant_invalidates_only_after_commit(db_session):
+    user_id = (await create_user(db_session)).id
+    image_id = (await create_image_record(db_session)).id
+    await get_purchased_images(db_session, user_id)  # warm the cache with no purchases
+
+    await grant_access(db_session, [(user_id, image_id)])
+    assert user_id in purchase_cache._cache  # a concurrent reader would re-cache the old set
+    await db_session.rollback()
+    assert user_id in purchase_cache._cache
+
+    await grant_access(db_session, [(user_id, image_id)])
+    await db_session.commit()
+    assert user_id not in purchase_cache._cache
+
+
+async def test_get_image_sees_grant_made_after_caching(client, db_session):
+    user = await create_user(db_session)
+    image = await create_image_record(db_session)
+    await get_purchased_images(db_session, user.id)  # warm the cache with no purchases
+
+    await grant_access(db_session, [(user.id, image.id)])
+    await db_session.commit()
+
+    full = await client.get(f"/api/images/{image.id}", headers=auth_header(user))
+    assert full.content == image.image_data
+
+
+async def test_get_image_confirms_grants_made_in_other_workers(client, db_session):
+    user = await create_user(db_session)
+    image = await create_image_record(db_session)
+    await get_purchased_images(db_session, user.id)  # warm the cache with no purchases
+
+    db_session.add(ImagePurchase(user_id=user.id, image_id=image.id))  # no local invalidation
+    await db_session.commit()
+
+    full = await client.get(f"/api/images/{image.id}", headers=auth_header(user))
+    assert full.content == image.image_data
+    assert image.id in await get_purchased_images(db_session, user.id)  # the entry was refreshed
@@ -0,0 +1,152 @@
+"""Per-endpoint SQL statement budgets. Raise a budget only with a reason in the same change."""
+import hashlib
+from unittest.mock import patch
+
+from sqlalchemy import select, text
+
+from app.config import get_settings
+from app.database import get_db, get_read_db
+from app.main import app
+from app.models import SearchObject
+from app.query_stats import track_queries
+from tests.conftest import (
+    create_user, create_image_record, create_search_obj,
+    make_test_image_bytes, auth_header, statement_budget,
+)
+
+
+async def test_search_budget(client, db_session):
+    user = await create_user(db_session)
+    image = await create_image_record(db_session)
+    for i in range(5):
+        await create_search_obj(db_session, text_content=f"Иванов {i}", image_id=image.id)
+
+    await client.get("/api/sources")
+    # user, count, results with their images, purchases; sources come from the warm cache
+    with statement_budget(4):
+        response = await client.get("/api/search", params={"q": "Иванов"}, headers=auth_header(user))
+    assert response.status_code == 200
+
+
+async def test_authenticated_search_uses_one_session(client, db_session):
+    user = await create_user(db_session)
+    opened = []
+
+    def counting(name):
+        async def override():
+            opened.append(name)
+            yield db_session
+        return override
+
+    app.dependency_overrides[get_db] = counting("primary")
+    app.dependency_overrides[get_read_db] = counting("read")
+    response = await client.get("/api/search", params={"q": "Иванов"}, headers=auth_header(user))
+    assert response.status_code == 200
+    assert opened == ["read"]
+
+
+async def test_list_objects_budget(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    for i in range(5):
+        image = await create_image_record(
+            db_session, make_test_image_bytes(width=100 + i), image_path=f"p/{i}", image_key=f"K-{i}",
+        )
+        await create_search_obj(db_session, text_content=f"Obj {i}", image_id=image.id)
+
+    # Independent of page size: one joined slim query, plus the first-page count
+    with statement_budget(3):
+        response = await client.get("/api/admin/objects", headers=auth_header(admin))
+    assert response.status_code == 200
+
+
+async def test_create_object_budget(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    image_bytes = make_test_image_bytes()
+    sha512 = hashlib.sha512(image_bytes).hexdigest()
+
+    # +1 for the source_stats upsert, +1 for the phonetic codes insert, +1 for the Telegram pre-warm job
+    with statement_budget(11):
+        response = await client.post(
+            "/api/admin/objects",
+            data={
+                "text_content": "Test content", "price": 50,
+                "image_path": "fond/002", "image_key": "KEY-002",
+                "image_file_sha512": sha512,
+            },
+            files={"image_file": ("test.jpg", image_bytes, "image/jpeg")},
+            headers=auth_header(admin),
+        )
+    assert response.status_code == 200
+
+
+async def test_update_object_budget(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    image = await create_image_record(db_session)
+    obj = await create_search_obj(db_session, text_content="Original", price=10, image_id=image.id)
+
+    # +2 to replace the phonetic codes when the text changes
+    with statement_budget(6):
+        response = await client.put(
+            f"/api/admin/objects/{obj.id}",
+            data={
+                "text_content": "Updated", "price": 25,
+                "image_path": image.image_path, "image_key": image.image_key,
+            },
+            headers=auth_header(admin),
+        )
+    assert response.status_code == 200
+
+
+async def test_bulk_edit_budget_does_not_grow_with_rows(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    objects = [await create_search_obj(db_session, text_content=f"Каган {i}", price=i) for i in range(20)]
+
+    # Admin lookup, old texts, one UPDATE ... FROM, phonetic delete + insert
+    with statement_budget(5):
+        response = await client.patch(
+            "/api/admin/objects:bulk",
+            json={"rows": [{"id": obj.id, "text_content": f"Коган {obj.price}"} for obj in objects]},
+            headers=auth_header(admin),
+        )
+    assert response.json()["updated"] == 20
+
+
+async def test_thumbnail_budget(client, db_session):
+    image = await create_image_record(db_session)
+    db_session.expunge_all()
+
+    with statement_budget(1):
+        response = await client.get(f"/api/images/{image.id}/thumbnail")
+    assert response.status_code == 200
+
+
+async def test_track_queries_counts_repeated_statements(db_session):
+    image = await create_image_record(db_session)
+    obj = await create_search_obj(db_session, image_id=image.id)
+
+    with track_queries() as stats:
+        for _ in range(3):
+            await db_session.execute(select(SearchObject).where(SearchObject.id == obj.id))
+
+    assert stats.statements == 3
+    assert len(stats.repeated(3)) == 1
+    assert stats.repeated(4) == []
+
+
+async def test_slow_query_logged_with_plan(db_session):
+    with patch.object(get_settings(), "db_slow_query_ms", 0), \
+         patch("app.query_stats.logger") as mock_logger:
+        await db_session.execute(text("SELECT id FROM search_objects WHERE price > 5"))
+
+    message, _, statement, plan = mock_logger.warning.call_args.args
+    assert message.startswith("Slow query")
+    assert "search_objects" in statement
+    assert "SCAN" in plan
+
+
+async def test_instrumented_request_reports_statement_headers(client):
+    with patch.object(get_settings(), "db_instrumentation", True):
+        response = await client.get("/api/sources")
+
+    assert response.headers["X-DB-Statements"] == "1"
+    assert float(response.headers["X-DB-Time-Ms"]) >= 0
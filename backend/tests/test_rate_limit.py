@@ -0,0 +1,73 @@
+from unittest.mock import patch
+
+from httpx import ASGITransport, AsyncClient
+
+from app.config import get_settings
+from app.main import app
+from app.rate_limit import _get_budgets, reset_budgets, search_cost
+from tests.conftest import auth_header, create_image_record, create_user
+
+
+def test_search_cost_grows_with_mode_and_depth():
+    assert search_cost("exact", 0, False) == 1
+    assert search_cost("fuzzy", 0, False) == 4
+    assert search_cost("fuzzy", 250, True) == 13
+
+
+async def test_search_budget_is_per_ip(client):
+    with patch.object(get_settings(), "rate_limit_search", "8/minute"):
+        assert (await client.get("/api/search", params={"q": "Коган"})).status_code == 200
+        assert (await client.get("/api/search", params={"q": "Коган"})).status_code == 200
+        response = await client.get("/api/search", params={"q": "Коган"})
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        # Cheaper modes still fit what is left
+        assert (await client.get("/api/search", params={"q": "Коган", "mode": "exact"})).status_code == 429
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app, client=("203.0.113.7", 1234)), base_url="http://test",
+        ) as other_ip:
+            assert (await other_ip.get("/api/search", params={"q": "Коган"})).status_code == 200
+
+
+async def test_forwarded_clients_get_separate_budgets(client):
+    with patch.object(get_settings(), "rate_limit_search", "4/minute"):
+        first = {"X-Forwarded-For": "198.51.100.1"}
+        second = {"X-Forwarded-For": "198.51.100.2"}
+        assert (await client.get("/api/search", params={"q": "Коган"}, headers=first)).status_code == 200
+        assert (await client.get("/api/search", params={"q": "Коган"}, headers=first)).status_code == 429
+        assert (await client.get("/api/search", params={"q": "Коган"}, headers=second)).status_code == 200
+
+
+async def test_search_budget_follows_the_user_across_ips(client, db_session):
+    user = await create_user(db_session)
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    with patch.object(get_settings(), "rate_limit_search", "4/minute"):
+        assert (await client.get("/api/search", params={"q": "Коган"}, headers=auth_header(user))).status_code == 200
+        async with AsyncClient(
+            transport=ASGITransport(app=app, client=("203.0.113.7", 1234)), base_url="http://test",
+        ) as other_ip:
+            response = await other_ip.get("/api/search", params={"q": "Коган"}, headers=auth_header(user))
+            assert response.status_code == 429
+            # Admins are never limited
+            response = await other_ip.get("/api/search", params={"q": "Коган"}, headers=auth_header(admin))
+            assert response.status_code == 200
+
+
+async def test_watermarked_images_cost_more(client, db_session):
+    user = await create_user(db_session)
+    image = await create_image_record(db_session)
+    with patch.object(get_settings(), "rate_limit_images", "6/minute"):
+        assert (await client.get(f"/api/images/{image.id}", headers=auth_header(user))).status_code == 200
+        assert (await client.get(f"/api/images/{image.id}", headers=auth_header(user))).status_code == 429
+
+
+def test_redis_storage_uses_redis_py():
+    with patch.object(get_settings(), "rate_limit_storage_uri", "redis://redis:6379/1"):
+        reset_budgets()
+        try:
+            storage = _get_budgets().storage
+        finally:
+            reset_budgets()
+    assert type(storage).__module__ == "limits.aio.storage.redis"
+    assert type(storage.bridge).__name__ == "RedispyBridge"
@@ -0,0 +1,37 @@
+import pytest
+
+from app.utils.soundex import daitch_mokotoff, phonetic_codes, query_code_groups, to_latin
+
+
+@pytest.mark.parametrize("name, codes", [
+    ("Moskowitz", {"645740"}),
+    ("Auerbach", {"097400", "097500"}),
+    ("Peters", {"739400", "734000"}),
+    ("Jackson", {"154600", "145460", "454600", "445460"}),
+])
+def test_reference_codes(name, codes):
+    assert daitch_mokotoff(name) == codes
+
+
+@pytest.mark.parametrize("a, b", [
+    ("Шлема", "Шлойма"),
+    ("Шлема", "Schlojme"),
+    ("Гершко", "Гиршко"),
+    ("Хаим", "Хайм"),
+    ("Коган", "Каган"),
+    ("Рабинович", "Rabinowicz"),
+    ("Кацнельсон", "Katzenelson"),
+])
+def test_spelling_variants_share_a_code(a, b):
+    assert daitch_mokotoff(a) & daitch_mokotoff(b)
+
+
+def test_transliteration_drops_signs_and_diacritics():
+    assert to_latin("Мальц") == "malts"
+    assert to_latin("Łódź") == "lodz"
+    assert daitch_mokotoff("1897") == set()
+
+
+def test_text_codes_split_hyphenated_names_and_skip_initials():
+    assert phonetic_codes("Сося-Бейла Х.") == daitch_mokotoff("Сося") | daitch_mokotoff("Бейла")
+    assert query_code_groups("Шлойма Коган, 1897") == [{"486000"}, {"556000"}]
@@ -0,0 +1,103 @@
+from unittest.mock import patch
+
+from app.services.suggest import (
+    SuggestIndex, build_suggest_index, get_suggest_index, record_object_change, start_suggest_index_build,
+    tokenize,
+)
+from tests.conftest import create_user, create_image_record, create_search_obj, auth_header
+
+
+def test_tokenize_keeps_names_and_drops_initials_and_years():
+    assert tokenize("Коренфельд Х. М., 1897") == {"Коренфельд"}
+    assert tokenize("Сося-Бейла Гершковна") == {"Сося-Бейла", "Гершковна"}
+
+
+def test_complete_orders_by_count_and_is_case_insensitive():
+    index = SuggestIndex.build(["Коган Хаим", "Коган Песя", "Кофман Ицко", "коган Сура", "Шапиро"])
+
+    assert index.complete("ко") == [("Коган", 3), ("Кофман", 1)]
+    assert index.complete("КОФ") == [("Кофман", 1)]
+    assert index.complete("ко", limit=1) == [("Коган", 3)]
+    assert index.complete("я") == []
+    assert index.complete("  ") == []
+
+
+def test_incremental_add_and_remove():
+    index = SuggestIndex.build(["Коган Хаим"])
+
+    index.add("Кацнельсон Хана")
+    assert index.complete("к") == [("Кацнельсон", 1), ("Коган", 1)]
+    index.remove("Коган Хаим")
+    assert index.complete("ко") == []
+    assert index.complete("ха") == [("Хана", 1)]
+    assert len(index) == 2
+
+
+def test_wide_prefix_memo_is_dropped_on_write(monkeypatch):
+    monkeypatch.setattr("app.services.suggest.MEMO_RANGE", 0)
+    index = SuggestIndex.build(["Коган", "Кофман"])
+    assert index.complete("ко") == [("Коган", 1), ("Кофман", 1)]
+
+    index.add("Кофман")
+    assert index.complete("ко")[0] == ("Кофман", 2)
+
+
+async def test_suggest_endpoint(client, db_session):
+    image = await create_image_record(db_session)
+    await create_search_obj(db_session, text_content="Гершкович Мойше", image_id=image.id)
+    await create_search_obj(db_session, text_content="Гершкович Ента", image_id=image.id)
+    await create_search_obj(db_session, text_content="Гермизо Сруль", image_id=image.id)
+
+    expected = [{"text": "Гершкович", "count": 2}, {"text": "Гермизо", "count": 1}]
+    # The first request starts the index build and is answered from the database meanwhile
+    response = await client.get("/api/suggest", params={"q": "гер"})
+    assert response.status_code == 200
+    assert response.json() == expected
+    await start_suggest_index_build()
+    assert get_suggest_index() is not None
+    assert (await client.get("/api/suggest", params={"q": "гер"})).json() == expected
+
+
+async def test_admin_write_updates_built_index(client, db_session):
+    admin = await create_user(db_session, username="admin", email="admin@test.com", is_admin=True)
+    image = await create_image_record(db_session)
+    index = await build_suggest_index(db_session)
+    assert index.complete("тал") == []
+
+    response = await client.post(
+        "/api/admin/objects",
+        data={"text_content": "Талесмахер Файвель", "image_file_sha512": image.sha512_hash},
+        files={"image_file": ("test.jpg", b"unused", "image/jpeg")},
+        headers=auth_header(admin),
+    )
+    assert response.status_code == 200
+    assert index.complete("тал") == [("Талесмахер", 1)]
+
+    await client.delete(f"/api/admin/objects/{response.json()['id']}", headers=auth_header(admin))
+    assert index.complete("тал") == []
+
+
+async def test_writes_during_a_build_reach_the_new_index(db_session):
+    await create_search_obj(db_session, text_content="Гершкович Мойше")
+    real_count = SuggestIndex.count
+
+    def count_and_write(index, text):
+        real_count(index, text)
+        record_object_change(None, "Гермизо Сруль")  # an admin write lands mid-stream
+
+    with patch.object(SuggestIndex, "count", count_and_write):
+        index = await build_suggest_index(db_session)
+    assert sorted(index.complete("гер")) == [("Гермизо", 1), ("Гершкович", 1)]
+
+
+async def test_rebuild_skips_the_scan_until_objects_change(db_session):
+    await create_search_obj(db_session, text_content="Гершкович Мойше")
+    await start_suggest_index_build()
+    built = get_suggest_index()
+
+    await start_suggest_index_build()
+    assert get_suggest_index() is built  # change_log has not moved
+
+    await create_search_obj(db_session, text_content="Гермизо Сруль")
+    await start_suggest_index_build()
+    assert sorted(text for text, _ in get_suggest_index().complete("гер")) == ["Гермизо", "Гершкович"]
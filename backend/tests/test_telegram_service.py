@@ -1,10 +1,21 @@
+import asyncio
+import io
 from unittest.mock import MagicMock
 
+import pytest
 import respx
 import httpx
+from PIL import Image as PILImage
 
 from app.models import Image
-from app.services.telegram import send_photo_to_chat, answer_callback_query, edit_message_caption
+from app.services.telegram import (
+    _make_telegram_derivative_sync,
+    answer_callback_query,
+    edit_message_caption,
+    ensure_telegram_file_id,
+    send_photo_to_chat,
+)
+from tests.conftest import create_image_record, make_test_image_bytes
 
 BOT_BASE = "https://api.telegram.org/bottest-bot-token"
 
@@ -27,15 +38,41 @@ async def test_send_photo_with_file_id():
     assert resp.status_code == 200
 
 
+async def test_send_photo_without_file_id_raises():
+    image = _make_image(telegram_file_id=None)
+    with pytest.raises(ValueError):
+        await send_photo_to_chat(image, "caption", {"inline_keyboard": []})
+
+
+def test_telegram_derivative_is_size_bounded():
+    photo = _make_telegram_derivative_sync(make_test_image_bytes(width=3000, height=2000), max_dim=1280)
+    assert PILImage.open(io.BytesIO(photo)).size == (1280, 853)
+
+
 @respx.mock
-async def test_send_photo_with_binary():
-    image = _make_image(telegram_file_id=None, image_data=b"\xff\xd8\xff")
-    route = respx.post(f"{BOT_BASE}/sendPhoto").mock(
+async def test_ensure_file_id_uploads_once_for_concurrent_requests(db_session, tmp_path):
+    path = tmp_path / "scan.jpg"
+    path.write_bytes(make_test_image_bytes())
+    image = await create_image_record(db_session)
+    image.image_file_path = str(path)
+    await db_session.commit()
+
+    send_route = respx.post(f"{BOT_BASE}/sendPhoto").mock(
+        return_value=httpx.Response(200, json={"result": {"message_id": 7, "photo": [{"file_id": "fid"}]}})
+    )
+    delete_route = respx.post(f"{BOT_BASE}/deleteMessage").mock(
         return_value=httpx.Response(200, json={"ok": True})
     )
-    resp = await send_photo_to_chat(image, "caption", {"inline_keyboard": []})
-    assert route.called
-    assert resp.status_code == 200
+
+    results = await asyncio.gather(
+        ensure_telegram_file_id(image),
+        ensure_telegram_file_id(image),
+    )
+
+    assert results == ["fid", "fid"]
+    assert image.telegram_file_id == "fid"
+    assert send_route.call_count == 1
+    assert delete_route.call_count == 1
 
 
 @respx.mock
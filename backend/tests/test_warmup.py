@@ -0,0 +1,106 @@
+import asyncio
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, patch
+
+from app.config import get_settings
+from app.main import app, lifespan
+from app.models import QueryLog
+from app.routers.search import search
+from app.services.query_log import flush_query_log, record_query, suppress_query_log, top_queries
+from app.services.suggest import get_suggest_index
+from app.services.warmup import warm_up
+from tests.conftest import create_image_record, create_search_obj
+
+
+async def test_search_records_first_page_queries(client, db_session):
+    for params in ({"q": "Коган"}, {"q": "  КОГАН "}, {"q": "коган", "skip": 20}, {"q": "Шапиро", "mode": "exact"}):
+        await client.get("/api/search", params=params)
+    await flush_query_log()
+
+    assert await top_queries(db_session, limit=10, days=7) == [("коган", "fuzzy"), ("шапиро", "exact")]
+
+
+async def test_flush_adds_to_existing_daily_rows(db_session):
+    db_session.add(QueryLog(day=date.today(), query="коган", mode="fuzzy", hits=1))
+    db_session.add(QueryLog(day=date.today() - timedelta(days=30), query="шапиро", mode="fuzzy", hits=100))
+    await db_session.commit()
+
+    record_query("Шапиро", "fuzzy")
+    record_query("Коган", "fuzzy")
+    record_query("Коган", "fuzzy")
+    with suppress_query_log():
+        record_query("Шапиро", "fuzzy")
+    await flush_query_log()
+
+    # Old days fall out of the window
+    assert await top_queries(db_session, limit=10, days=7) == [("коган", "fuzzy"), ("шапиро", "fuzzy")]
+
+
+async def test_warm_up_replays_top_queries_without_recording_them(db_session):
+    db_session.add_all([
+        QueryLog(day=date.today(), query="коган", mode="fuzzy", hits=5),
+        QueryLog(day=date.today(), query="шлема", mode="phonetic", hits=9),
+    ])
+    await db_session.commit()
+    replayed = []
+
+    async def replay(db, q, mode):
+        replayed.append((q, mode))
+        record_query(q, mode)
+
+    await warm_up(replay)
+    await flush_query_log()
+
+    assert replayed == [("шлема", "phonetic"), ("коган", "fuzzy")]
+    assert await top_queries(db_session, limit=10, days=7) == [("шлема", "phonetic"), ("коган", "fuzzy")]
+
+
+async def test_warm_up_runs_the_real_search(db_session):
+    image = await create_image_record(db_session)
+    await create_search_obj(db_session, text_content="Коган Хаим", image_id=image.id)
+    db_session.add(QueryLog(day=date.today(), query="коган", mode="fuzzy", hits=1))
+    await db_session.commit()
+    totals = []
+
+    async def replay(db, q, mode):
+        totals.append((await search(request=None, q=q, mode=mode, db=db, current_user=None))["total"])
+
+    await warm_up(replay)
+
+    assert totals == [1]
+
+
+async def test_warm_up_stops_at_its_budget(db_session):
+    db_session.add_all([QueryLog(day=date.today(), query=f"q{i}", mode="fuzzy", hits=1) for i in range(5)])
+    await db_session.commit()
+    replayed = []
+
+    async def slow_replay(db, q, mode):
+        await asyncio.sleep(0.2)
+        replayed.append(q)
+
+    with patch.object(get_settings(), "warmup_budget_seconds", 0.3):
+        await warm_up(slow_replay)
+
+    assert len(replayed) == 1
+
+
+async def test_warm_up_disabled_with_zero_budget():
+    async def replay(db, q, mode):
+        raise AssertionError("should not run")
+
+    with patch.object(get_settings(), "warmup_budget_seconds", 0):
+        await warm_up(replay)
+
+
+async def test_startup_does_not_wait_for_the_suggest_index():
+    started = asyncio.Event()
+
+    async def slow_build():
+        started.set()
+        await asyncio.sleep(3600)
+
+    with patch("app.services.suggest._rebuild_in_background", slow_build), patch("app.main.warm_up", AsyncMock()):
+        async with lifespan(app):
+            await asyncio.wait_for(started.wait(), 1)
+            assert get_suggest_index() is None
@@ -1,5 +1,10 @@
 #!/usr/bin/env python3
-"""Audit FIO from fio_export.csv using LLM to flag suspicious names."""
+"""Audit FIO from fio_export.csv using LLM to flag suspicious names.
+
+Produce the input with the admin export endpoint, e.g.::
+
+    curl -H "Authorization: Bearer $TOKEN" "$API/api/admin/objects/export?format=csv" > fio_export.csv
+"""
 
 import csv
 import json
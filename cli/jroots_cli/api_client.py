@@ -65,7 +65,7 @@ class ApiClient:
 
     @_retry_policy
     def upload_object(
-        self, sha512: str, text_content: str, price: str = "0"
+        self, sha512: str, text_content: str, price: str = "0", person: dict | None = None
     ) -> requests.Response:
         response = self.session.post(
             f"{self.api_base}/api/admin/objects",
@@ -73,11 +73,23 @@ class ApiClient:
                 "image_file_sha512": sha512,
                 "text_content": text_content,
                 "price": price,
+                **(person or {}),
             },
         )
         response.raise_for_status()
         return response
 
+    @_retry_policy
+    def bulk_edit_objects(self, rows: list[dict]) -> dict:
+        """Apply {"id", "text_content"?, "price"?, person fields?} corrections in one server-side transaction."""
+        response = self.session.patch(
+            f"{self.api_base}/api/admin/objects:bulk",
+            json={"rows": rows},
+            timeout=60,
+        )
+        response.raise_for_status()
+        return response.json()
+
     @_retry_policy
     def login(self, username: str, password: str) -> dict:
         response = self.session.post(
@@ -7,6 +7,7 @@ from tqdm import tqdm
 from ..api_client import calculate_sha512
 from ..csv_utils import (
     build_image_map,
+    person_fields,
     read_csv,
     validate_images_csv,
     validate_objects_csv,
@@ -78,6 +79,7 @@ def _process_objects(client, rows, image_map, pbar) -> Reporter:
                 sha512=sha512,
                 text_content=row["text_content"],
                 price=row.get("price", "0"),
+                person=person_fields(row),
             )
             reporter.add_success()
         except Exception as e:
@@ -104,6 +106,7 @@ def _process_objects(client, rows, image_map, pbar) -> Reporter:
                     sha512=sha512,
                     text_content=row["text_content"],
                     price=row.get("price", "0"),
+                    person=person_fields(row),
                 )
                 reporter.add_success()
                 reporter.errors = [
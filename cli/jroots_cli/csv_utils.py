@@ -5,6 +5,8 @@ from .api_client import calculate_sha512
 
 IMAGES_REQUIRED_COLUMNS = {"path", "image_key", "image_source_id", "image_path"}
 OBJECTS_REQUIRED_COLUMNS = {"path", "text_content"}
+# Optional structured columns, sent alongside text_content when a pipeline produced them
+PERSON_COLUMNS = ("surname", "given_name", "patronymic", "nationality", "residence", "year")
 
 
 def read_csv(filepath: str) -> list[dict]:
@@ -12,6 +14,10 @@ def read_csv(filepath: str) -> list[dict]:
         return list(csv.DictReader(f))
 
 
+def person_fields(row: dict) -> dict[str, str]:
+    return {col: row[col].strip() for col in PERSON_COLUMNS if (row.get(col) or "").strip()}
+
+
 def validate_images_csv(filepath: str) -> tuple[list[dict], list[str]]:
     errors: list[str] = []
     rows = read_csv(filepath)
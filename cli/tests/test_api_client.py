@@ -1,4 +1,5 @@
 import hashlib
+import json
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -101,6 +102,23 @@ def test_upload_object_sends_correct_request():
     assert "Test+Name" in body or "Test%20Name" in body or "Test Name" in body
 
 
+# --- ApiClient.bulk_edit_objects ---
+
+
+@responses.activate
+def test_bulk_edit_objects_sends_rows_in_one_request():
+    responses.add(
+        responses.PATCH, f"{API}/api/admin/objects:bulk",
+        json={"updated": 2, "text_changed": 1}, status=200,
+    )
+
+    client = ApiClient(requests.Session(), API)
+    rows = [{"id": 1, "text_content": "Коган"}, {"id": 2, "price": 10}]
+    assert client.bulk_edit_objects(rows) == {"updated": 2, "text_changed": 1}
+    assert len(responses.calls) == 1
+    assert json.loads(responses.calls[0].request.body) == {"rows": rows}
+
+
 # --- ApiClient.login ---
 
 
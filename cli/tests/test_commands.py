@@ -358,6 +358,41 @@ def test_upload_objects(runner, tmp_path):
     assert "1 search object operation(s)" in result.output
 
 
+@responses.activate
+def test_upload_objects_sends_person_columns(runner, tmp_path):
+    img = tmp_path / "img.jpg"
+    img.write_bytes(b"data")
+
+    img_csv = tmp_path / "images.csv"
+    img_csv.write_text(
+        f"path,image_key,image_source_id,image_path\n{img},key,1,p\n",
+        encoding="utf-8",
+    )
+    obj_csv = tmp_path / "objects.csv"
+    obj_csv.write_text(
+        f"path,text_content,price,surname,given_name,patronymic,year\n{img},Коган Хаим,5000,Коган,Хаим,,1897\n",
+        encoding="utf-8",
+    )
+
+    responses.add(
+        responses.POST, f"{API}/api/admin/objects", json={"id": 1}, status=200
+    )
+
+    result = runner.invoke(
+        cli,
+        [
+            "--token", "fake", "upload-objects",
+            "--csv", str(obj_csv),
+            "--images-csv", str(img_csv),
+        ],
+    )
+    assert result.exit_code == 0
+    body = responses.calls[0].request.body
+    assert "surname=" in body
+    assert "year=1897" in body
+    assert "patronymic" not in body
+
+
 @responses.activate
 def test_upload_objects_skips_missing_image(runner, tmp_path):
     img_csv = tmp_path / "images.csv"
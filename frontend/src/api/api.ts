@@ -24,7 +24,11 @@ apiClient.interceptors.response.use(
 export interface SearchFilters {
     source_id?: number;
     sort?: "relevance" | "date";
-    mode?: "fuzzy" | "exact";
+    mode?: "fuzzy" | "exact" | "phonetic" | "fulltext";
+    surname?: string;
+    year_from?: number;
+    year_to?: number;
+    residence?: string;
 }
 
 export const searchObjects = async (
@@ -42,14 +46,18 @@ export const searchObjects = async (
     if (filters?.source_id) params.set("source_id", String(filters.source_id));
     if (filters?.sort && filters.sort !== "relevance") params.set("sort", filters.sort);
     if (filters?.mode && filters.mode !== "fuzzy") params.set("mode", filters.mode);
+    if (filters?.surname) params.set("surname", filters.surname);
+    if (filters?.year_from) params.set("year_from", String(filters.year_from));
+    if (filters?.year_to) params.set("year_to", String(filters.year_to));
+    if (filters?.residence) params.set("residence", filters.residence);
     return (await apiClient.get(`/search?${params}`, {signal})).data;
 };
 
 export const fetchSources = async () =>
     (await apiClient.get("/sources")).data as Array<{ id: number; source_name: string; description: string | null }>;
 
-export const fetchObjects = async (page: number, pageSize: number) =>
-    (await apiClient.get(`/admin/objects?skip=${page * pageSize}&limit=${pageSize}`)).data;
+export const fetchObjects = async (cursor: string | null, pageSize: number) =>
+    (await apiClient.get("/admin/objects", {params: {limit: pageSize, ...(cursor ? {cursor} : {})}})).data;
 
 export const createSearchObject = async (formData: FormData) =>
     (await apiClient.post("/admin/objects", formData)).data;
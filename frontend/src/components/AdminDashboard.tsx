@@ -1,4 +1,4 @@
-import {useCallback, useEffect, useState} from "react";
+import {useCallback, useEffect, useRef, useState} from "react";
 import {
     apiClient,
     createSearchObject,
@@ -70,19 +70,42 @@ export default function AdminDashboard() {
 
     const fetchSources = () => apiClient.get("/admin/image-sources").then((res) => setImageSources(res.data));
 
+    // Keyset paging: the cursor for page N comes from page N-1, so only visited pages (and the next) are reachable
+    const cursorsRef = useRef<(string | null)[]>([null]);
+    const [knownPages, setKnownPages] = useState(1);
+
     const fetchPage = useCallback(async () => {
-        const currentPage = query.trim() ? 0 : page;
-        const res = query.trim()
-            ? await searchObjects(query, currentPage, pageSize)
-            : await fetchObjects(currentPage, pageSize);
+        if (query.trim()) {
+            const res = await searchObjects(query, 0, pageSize);
+            setObjects([...res.items]);
+            setTotal(res.total);
+            return;
+        }
+        const res = await fetchObjects(cursorsRef.current[page] ?? null, pageSize);
         setObjects([...res.items]);
-        setTotal(res.total);
+        if (res.total !== null) setTotal(res.total);
+        if (res.next_cursor) cursorsRef.current[page + 1] = res.next_cursor;
+        setKnownPages(cursorsRef.current.length);
     }, [query, page]);
 
     useEffect(() => {
         fetchSources();
     }, []);
 
+    // Cached cursors belong to the list as it was; start over from the first page
+    const restartPaging = async () => {
+        cursorsRef.current = [null];
+        setKnownPages(1);
+        if (page === 0) await fetchPage();
+        else setPage(0);
+    };
+
+    useEffect(() => {
+        cursorsRef.current = [null];
+        setKnownPages(1);
+        setPage(0);
+    }, [query]);
+
     useEffect(() => {
         const delay = setTimeout(fetchPage, 300);
         return () => clearTimeout(delay);
@@ -132,7 +155,7 @@ export default function AdminDashboard() {
     const handleDelete = async (id: number) => {
         if (confirm("Вы точно хотите забыть об этом навсегда?")) {
             await deleteSearchObject(id);
-            await fetchPage();
+            await restartPaging();
         }
     };
 
@@ -152,7 +175,7 @@ export default function AdminDashboard() {
 
         await createSearchObject(formData);
         clearForm();
-        await fetchPage();
+        await restartPaging();
     };
 
     const handleImageClick = useCallback(
@@ -175,7 +198,7 @@ export default function AdminDashboard() {
         if (file) handleFileDrop(file);
     };
 
-    const pageCount = Math.ceil(total / pageSize);
+    const pageCount = query.trim() ? Math.ceil(total / pageSize) : Math.min(Math.ceil(total / pageSize), knownPages);
 
     return (
         <TooltipProvider>
@@ -52,7 +52,7 @@ export default function SearchPage() {
     const [sources, setSources] = useState<Array<{ id: number; source_name: string; description: string | null }>>([]);
     const [sourceId, setSourceId] = useState<number | undefined>(undefined);
     const [sortBy, setSortBy] = useState<"relevance" | "date">("relevance");
-    const [searchMode, setSearchMode] = useState<"fuzzy" | "exact">("fuzzy");
+    const [searchMode, setSearchMode] = useState<"fuzzy" | "exact" | "phonetic" | "fulltext">("fuzzy");
     const [filtersOpen, setFiltersOpen] = useState(false);
     const pageSize = 20;
     const abortControllerRef = useRef<AbortController | null>(null);
@@ -244,6 +244,20 @@ export default function SearchPage() {
                                     >
                                         Точный
                                     </Button>
+                                    <Button
+                                        variant={searchMode === "phonetic" ? "default" : "outline"}
+                                        size="sm"
+                                        onClick={() => setSearchMode("phonetic")}
+                                    >
+                                        По звучанию
+                                    </Button>
+                                    <Button
+                                        variant={searchMode === "fulltext" ? "default" : "outline"}
+                                        size="sm"
+                                        onClick={() => setSearchMode("fulltext")}
+                                    >
+                                        По словам
+                                    </Button>
                                 </div>
                             </div>
                         </CollapsibleContent>